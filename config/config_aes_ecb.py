@@ -1,6 +1,6 @@
-import sys
+from gen_file import write_file
 
-def generate_aes_ecb(pre_expanded = True, filepath='./'):
+def generate_aes_ecb(pre_expanded = True, filepath='./', key_slots = 1):
     filename = filepath + 'aes_ecb.vhd'
 
     state_type = 'state_arr_t(aes_n_rounds_g-1 downto 0);' if pre_expanded == False else 'state_t;'
@@ -8,6 +8,29 @@ def generate_aes_ecb(pre_expanded = True, filepath='./'):
     trg_key    = 'rnd_stage_trg_key(i),'                   if pre_expanded == False else 'open,'
     idx        = '(aes_n_rounds_g-1)'                      if pre_expanded == False else ''
 
+    # With more key slots the keys are stored in a table and aes_key_slot_i selects the key
+    # to load and the key of the blocks entering the pipeline. With a slot the index is unused
+    if key_slots > 1:
+        use_numeric = '\nuse ieee.numeric_std.all;'
+        origin      = 'key_origin_q(key_slot)'
+        origin_rst  = '(others => (others => (others => (others => \'0\'))))'
+        key_origin  = 'key_origin'
+        slot_port   = '\n            kexp_key_slot_i         : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);'
+        slot_map    = '\n            kexp_key_slot_i         => aes_key_slot_i,'
+        slot_sel    = '''
+    --! Key of the selected slot
+    key_slot    <= to_integer(unsigned(aes_key_slot_i(''' + str(key_slots.bit_length() - 2) + ''' downto 0)));
+    key_origin  <= key_origin_q(key_slot);
+'''
+    else:
+        use_numeric = ''
+        origin      = 'key_origin_q'
+        origin_rst  = '(others => (others => (others => \'0\')))'
+        key_origin  = 'key_origin_q'
+        slot_port   = ''
+        slot_map    = ''
+        slot_sel    = ''
+
     file_lines = []
     file_lines.append(
     '''--------------------------------------------------------------------------------
@@ -18,7 +41,7 @@ def generate_aes_ecb(pre_expanded = True, filepath='./'):
 --! @Source:        http://csrc.nist.gov/publications/fips/fips197/fips-197.pdf
 --------------------------------------------------------------------------------
 library ieee;
-use ieee.std_logic_1164.all;
+use ieee.std_logic_1164.all;''' + use_numeric + '''
 use work.aes_pkg.all;
 use work.aes_func.all;
 
@@ -32,6 +55,7 @@ entity aes_ecb is
         aes_mode_i                  : in  std_logic_vector(1 downto 0);
         aes_key_word_val_i          : in  std_logic_vector(3 downto 0);
         aes_key_word_i              : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+        aes_key_slot_i              : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);
         aes_pipe_reset_i            : in  std_logic;
         aes_plain_text_val_i        : in  std_logic;
         aes_plain_text_i            : in  std_logic_vector(aes_DATA_WIDTH_C-1 downto 0);
@@ -84,8 +108,13 @@ architecture arch_aes_ecb of aes_ecb is
     signal kexp_rcon_exp              : byte_arr_t(aes_n_rounds_g-1 downto 0);
     signal kexp_rcon                  : byte_arr_t(aes_n_rounds_g-1 downto 0);
     signal kexp_key_part              : key_vec_arr_t(aes_n_rounds_g-1 downto 0);
-    signal start_first_stage          : std_logic;
-    signal key_origin_q               : key_vec_t;''')
+    signal start_first_stage          : std_logic;''')
+        if key_slots > 1:
+            file_lines.append('''    signal key_slot                   : natural range 0 to ''' + str(key_slots - 1) + ''';
+    signal key_origin                 : key_vec_t;
+    signal key_origin_q               : key_vec_arr_t(''' + str(key_slots - 1) + ''' downto 0);''')
+        else:
+            file_lines.append('''    signal key_origin_q               : key_vec_t;''')
 
     file_lines.append('''
 
@@ -101,7 +130,7 @@ architecture arch_aes_ecb of aes_ecb is
             rst_i                   : in  std_logic;
             clk_i                   : in  std_logic;
             kexp_key_word_val_i     : in  std_logic_vector(3 downto 0);
-            kexp_key_word_i         : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+            kexp_key_word_i         : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);''' + slot_port + '''
             kexp_cnt_i              : in  round_cnt_arr_t(core_num_g-1 downto 0);
             kexp_key_next_stage_o   : out state_arr_t(core_num_g-1 downto 0);
             kexp_key_last_stage_o   : out state_t);
@@ -174,34 +203,34 @@ begin
     get_key_p: process(rst_i, clk_i)
     begin
         if(rst_i = '1') then
-            key_origin_q <= (others => (others => (others => '0')));
+            key_origin_q <= ''' + origin_rst + ''';
         elsif(rising_edge(clk_i)) then
             --! Load the key words in the key vector
             if (aes_key_word_val_i(2) = '1') then
-                key_origin_q(7) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (7+1)-1 downto WORD_WIDTH_C * 7));
-                key_origin_q(6) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (6+1)-1 downto WORD_WIDTH_C * 6));
-                key_origin_q(5) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (5+1)-1 downto WORD_WIDTH_C * 5));
-                key_origin_q(4) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (4+1)-1 downto WORD_WIDTH_C * 4));
+                ''' + origin + '''(7) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (7+1)-1 downto WORD_WIDTH_C * 7));
+                ''' + origin + '''(6) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (6+1)-1 downto WORD_WIDTH_C * 6));
+                ''' + origin + '''(5) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (5+1)-1 downto WORD_WIDTH_C * 5));
+                ''' + origin + '''(4) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (4+1)-1 downto WORD_WIDTH_C * 4));
             end if;
             if (aes_key_word_val_i(1) = '1') then
-                key_origin_q(3) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (3+1)-1 downto WORD_WIDTH_C * 3));
-                key_origin_q(2) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (2+1)-1 downto WORD_WIDTH_C * 2));
+                ''' + origin + '''(3) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (3+1)-1 downto WORD_WIDTH_C * 3));
+                ''' + origin + '''(2) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (2+1)-1 downto WORD_WIDTH_C * 2));
             end if;
             if (aes_key_word_val_i(0) = '1') then
-                key_origin_q(1) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (1+1)-1 downto WORD_WIDTH_C * 1));
-                key_origin_q(0) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (0+1)-1 downto WORD_WIDTH_C * 0));
+                ''' + origin + '''(1) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (1+1)-1 downto WORD_WIDTH_C * 1));
+                ''' + origin + '''(0) <= vec_to_word(aes_key_word_i(WORD_WIDTH_C * (0+1)-1 downto WORD_WIDTH_C * 0));
             end if;
             if (aes_mode_i = AES_MODE_192_C or aes_mode_i = AES_MODE_128_C) then
-                key_origin_q(1) <= (others => (others => '0'));
-                key_origin_q(0) <= (others => (others => '0'));
+                ''' + origin + '''(1) <= (others => (others => '0'));
+                ''' + origin + '''(0) <= (others => (others => '0'));
             end if;
             if (aes_mode_i = AES_MODE_128_C) then
-                key_origin_q(3) <= (others => (others => '0'));
-                key_origin_q(2) <= (others => (others => '0'));
+                ''' + origin + '''(3) <= (others => (others => '0'));
+                ''' + origin + '''(2) <= (others => (others => '0'));
             end if;
         end if;
     end process;
-
+''' + slot_sel + '''
     --------------------------------------------------------------------------------
     --! Component instantiation
     --------------------------------------------------------------------------------
@@ -236,7 +265,7 @@ begin
             rst_i                   => rst_i,
             clk_i                   => clk_i,
             kexp_key_word_val_i     => aes_key_word_val_i,
-            kexp_key_word_i         => aes_key_word_i,
+            kexp_key_word_i         => aes_key_word_i,''' + slot_map + '''
             kexp_cnt_i              => rnd_stage_cnt_prev,
             kexp_key_next_stage_o   => kexp_key_next_stage,
             kexp_key_last_stage_o   => kexp_key_last_stage
@@ -286,7 +315,7 @@ begin
         file_lines.append('''
     --! Key chain signals
     start_first_stage <= not(rnd_busy) and rnd_stage_val_prev(0);
-    kexp_key_part(0)  <= key_origin_q       when (start_first_stage = '1') else kexp_key_next_part(aes_n_rounds_g-1);
+    kexp_key_part(0)  <= ''' + key_origin.ljust(18) + ''' when (start_first_stage = '1') else kexp_key_next_part(aes_n_rounds_g-1);
     kexp_rcon(0)      <= RCON_START_VALUE_C when (start_first_stage = '1') else kexp_rcon_exp(aes_n_rounds_g-1);
 
     gen_rcon_chain: for i in 1 to aes_n_rounds_g-1 generate
@@ -334,12 +363,6 @@ begin
 end architecture;
 ''')
 
-    try:
-        with open(filename, 'w') as fp:
-            fp = open(filename, 'w')
-            fp.write("\n".join(file_lines).expandtabs(4))
-            fp.close()
-            print(' >>\tOK   : File ' + filename + ' has been successfully generated')
-    except:
-        print(' >>\tError: File ' + filename + ' could not be generated')
-        sys.exit()
+    write_file(filename, "\n".join(file_lines).expandtabs(4))
+
+    return filename
@@ -1,4 +1,4 @@
-import sys
+from gen_file import write_file
 
 N_RND_128 = 11
 N_RND_192 = 13
@@ -294,12 +294,6 @@ begin
 end architecture;
 ''')
 
-    try:
-        with open(filename, 'w') as fp:
-            fp = open(filename, 'w')
-            fp.write("\n".join(file_lines).expandtabs(4))
-            fp.close()
-            print(' >>\tOK   : File ' + filename + ' has been successfully generated')
-    except:
-        print(' >>\tError: File ' + filename + ' could not be generated')
-        sys.exit()
+    write_file(filename, "\n".join(file_lines).expandtabs(4))
+
+    return filename
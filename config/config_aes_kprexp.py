@@ -1,6 +1,6 @@
-import sys
+from gen_file import write_file
 
-def generate_aes_pre_exp_key(key_n_bits = '128', n_rounds = 1, filepath='./'):
+def generate_aes_pre_exp_key(key_n_bits = '128', n_rounds = 1, filepath='./', key_slots = 1):
     filename = filepath + 'aes_kexp.vhd'
 
 
@@ -16,6 +16,14 @@ def generate_aes_pre_exp_key(key_n_bits = '128', n_rounds = 1, filepath='./'):
     for i in range (n_rounds):
         rounds[i] = [j for j in range(i, n_stages, n_rounds)]
 
+    # With more key slots the stages of each key are stored in a table, selected by the slot index
+    if key_slots > 1:
+        vec       = 'kexp_vec'
+        slot_port = '\n        kexp_key_slot_i         : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);'
+    else:
+        vec       = 'kexp_vec_q'
+        slot_port = ''
+
     file_lines = []
     file_lines.append(
     '''--------------------------------------------------------------------------------
@@ -39,7 +47,7 @@ entity aes_kexp is
         rst_i                   : in  std_logic;
         clk_i                   : in  std_logic;
         kexp_key_word_val_i     : in  std_logic_vector(3 downto 0);
-        kexp_key_word_i         : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+        kexp_key_word_i         : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);''' + slot_port + '''
         kexp_cnt_i              : in  round_cnt_arr_t(core_num_g-1 downto 0);
         kexp_key_next_stage_o   : out state_arr_t(core_num_g-1 downto 0);
         kexp_key_last_stage_o   : out state_t);
@@ -50,15 +58,74 @@ architecture arch_aes_kexp of aes_kexp is
 
     --! Constants
 
-    --! Types
+    --! Types''')
+
+    if key_slots > 1:
+        file_lines.append(
+    '''    type kexp_slot_arr_t is array (0 to ''' + str(key_slots - 1) + ''') of state_arr_t(''' + str(n_stages) + ''' downto 0);''')
 
+    file_lines.append(
+    '''
     --! Signals
 
     signal key_idx             : natural range 0 to ''' + str(n_stages + 1) + ''';
     signal key_idx_q           : natural range 0 to ''' + str(n_stages + 1) + ''';
     signal kexp_key_word_q     : std_logic_vector(AES_128_KEY_WIDTH_C-1 downto 0);
-    signal kexp_key_next_stage : state_arr_t(core_num_g downto 0);
-    signal kexp_vec_q          : state_arr_t (''' + str(n_stages) + ''' downto 0);
+    signal kexp_key_next_stage : state_arr_t(core_num_g downto 0);''')
+
+    if key_slots > 1:
+        file_lines.append(
+    '''    signal key_slot            : natural range 0 to ''' + str(key_slots - 1) + ''';
+    signal key_slot_q          : natural range 0 to ''' + str(key_slots - 1) + ''';
+    signal kexp_slot_q         : kexp_slot_arr_t;
+    signal kexp_vec            : state_arr_t (''' + str(n_stages) + ''' downto 0);
+
+begin
+
+
+    key_idx  <= to_integer(unsigned(kexp_key_word_val_i));
+    key_slot <= to_integer(unsigned(kexp_key_slot_i(''' + str(key_slots.bit_length() - 2) + ''' downto 0)));
+
+    --------------------------------------------------------------------------------
+    --! Sample key inputs
+    --------------------------------------------------------------------------------
+    sample_key_p: process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            key_idx_q       <= 0;
+            key_slot_q      <= 0;
+            kexp_key_word_q <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            key_idx_q       <= key_idx;
+            key_slot_q      <= key_slot;
+            kexp_key_word_q <= kexp_key_word_i(AES_256_KEY_WIDTH_C-1 downto AES_128_KEY_WIDTH_C);
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------------
+    --! Get and store the key in its slot
+    --------------------------------------------------------------------------------
+    get_key_p: process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            kexp_slot_q <= (others => (others => (others => ( others => (others => '0')))));
+        elsif(rising_edge(clk_i)) then
+            --! Load the key words in the key vector of the slot
+            if(key_idx_q /= 0) then
+                kexp_slot_q(key_slot_q)(key_idx_q - 1) <= vec_to_state(kexp_key_word_q);
+            end if;
+        end if;
+    end process;
+
+    --! Key of the selected slot
+    kexp_vec <= kexp_slot_q(key_slot);
+
+
+    ''')
+
+    else:
+        file_lines.append(
+    '''    signal kexp_vec_q          : state_arr_t (''' + str(n_stages) + ''' downto 0);
 
 begin
 
@@ -101,26 +168,20 @@ begin
         file_lines.append('\tkexp_key_next_stage(' + str(i) + ')   <= ')
         for n in range(len(rounds[i][:-1])):
             p = str(rounds[i][n])
-            file_lines.append('\t\t\tkexp_vec_q(' + p + ')\twhen (kexp_cnt_i(' + str(i) + ') = ' + p + ')\telse')
+            file_lines.append('\t\t\t' + vec + '(' + p + ')\twhen (kexp_cnt_i(' + str(i) + ') = ' + p + ')\telse')
         q = str(rounds[i][-1])
-        file_lines.append('\t\t\tkexp_vec_q(' + q + ');\n')
+        file_lines.append('\t\t\t' + vec + '(' + q + ');\n')
 
     file_lines.append(
     '''
 
     --! Outpus
     kexp_key_next_stage_o   <= kexp_key_next_stage(core_num_g-1 downto 0);
-    kexp_key_last_stage_o   <= kexp_vec_q(''' + str(n_stages) + ''');
+    kexp_key_last_stage_o   <= ''' + vec + '''(''' + str(n_stages) + ''');
 
 end architecture;
 ''')
 
-    try:
-        with open(filename, 'w') as fp:
-            fp = open(filename, 'w')
-            fp.write("\n".join(file_lines).expandtabs(4))
-            fp.close()
-            print(' >>\tOK   : File ' + filename + ' has been successfully generated')
-    except:
-        print(' >>\tError: File ' + filename + ' could not be generated')
-        sys.exit()
+    write_file(filename, "\n".join(file_lines).expandtabs(4))
+
+    return filename
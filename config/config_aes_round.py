@@ -1,4 +1,4 @@
-import sys
+from gen_file import write_file
 
 def generate_aes_round(pipe_stage=0, filepath='./'):
 
@@ -241,12 +241,6 @@ begin
 end architecture;
 ''')
 
-    try:
-        with open(filename, 'w') as fp:
-            fp = open(filename, 'w')
-            fp.write("\n".join(file_lines))
-            fp.close()
-            print(' >>\tOK   : File ' + filename + ' has been successfully generated')
-    except:
-        print(' >>\tError: File ' + filename + ' could not be generated')
-        sys.exit()
+    write_file(filename, "\n".join(file_lines))
+
+    return filename
@@ -1,8 +1,54 @@
-import sys
+from gen_file import write_file
 
-def generate_aes_top(aes_mode='128', aes_n_rounds=1, pipe_stage=0, aes_gcm_split_gfmul=0, filepath='./'):
+def generate_aes_top(aes_mode='128', aes_n_rounds=1, pipe_stage=0, aes_gcm_split_gfmul=0, filepath='./', n_lanes=1, key_slots=1, ks_fifo=0):
     filename = filepath + 'top_aes_gcm.vhd'
 
+    # With more lanes the buses are n_lanes blocks wide and aes_gcm_lanes is instantiated
+    if n_lanes == 1:
+        lanes       = ''
+        core        = 'aes_gcm'
+        conf_lanes  = ''
+        generic_3   = 'aes_gcm_split_gfmul             : natural range 0 to 1          := 0;\n' + \
+                      '            aes_gcm_key_slots_g             : natural range 1 to 8          := 1;\n' + \
+                      '            aes_gcm_ks_fifo_g               : natural range 0 to 32         := 0'
+        generic_map = 'aes_gcm_split_gfmul             => ' + str(aes_gcm_split_gfmul) + ',\n' + \
+                      '            aes_gcm_key_slots_g             => ' + str(key_slots) + ',\n' + \
+                      '            aes_gcm_ks_fifo_g               => ' + str(ks_fifo)
+        slot_comp   = '\n            aes_gcm_key_slot_i              : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);'
+        slot_map    = '\n            aes_gcm_key_slot_i              => ' + \
+                      ('aes_gcm_key_slot_i,' if key_slots > 1 else '(others => \'0\'),')
+        icb_port    = '\n        aes_gcm_icb_n_blocks_i          : in  std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);' + \
+                      '\n        aes_gcm_iv_hash_i               : in  std_logic;'
+        icb_comp    = '\n            aes_gcm_icb_n_blocks_i          : in  std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);' + \
+                      '\n            aes_gcm_iv_hash_i               : in  std_logic;'
+        icb_map     = '\n            aes_gcm_icb_n_blocks_i          => aes_gcm_icb_n_blocks_i,' + \
+                      '\n            aes_gcm_iv_hash_i               => aes_gcm_iv_hash_i,'
+    else:
+        lanes       = str(n_lanes) + ' * '
+        core        = 'aes_gcm_lanes'
+        conf_lanes  = '\n--   lanes:       ' + str(n_lanes)
+        generic_3   = 'aes_gcm_n_lanes_g               : natural range 1 to 8          := 2'
+        generic_map = 'aes_gcm_n_lanes_g               => ' + str(n_lanes)
+        slot_comp   = ''
+        slot_map    = ''
+        icb_port    = ''
+        icb_comp    = ''
+        icb_map     = ''
+
+    # The key slot index selects the key and the H of each packet
+    if key_slots > 1:
+        slot_port   = '\n        aes_gcm_key_slot_i              : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);'
+        conf_slots  = '\n--   key slots:   ' + str(key_slots)
+    else:
+        slot_port   = ''
+        conf_slots  = ''
+
+    # The key stream FIFO lets the ECB encrypt the next counters while the PT is not valid
+    if ks_fifo > 0:
+        conf_fifo   = '\n--   ks FIFO:     ' + str(ks_fifo)
+    else:
+        conf_fifo   = ''
+
     file_lines = []
     file_lines.append(
     '''--------------------------------------------------------------------------------
@@ -21,7 +67,7 @@ use work.aes_pkg.all;
 --   AES Mode:    ''' + aes_mode + '''
 --   # rounds:    ''' + str(aes_n_rounds) + '''
 --   pipe stages: ''' + str(pipe_stage) + '''
---   gfmul IP:    ''' + str(aes_gcm_split_gfmul + 1)+ '''
+--   gfmul IP:    ''' + str(aes_gcm_split_gfmul + 1)+ conf_lanes + conf_slots + conf_fifo + '''
 
 --------------------------------------------------------------------------------
 entity top_aes_gcm is
@@ -32,20 +78,20 @@ entity top_aes_gcm is
         aes_gcm_enc_dec_i               : in  std_logic;
         aes_gcm_pipe_reset_i            : in  std_logic;
         aes_gcm_key_word_val_i          : in  std_logic_vector(3 downto 0);
-        aes_gcm_key_word_i              : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+        aes_gcm_key_word_i              : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);''' + slot_port + '''
         aes_gcm_iv_val_i                : in  std_logic;
-        aes_gcm_iv_i                    : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+        aes_gcm_iv_i                    : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);''' + icb_port + '''
         aes_gcm_icb_start_cnt_i         : in  std_logic;
         aes_gcm_icb_stop_cnt_i          : in  std_logic;
         aes_gcm_ghash_pkt_val_i         : in  std_logic;
-        aes_gcm_ghash_aad_bval_i        : in  std_logic_vector(NB_STAGE_C-1 downto 0);
-        aes_gcm_ghash_aad_i             : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
-        aes_gcm_data_in_bval_i          : in  std_logic_vector(NB_STAGE_C-1 downto 0);
-        aes_gcm_data_in_i               : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+        aes_gcm_ghash_aad_bval_i        : in  std_logic_vector(''' + lanes + '''NB_STAGE_C-1 downto 0);
+        aes_gcm_ghash_aad_i             : in  std_logic_vector(''' + lanes + '''GCM_DATA_WIDTH_C-1 downto 0);
+        aes_gcm_data_in_bval_i          : in  std_logic_vector(''' + lanes + '''NB_STAGE_C-1 downto 0);
+        aes_gcm_data_in_i               : in  std_logic_vector(''' + lanes + '''AES_DATA_WIDTH_C-1 downto 0);
         aes_gcm_ready_o                 : out std_logic;
         aes_gcm_data_out_val_o          : out std_logic;
-        aes_gcm_data_out_bval_o         : out std_logic_vector(NB_STAGE_C-1 downto 0);
-        aes_gcm_data_out_o              : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+        aes_gcm_data_out_bval_o         : out std_logic_vector(''' + lanes + '''NB_STAGE_C-1 downto 0);
+        aes_gcm_data_out_o              : out std_logic_vector(''' + lanes + '''AES_DATA_WIDTH_C-1 downto 0);
         aes_gcm_ghash_tag_val_o         : out std_logic;
         aes_gcm_ghash_tag_o             : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
         aes_gcm_icb_cnt_overflow_o      : out std_logic);
@@ -54,11 +100,11 @@ end entity;
 --------------------------------------------------------------------------------
 architecture arch_top_aes_gcm of top_aes_gcm is
 
-    component aes_gcm is
+    component ''' + core + ''' is
         generic(
             aes_gcm_mode_g                  : std_logic_vector(1 downto 0)  := AES_MODE_128_C;
             aes_gcm_n_rounds_g              : natural range 0 to NR_256_C   := NR_128_C;
-            aes_gcm_split_gfmul             : natural range 0 to 1          := 0);
+            ''' + generic_3 + ''');
         port(
             rst_i                           : in  std_logic;
             clk_i                           : in  std_logic;
@@ -66,20 +112,20 @@ architecture arch_top_aes_gcm of top_aes_gcm is
             aes_gcm_enc_dec_i               : in  std_logic;
             aes_gcm_pipe_reset_i            : in  std_logic;
             aes_gcm_key_word_val_i          : in  std_logic_vector(3 downto 0);
-            aes_gcm_key_word_i              : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+            aes_gcm_key_word_i              : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);''' + slot_comp + '''
             aes_gcm_iv_val_i                : in  std_logic;
-            aes_gcm_iv_i                    : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+            aes_gcm_iv_i                    : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);''' + icb_comp + '''
             aes_gcm_icb_start_cnt_i         : in  std_logic;
             aes_gcm_icb_stop_cnt_i          : in  std_logic;
             aes_gcm_ghash_pkt_val_i         : in  std_logic;
-            aes_gcm_ghash_aad_bval_i        : in  std_logic_vector(NB_STAGE_C-1 downto 0);
-            aes_gcm_ghash_aad_i             : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
-            aes_gcm_data_in_bval_i          : in  std_logic_vector(NB_STAGE_C-1 downto 0);
-            aes_gcm_data_in_i               : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+            aes_gcm_ghash_aad_bval_i        : in  std_logic_vector(''' + lanes + '''NB_STAGE_C-1 downto 0);
+            aes_gcm_ghash_aad_i             : in  std_logic_vector(''' + lanes + '''GCM_DATA_WIDTH_C-1 downto 0);
+            aes_gcm_data_in_bval_i          : in  std_logic_vector(''' + lanes + '''NB_STAGE_C-1 downto 0);
+            aes_gcm_data_in_i               : in  std_logic_vector(''' + lanes + '''AES_DATA_WIDTH_C-1 downto 0);
             aes_gcm_ready_o                 : out std_logic;
             aes_gcm_data_out_val_o          : out std_logic;
-            aes_gcm_data_out_bval_o         : out std_logic_vector(NB_STAGE_C-1 downto 0);
-            aes_gcm_data_out_o              : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+            aes_gcm_data_out_bval_o         : out std_logic_vector(''' + lanes + '''NB_STAGE_C-1 downto 0);
+            aes_gcm_data_out_o              : out std_logic_vector(''' + lanes + '''AES_DATA_WIDTH_C-1 downto 0);
             aes_gcm_ghash_tag_val_o         : out std_logic;
             aes_gcm_ghash_tag_o             : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
             aes_gcm_icb_cnt_overflow_o      : out std_logic);
@@ -87,11 +133,11 @@ architecture arch_top_aes_gcm of top_aes_gcm is
 
 begin
 
-    u_aes_gcm: aes_gcm
+    u_aes_gcm: ''' + core + '''
         generic map(
             aes_gcm_mode_g                  => AES_MODE_''' + aes_mode + '''_C,
             aes_gcm_n_rounds_g              => ''' + str(aes_n_rounds) + ''',
-            aes_gcm_split_gfmul             => ''' + str(aes_gcm_split_gfmul) + ''')
+            ''' + generic_map + ''')
         port map(
             rst_i                           => rst_i,
             clk_i                           => clk_i,
@@ -99,9 +145,9 @@ begin
             aes_gcm_enc_dec_i               => aes_gcm_enc_dec_i,
             aes_gcm_pipe_reset_i            => aes_gcm_pipe_reset_i,
             aes_gcm_key_word_val_i          => aes_gcm_key_word_val_i,
-            aes_gcm_key_word_i              => aes_gcm_key_word_i,
+            aes_gcm_key_word_i              => aes_gcm_key_word_i,''' + slot_map + '''
             aes_gcm_iv_val_i                => aes_gcm_iv_val_i,
-            aes_gcm_iv_i                    => aes_gcm_iv_i,
+            aes_gcm_iv_i                    => aes_gcm_iv_i,''' + icb_map + '''
             aes_gcm_icb_start_cnt_i         => aes_gcm_icb_start_cnt_i,
             aes_gcm_icb_stop_cnt_i          => aes_gcm_icb_stop_cnt_i,
             aes_gcm_ghash_pkt_val_i         => aes_gcm_ghash_pkt_val_i,
@@ -120,12 +166,6 @@ begin
 end architecture;
 ''')
 
-    try:
-        with open(filename, 'w') as fp:
-            fp = open(filename, 'w')
-            fp.write("\n".join(file_lines).expandtabs(4))
-            fp.close()
-            print(' >>\tOK   : File ' + filename + ' has been successfully generated')
-    except:
-        print(' >>\tError: File ' + filename + ' could not be generated')
-        sys.exit()
+    write_file(filename, "\n".join(file_lines).expandtabs(4))
+
+    return filename
@@ -0,0 +1,533 @@
+import sys
+import random
+
+from gen_file import write_file
+
+# GCM polynomial x^128 + x^7 + x^2 + x + 1: the coefficient of x^i is bit i
+GF_POLY = (1 << 128) | 0x87
+
+
+# ======================================================================================
+def gf_reflect(v, n_bits=128):
+    '''
+    GCM bit order: the MSb of a block is the coefficient of x^0 '''
+
+    return int('{:0{width}b}'.format(v, width=n_bits)[::-1], 2)
+
+
+# ======================================================================================
+def gf_clmul(a, b):
+    '''
+    Carry-less multiplication of two polynomials '''
+
+    c = 0
+    while b:
+        if b & 1:
+            c ^= a
+        a <<= 1
+        b >>= 1
+    return c
+
+
+# ======================================================================================
+def gf_reduce(c):
+    '''
+    Fold the coefficients of degree 128 and higher, from the highest one '''
+
+    for i in range(c.bit_length() - 1, 127, -1):
+        if (c >> i) & 1:
+            c ^= GF_POLY << (i - 128)
+    return c
+
+
+# ======================================================================================
+def gf_mul_ref(x, h):
+    '''
+    Reference GF multiplication: polynomial product and long division '''
+
+    c = gf_clmul(gf_reflect(x), gf_reflect(h))
+    while c.bit_length() > 128:
+        c ^= GF_POLY << (c.bit_length() - 129)
+    return gf_reflect(c)
+
+
+# ======================================================================================
+def gf_model(arch='schoolbook', digit=8):
+    '''
+    Return a Python model of the multiplier with the structure of the generated RTL '''
+
+    def schoolbook(x, h):
+        # Algorithm 1 of SP 800-38D: V is shifted right and reduced for each bit of X
+        z = 0
+        v = h
+        for i in range(127, -1, -1):
+            if (x >> i) & 1:
+                z ^= v
+            v = (v >> 1) ^ (0xE1 << 120) if (v & 1) else (v >> 1)
+        return z
+
+    def kmul(a, b, n_bits, levels):
+        if levels == 0:
+            return gf_clmul(a, b)
+        half = n_bits // 2
+        mask = (1 << half) - 1
+        lo   = kmul(a & mask, b & mask, half, levels - 1)
+        hi   = kmul(a >> half, b >> half, half, levels - 1)
+        mid  = kmul((a & mask) ^ (a >> half), (b & mask) ^ (b >> half), half, levels - 1)
+        return lo ^ (hi << (2 * half)) ^ ((mid ^ lo ^ hi) << half)
+
+    def karatsuba(levels):
+        return lambda x, h : gf_reflect(gf_reduce(kmul(gf_reflect(x), gf_reflect(h), 128, levels)))
+
+    def digit_serial(x, h):
+        a    = gf_reflect(x)
+        b    = gf_reflect(h)
+        mask = (1 << digit) - 1
+        z    = 0
+        for j in range(128 // digit - 1, -1, -1):
+            z = gf_reduce((z << digit) ^ gf_clmul((a >> (j * digit)) & mask, b))
+        return gf_reflect(z)
+
+    models = {'schoolbook' : schoolbook,
+              'karatsuba1' : karatsuba(1),
+              'karatsuba2' : karatsuba(2),
+              'digit'      : digit_serial}
+
+    return models[arch]
+
+
+# ======================================================================================
+def check_gcm_gfmul(arch='schoolbook', digit=8, n_vectors=64, seed=0):
+    '''
+    Compare the model of the multiplier with the reference on the corner
+    cases and on random vectors. Return the list of the failing vectors '''
+
+    rnd    = random.Random(seed)
+    model  = gf_model(arch, digit)
+    corner = [0, 1, 1 << 127, (1 << 128) - 1]
+
+    vectors  = [(x, h) for x in corner for h in corner]
+    vectors += [(rnd.getrandbits(128), rnd.getrandbits(128)) for _ in range(n_vectors)]
+
+    return [(x, h) for x, h in vectors if model(x, h) != gf_mul_ref(x, h)]
+
+
+# ======================================================================================
+def stage_ranges(n_items, n_stages):
+    '''
+    Split the items in n_stages + 1 contiguous ranges, from the highest item '''
+
+    bounds = [n_items - (n_items * k) // (n_stages + 1) for k in range(n_stages + 2)]
+    return [(bounds[k] - 1, bounds[k + 1]) for k in range(n_stages + 1)]
+
+
+# ======================================================================================
+def generate_gcm_gfmul(arch='schoolbook', n_stages=0, digit=8, filepath='./'):
+    filename = filepath + 'ghash_gfmul.vhd'
+
+    indent = ' ' * 4
+
+    arch_str = arch + (' (' + str(digit) + '-bit digits)' if arch == 'digit' else '')
+
+    if n_stages > 0:
+        clk_ports = '''        rst_i               : in  std_logic;
+        clk_i               : in  std_logic;
+'''
+    else:
+        clk_ports = ''
+
+    file_lines = []
+    file_lines.append(
+    '''--------------------------------------------------------------------------------
+--! @File name:     ghash_gfmul
+--! @Date:          29/04/2019
+--! @Description:   The module performs the GF multiplication
+--! @Reference:     FIPS PUB 197, November 26, 2001
+--! @Source:        https://nvlpubs.nist.gov/nistpubs/Legacy/SP/nistspecialpublication800-38d.pdf
+--------------------------------------------------------------------------------
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.std_logic_misc.xor_reduce;
+use work.gcm_pkg.all;
+
+-- This GF multiplier has been configured with:
+--   architecture:    ''' + arch_str + '''
+--   register stages: ''' + str(n_stages) + '''
+
+--------------------------------------------------------------------------------
+entity ghash_gfmul is
+    port(
+''' + clk_ports + '''        gf_mult_h_i         : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+        gf_mult_x_i         : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+        gf_mult_y_o         : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0));
+end entity;
+
+--------------------------------------------------------------------------------
+architecture arch_ghash_gfmul of ghash_gfmul is
+
+    --! Constants
+''')
+
+    if arch == 'schoolbook' and n_stages == 0:
+        file_lines.append(
+    '''    --! Types
+    type gf_array_t is array ((GCM_DATA_WIDTH_C-1) downto 0) of std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+
+    --! Signals
+    signal gf_z : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+
+begin
+
+    --------------------------------------------------------------------------------
+    --! GF Multiplications
+    --------------------------------------------------------------------------------
+    gf_mult_p   : process(gf_mult_x_i, gf_mult_h_i)
+        variable tmp_v : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+        variable vec_v : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+        variable acc_v : gf_array_t;
+    begin
+        tmp_v := gf_mult_h_i;
+
+        for i in GCM_DATA_WIDTH_C-1 downto 0 loop
+            --! Save tmp_v vertically in the array
+            for j in GCM_DATA_WIDTH_C-1 downto 0 loop
+                acc_v(j)(i) := gf_mult_x_i(i) and tmp_v(j);
+            end loop;
+
+            vec_v := tmp_v;
+            --! (V_i >> 1) xor R = ('11100001 || 0^120')
+            tmp_v(127)              := vec_v(0);
+            tmp_v(126)              := vec_v(127) xor vec_v(0);
+            tmp_v(125)              := vec_v(126) xor vec_v(0);
+            tmp_v(124 downto 121)   := vec_v(125 downto 122);
+            tmp_v(120)              := vec_v(121) xor vec_v(0);
+            tmp_v(119 downto 0)     := vec_v(120 downto 1);
+        end loop;
+
+        --! Z_i xor V_i
+        for i in 0 to GCM_DATA_WIDTH_C-1 loop
+            gf_z(i) <= xor_reduce(acc_v(i));
+        end loop;
+    end process;
+
+    ---------------------------------------------------------------
+    gf_mult_y_o <= gf_z;
+
+end architecture;''')
+
+    elif arch == 'schoolbook' or arch == 'digit':
+        # Chain of segments: Z, V (B) and X (A) are registered between them
+        if arch == 'schoolbook':
+            ranges = stage_ranges(128, n_stages)
+            in_z   = '(others => \'0\')'
+            in_v   = 'gf_mult_h_i'
+            in_x   = 'gf_mult_x_i'
+            out_y  = 'gf_z(' + str(n_stages) + ')'
+            vec_v  = '\n' + indent * 2 + 'variable vec_v : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);'
+        else:
+            ranges = stage_ranges(128 // digit, n_stages)
+            in_z   = '(others => \'0\')'
+            in_v   = 'to_poly(gf_mult_h_i)'
+            in_x   = 'to_poly(gf_mult_x_i)'
+            out_y  = 'to_poly(gf_z(' + str(n_stages) + '))'
+            vec_v  = ''
+
+        if arch == 'digit':
+            file_lines.append(
+    '''    constant DIGIT_C            : natural := ''' + str(digit) + ''';
+    constant ZERO_DIGIT_C       : std_logic_vector(DIGIT_C-1 downto 0) := (others => '0');''')
+
+        file_lines.append(
+    '''
+    --! Types
+    type gf_stage_t is array (0 to ''' + str(n_stages) + ''') of std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+''')
+        if arch == 'digit':
+            file_lines.append(GF_FUNCTIONS)
+
+        file_lines.append(
+    '''    --! Signals
+    signal gf_z                 : gf_stage_t;
+    signal gf_v                 : gf_stage_t;''')
+        if n_stages > 0:
+            file_lines.append(
+    '''    signal gf_z_q               : gf_stage_t;
+    signal gf_v_q               : gf_stage_t;
+    signal gf_x_q               : gf_stage_t;''')
+
+        file_lines.append(
+    '''
+begin
+''')
+
+        for k, (hi, lo) in enumerate(ranges):
+            z = in_z if k == 0 else 'gf_z_q(' + str(k) + ')'
+            v = in_v if k == 0 else 'gf_v_q(' + str(k) + ')'
+            x = in_x if k == 0 else 'gf_x_q(' + str(k) + ')'
+            sens = 'gf_mult_x_i, gf_mult_h_i' if k == 0 else ', '.join([z, v, x])
+
+            file_lines.append(
+    '''    --------------------------------------------------------------------------------
+    --! GF Multiplications: segment ''' + str(k) + '''
+    --------------------------------------------------------------------------------
+    gf_mult_''' + str(k) + '''_p : process(''' + sens + ''')
+        variable z_v   : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+        variable tmp_v : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);''' + vec_v + '''
+        variable x_v   : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    begin
+        z_v   := ''' + z + ''';
+        tmp_v := ''' + v + ''';
+        x_v   := ''' + x + ''';
+''')
+            if hi < lo:
+                file_lines.append(indent * 2 + '--! Register stage only')
+            elif arch == 'schoolbook':
+                file_lines.append(
+    '''        for i in ''' + str(hi) + ''' downto ''' + str(lo) + ''' loop
+            --! Z_i xor V_i
+            for j in GCM_DATA_WIDTH_C-1 downto 0 loop
+                z_v(j) := z_v(j) xor (x_v(i) and tmp_v(j));
+            end loop;
+
+            vec_v := tmp_v;
+            --! (V_i >> 1) xor R = ('11100001 || 0^120')
+            tmp_v(127)              := vec_v(0);
+            tmp_v(126)              := vec_v(127) xor vec_v(0);
+            tmp_v(125)              := vec_v(126) xor vec_v(0);
+            tmp_v(124 downto 121)   := vec_v(125 downto 122);
+            tmp_v(120)              := vec_v(121) xor vec_v(0);
+            tmp_v(119 downto 0)     := vec_v(120 downto 1);
+        end loop;''')
+            else:
+                file_lines.append(
+    '''        --! Horner on the digits of X, from the highest degree: Z = Z * x^D xor X_j * H
+        for j in ''' + str(hi) + ''' downto ''' + str(lo) + ''' loop
+            z_v := gf_reduce((z_v & ZERO_DIGIT_C) xor
+                             ('0' & clmul(x_v(DIGIT_C * (j+1)-1 downto DIGIT_C * j), tmp_v)));
+        end loop;''')
+
+            file_lines.append(
+    '''
+        gf_z(''' + str(k) + ''') <= z_v;
+        gf_v(''' + str(k) + ''') <= tmp_v;
+    end process;
+''')
+
+            if k < n_stages:
+                file_lines.append(
+    '''    --------------------------------------------------------------------------------
+    --! Register stage ''' + str(k + 1) + '''
+    --------------------------------------------------------------------------------
+    gf_stage_''' + str(k + 1) + '''_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            gf_z_q(''' + str(k + 1) + ''') <= (others => '0');
+            gf_v_q(''' + str(k + 1) + ''') <= (others => '0');
+            gf_x_q(''' + str(k + 1) + ''') <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            gf_z_q(''' + str(k + 1) + ''') <= gf_z(''' + str(k) + ''');
+            gf_v_q(''' + str(k + 1) + ''') <= gf_v(''' + str(k) + ''');
+            gf_x_q(''' + str(k + 1) + ''') <= ''' + x + ''';
+        end if;
+    end process;
+''')
+
+        file_lines.append(
+    '''    ---------------------------------------------------------------
+    gf_mult_y_o <= ''' + out_y + ''';
+
+end architecture;''')
+
+    else:
+        # Karatsuba: the sub-products, the unreduced product and the inputs can be registered
+        sub     = 'clmul' if arch == 'karatsuba1' else 'kmul'
+        reg_in  = n_stages >= 3
+        reg_sub = n_stages >= 2
+        reg_c   = n_stages >= 1
+
+        a    = 'gf_a_q' if reg_in  else 'gf_a'
+        b    = 'gf_b_q' if reg_in  else 'gf_b'
+        lo   = 'gf_lo_q' if reg_sub else 'gf_lo'
+        hi   = 'gf_hi_q' if reg_sub else 'gf_hi'
+        mid  = 'gf_mid_q' if reg_sub else 'gf_mid'
+        c    = 'gf_c_q' if reg_c else 'gf_c'
+
+        file_lines.append(
+    '''    constant HALF_C             : natural := GCM_DATA_WIDTH_C / 2;
+
+    --! Types
+''')
+        file_lines.append(GF_FUNCTIONS)
+        if arch == 'karatsuba2':
+            file_lines.append(GF_KMUL)
+
+        file_lines.append(
+    '''    --! Signals
+    signal gf_a                 : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal gf_b                 : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal gf_lo                : std_logic_vector(GCM_DATA_WIDTH_C-2 downto 0);
+    signal gf_hi                : std_logic_vector(GCM_DATA_WIDTH_C-2 downto 0);
+    signal gf_mid               : std_logic_vector(GCM_DATA_WIDTH_C-2 downto 0);
+    signal gf_c                 : std_logic_vector(2 * GCM_DATA_WIDTH_C-2 downto 0);''')
+        if reg_in:
+            file_lines.append(
+    '''    signal gf_a_q               : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal gf_b_q               : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);''')
+        if reg_sub:
+            file_lines.append(
+    '''    signal gf_lo_q              : std_logic_vector(GCM_DATA_WIDTH_C-2 downto 0);
+    signal gf_hi_q              : std_logic_vector(GCM_DATA_WIDTH_C-2 downto 0);
+    signal gf_mid_q             : std_logic_vector(GCM_DATA_WIDTH_C-2 downto 0);''')
+        if reg_c:
+            file_lines.append(
+    '''    signal gf_c_q               : std_logic_vector(2 * GCM_DATA_WIDTH_C-2 downto 0);''')
+
+        file_lines.append(
+    '''
+begin
+
+    --! GCM bit order to polynomials
+    gf_a <= to_poly(gf_mult_x_i);
+    gf_b <= to_poly(gf_mult_h_i);
+
+    --------------------------------------------------------------------------------
+    --! Karatsuba: X * H = hi * x^128 xor (mid xor lo xor hi) * x^64 xor lo
+    --------------------------------------------------------------------------------
+    gf_lo  <= ''' + sub + '''(''' + a + '''(HALF_C-1 downto 0), ''' + b + '''(HALF_C-1 downto 0));
+    gf_hi  <= ''' + sub + '''(''' + a + '''(GCM_DATA_WIDTH_C-1 downto HALF_C), ''' + b + '''(GCM_DATA_WIDTH_C-1 downto HALF_C));
+    gf_mid <= ''' + sub + '''(''' + a + '''(HALF_C-1 downto 0) xor ''' + a + '''(GCM_DATA_WIDTH_C-1 downto HALF_C),
+                    ''' + b + '''(HALF_C-1 downto 0) xor ''' + b + '''(GCM_DATA_WIDTH_C-1 downto HALF_C));
+
+    gf_c_p : process(''' + lo + ''', ''' + hi + ''', ''' + mid + ''')
+        variable c_v : std_logic_vector(2 * GCM_DATA_WIDTH_C-2 downto 0);
+    begin
+        c_v                                         := (others => '0');
+        c_v(GCM_DATA_WIDTH_C-2 downto 0)            := ''' + lo + ''';
+        c_v(2 * GCM_DATA_WIDTH_C-2 downto GCM_DATA_WIDTH_C) := ''' + hi + ''';
+        c_v(3 * HALF_C-2 downto HALF_C)             := c_v(3 * HALF_C-2 downto HALF_C) xor ''' + mid + ''' xor ''' + lo + ''' xor ''' + hi + ''';
+        gf_c <= c_v;
+    end process;
+''')
+
+        if n_stages > 0:
+            regs  = []
+            if reg_in:
+                regs += [('gf_a_q', 'gf_a'), ('gf_b_q', 'gf_b')]
+            if reg_sub:
+                regs += [('gf_lo_q', 'gf_lo'), ('gf_hi_q', 'gf_hi'), ('gf_mid_q', 'gf_mid')]
+            regs += [('gf_c_q', 'gf_c')]
+
+            file_lines.append(
+    '''    --------------------------------------------------------------------------------
+    --! Register stages
+    --------------------------------------------------------------------------------
+    gf_stage_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then''')
+            for q, d in regs:
+                file_lines.append(indent * 3 + q.ljust(8) + ' <= (others => \'0\');')
+            file_lines.append(
+    '''        elsif(rising_edge(clk_i)) then''')
+            for q, d in regs:
+                file_lines.append(indent * 3 + q.ljust(8) + ' <= ' + d + ';')
+            file_lines.append(
+    '''        end if;
+    end process;
+''')
+
+        file_lines.append(
+    '''    ---------------------------------------------------------------
+    gf_mult_y_o <= to_poly(gf_reduce(''' + c + '''));
+
+end architecture;''')
+
+    write_file(filename, "\n".join(file_lines))
+
+    return filename
+
+
+# ======================================================================================
+# Functions of the polynomial multipliers
+GF_FUNCTIONS = '''    --! Functions
+    --! GCM bit order: the MSb is the coefficient of x^0. Reverse the bits to index by degree
+    function to_poly(v : std_logic_vector) return std_logic_vector is
+        variable v_v : std_logic_vector(v'length-1 downto 0) := v;
+        variable p_v : std_logic_vector(v'length-1 downto 0);
+    begin
+        for i in 0 to v'length-1 loop
+            p_v(i) := v_v(v'length-1-i);
+        end loop;
+        return p_v;
+    end function;
+
+    --! Carry-less multiplication
+    function clmul(a : std_logic_vector; b : std_logic_vector) return std_logic_vector is
+        variable a_v : std_logic_vector(a'length-1 downto 0) := a;
+        variable b_v : std_logic_vector(b'length-1 downto 0) := b;
+        variable c_v : std_logic_vector(a'length+b'length-2 downto 0) := (others => '0');
+    begin
+        for i in 0 to a'length-1 loop
+            for j in 0 to b'length-1 loop
+                c_v(i+j) := c_v(i+j) xor (a_v(i) and b_v(j));
+            end loop;
+        end loop;
+        return c_v;
+    end function;
+
+    --! Reduction modulo x^128 + x^7 + x^2 + x + 1, from the highest degree
+    function gf_reduce(c : std_logic_vector) return std_logic_vector is
+        variable c_v : std_logic_vector(c'length-1 downto 0) := c;
+    begin
+        for i in c'length-1 downto GCM_DATA_WIDTH_C loop
+            c_v(i-GCM_DATA_WIDTH_C+7) := c_v(i-GCM_DATA_WIDTH_C+7) xor c_v(i);
+            c_v(i-GCM_DATA_WIDTH_C+2) := c_v(i-GCM_DATA_WIDTH_C+2) xor c_v(i);
+            c_v(i-GCM_DATA_WIDTH_C+1) := c_v(i-GCM_DATA_WIDTH_C+1) xor c_v(i);
+            c_v(i-GCM_DATA_WIDTH_C)   := c_v(i-GCM_DATA_WIDTH_C)   xor c_v(i);
+        end loop;
+        return c_v(GCM_DATA_WIDTH_C-1 downto 0);
+    end function;
+'''
+
+# One Karatsuba level on carry-less multiplications of half size
+GF_KMUL = '''    function kmul(a : std_logic_vector; b : std_logic_vector) return std_logic_vector is
+        constant N_C    : natural := a'length;
+        constant H_C    : natural := a'length / 2;
+        variable a_v    : std_logic_vector(N_C-1 downto 0) := a;
+        variable b_v    : std_logic_vector(N_C-1 downto 0) := b;
+        variable lo_v   : std_logic_vector(2 * H_C-2 downto 0);
+        variable hi_v   : std_logic_vector(2 * H_C-2 downto 0);
+        variable mid_v  : std_logic_vector(2 * H_C-2 downto 0);
+        variable c_v    : std_logic_vector(2 * N_C-2 downto 0) := (others => '0');
+    begin
+        lo_v  := clmul(a_v(H_C-1 downto 0), b_v(H_C-1 downto 0));
+        hi_v  := clmul(a_v(N_C-1 downto H_C), b_v(N_C-1 downto H_C));
+        mid_v := clmul(a_v(H_C-1 downto 0) xor a_v(N_C-1 downto H_C), b_v(H_C-1 downto 0) xor b_v(N_C-1 downto H_C));
+        c_v(2 * H_C-2 downto 0)     := lo_v;
+        c_v(2 * N_C-2 downto 2 * H_C) := hi_v;
+        c_v(3 * H_C-2 downto H_C)   := c_v(3 * H_C-2 downto H_C) xor mid_v xor lo_v xor hi_v;
+        return c_v;
+    end function;
+'''
+
+
+
+# ======================================================================================
+if __name__ == '__main__':
+    # Check the Python models of all the variants against the reference. The generated
+    # VHDL is not simulated here: tb/gcm_gfmul_test.py checks the RTL of a variant
+    print(' >>\tOK   : Checking the Python models of the GFMUL, not the generated RTL (see tb/gcm_gfmul_test.py)')
+
+    variants  = [('schoolbook', 1), ('karatsuba1', 1), ('karatsuba2', 1)]
+    variants += [('digit', d) for d in [1, 2, 4, 8, 16, 32, 64]]
+
+    failed = 0
+    for arch, digit in variants:
+        errors  = check_gcm_gfmul(arch, digit, n_vectors=256)
+        failed += len(errors)
+        name    = arch + ('-' + str(digit) if arch == 'digit' else '')
+        if len(errors):
+            print(' >>\tError: GFMUL ' + name + ' model mismatches the reference on ' + str(len(errors)) + ' vectors')
+        else:
+            print(' >>\tOK   : GFMUL ' + name + ' model matches the reference')
+
+    sys.exit(1 if failed else 0)
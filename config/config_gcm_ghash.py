@@ -0,0 +1,432 @@
+from gen_file import write_file
+
+def generate_gcm_ghash(n_lanes=2, filepath='./'):
+    filename = filepath + 'gcm_ghash_lanes.vhd'
+
+    file_lines = []
+    file_lines.append(
+    '''--------------------------------------------------------------------------------
+--! @File name:     gcm_ghash_lanes
+--! @Date:          18/10/2026
+--! @Description:   The module performs GHASH TAG calculation absorbing up to
+--!                 ''' + str(n_lanes) + ''' blocks per clock (lanes). The powers H^1..H^''' + str(n_lanes) + ''' are computed
+--!                 once per key: with k valid lanes, lane i is multiplied by H^(k-i)
+--!                 and the products are added with a xor tree.
+--! @Reference:     FIPS PUB 197, November 26, 2001
+--! @Source:        https://nvlpubs.nist.gov/nistpubs/Legacy/SP/nistspecialpublication800-38d.pdf
+--------------------------------------------------------------------------------
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.aes_pkg.NB_STAGE_C;
+use work.gcm_pkg.all;
+
+--------------------------------------------------------------------------------
+--! Lane 0 is the first block of the stream: it is the most significant block
+--! of the data vectors. Valid lanes are contiguous from lane 0 and only the last
+--! valid lane can have less than 16 valid bytes.
+--------------------------------------------------------------------------------
+entity gcm_ghash_lanes is
+    port(
+        rst_i                       : in  std_logic;
+        clk_i                       : in  std_logic;
+        ghash_pkt_val_i             : in  std_logic;
+        ghash_new_icb_i             : in  std_logic;
+        ghash_new_key_i             : in  std_logic;
+        aes_ecb_val_i               : in  std_logic;
+        aes_ecb_data_i              : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+        ghash_aad_val_i             : in  std_logic;
+        ghash_aad_bval_i            : in  std_logic_vector(''' + str(n_lanes) + ''' * NB_STAGE_C-1 downto 0);
+        ghash_aad_i                 : in  std_logic_vector(''' + str(n_lanes) + ''' * GCM_DATA_WIDTH_C-1 downto 0);
+        ghash_ct_val_i              : in  std_logic;
+        ghash_ct_bval_i             : in  std_logic_vector(''' + str(n_lanes) + ''' * NB_STAGE_C-1 downto 0);
+        ghash_ct_i                  : in  std_logic_vector(''' + str(n_lanes) + ''' * GCM_DATA_WIDTH_C-1 downto 0);
+        ghash_h_loaded_o            : out std_logic;
+        ghash_j0_loaded_o           : out std_logic;
+        ghash_h_pow_ready_o         : out std_logic;
+        ghash_tag_val_o             : out std_logic;
+        ghash_tag_o                 : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0));
+end entity;
+
+--------------------------------------------------------------------------------
+architecture arch_gcm_ghash_lanes of gcm_ghash_lanes is
+
+    --! Constants
+    constant N_LANES_C          : natural := ''' + str(n_lanes) + ''';
+
+    --! Types
+    type lane_data_t is array (0 to N_LANES_C-1) of std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    type lane_len_t  is array (0 to N_LANES_C-1) of natural range 0 to NB_STAGE_C;
+    type h_pow_t     is array (1 to N_LANES_C) of std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+
+    --! Functions
+    --! Number of valid bytes of a left aligned byte valid vector. 0 if the bytes are not contiguous
+    function bval_len(bval : std_logic_vector) return natural is
+        variable bval_v : std_logic_vector(NB_STAGE_C-1 downto 0) := bval;
+        variable len_v  : natural range 0 to NB_STAGE_C := 0;
+    begin
+        for i in NB_STAGE_C-1 downto 0 loop
+            exit when bval_v(i) = '0';
+            len_v := len_v + 1;
+        end loop;
+        for i in NB_STAGE_C-1-len_v downto 0 loop
+            if(bval_v(i) = '1') then
+                return 0;
+            end if;
+        end loop;
+        return len_v;
+    end function;
+
+    --! Mask of the valid bytes of a block
+    function len_mask(len : natural) return std_logic_vector is
+        variable mask_v : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0) := (others => '0');
+    begin
+        for i in 0 to NB_STAGE_C-1 loop
+            if(i < len) then
+                mask_v(GCM_DATA_WIDTH_C-1-8*i downto GCM_DATA_WIDTH_C-8*(i+1)) := (others => '1');
+            end if;
+        end loop;
+        return mask_v;
+    end function;
+
+    --! Signals
+    signal h_pow_q              : h_pow_t;
+    signal pow_cnt_q            : natural range 1 to N_LANES_C;
+    signal pow_ready_q          : std_logic;
+    signal pow_y                : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal J0_q                 : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal j0_tag_q             : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal gf_y                 : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal y_q                  : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal y_val                : std_logic;
+    signal pkt_val_q            : std_logic;
+    signal eop                  : std_logic;
+    signal sop                  : std_logic;
+    signal h_loaded             : std_logic;
+    signal h_loaded_q           : std_logic;
+    signal load_h               : std_logic;
+    signal j0_loaded            : std_logic;
+    signal j0_loaded_q          : std_logic;
+    signal load_j0              : std_logic;
+
+    signal aad_val              : std_logic;
+    signal aad_cnt_q            : std_logic_vector((GCM_DATA_WIDTH_C / 2 - 3)-1 downto 0);
+    signal aad_cnt_en           : std_logic;
+
+    signal ct_val               : std_logic;
+    signal ct_cnt_q             : std_logic_vector((GCM_DATA_WIDTH_C / 2 - 3)-1 downto 0);
+    signal ct_cnt_en            : std_logic;
+
+    signal bval_sel             : std_logic_vector(N_LANES_C * NB_STAGE_C-1 downto 0);
+    signal data_sel             : std_logic_vector(N_LANES_C * GCM_DATA_WIDTH_C-1 downto 0);
+    signal lane_len             : lane_len_t;
+    signal lane_data            : lane_data_t;
+    signal lane_x               : lane_data_t;
+    signal lane_h               : lane_data_t;
+    signal lane_y               : lane_data_t;
+    signal n_val                : natural range 0 to N_LANES_C;
+    signal n_mul                : natural range 0 to N_LANES_C;
+    signal beat_len             : natural range 0 to N_LANES_C * NB_STAGE_C;
+    signal bval_val             : std_logic;
+    signal bval_cnt             : std_logic_vector((GCM_DATA_WIDTH_C / 2 - 3)-1 downto 0);
+    signal cnt_sel              : std_logic_vector((GCM_DATA_WIDTH_C / 2 - 3)-1 downto 0);
+    signal data_val             : std_logic;
+
+    signal bit_cnt              : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal y_prev               : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal j0_val_q             : std_logic;
+    signal cnt_val_q            : std_logic;
+    signal ghash_tag_val_q      : std_logic;
+    signal ghash_tag            : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal ghash_tag_q          : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+
+    --------------------------------------------------------------------------------
+    --! Component declaration
+    --------------------------------------------------------------------------------
+    component ghash_gfmul is
+        port(
+            gf_mult_h_i         : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+            gf_mult_x_i         : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+            gf_mult_y_o         : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0)
+        );
+    end component;
+
+begin
+
+    --------------------------------------------------------------------------------
+    --! Enable H
+    --------------------------------------------------------------------------------
+    enable_h_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            h_loaded_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            h_loaded_q <= h_loaded;
+        end if;
+    end process;
+
+    h_loaded <= not(ghash_new_key_i) and (h_loaded_q or load_h);
+
+    load_h   <= not(h_loaded_q) and aes_ecb_val_i;
+
+    --------------------------------------------------------------------------------
+    --! Get H and compute H^2..H^N, one power per clock
+    --------------------------------------------------------------------------------
+    get_h_pow_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            h_pow_q     <= (others => (others => '0'));
+            pow_cnt_q   <= 1;
+            pow_ready_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            if(ghash_new_key_i = '1') then
+                pow_ready_q <= '0';
+            elsif(load_h = '1') then
+                h_pow_q(1)  <= aes_ecb_data_i;
+                pow_cnt_q   <= 1;
+                pow_ready_q <= '0';
+            elsif(h_loaded_q = '1' and pow_ready_q = '0') then
+                h_pow_q(pow_cnt_q + 1) <= pow_y;
+                if(pow_cnt_q + 1 = N_LANES_C) then
+                    pow_ready_q <= '1';
+                else
+                    pow_cnt_q   <= pow_cnt_q + 1;
+                end if;
+            end if;
+        end if;
+    end process;
+
+    u_ghash_gfmul_pow: ghash_gfmul
+        port map(
+            gf_mult_h_i => h_pow_q(1),
+            gf_mult_x_i => h_pow_q(pow_cnt_q),
+            gf_mult_y_o => pow_y);
+
+    --------------------------------------------------------------------------------
+    --! Enable J0
+    --------------------------------------------------------------------------------
+    enable_j0_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            j0_loaded_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            j0_loaded_q <= j0_loaded;
+        end if;
+    end process;
+
+    j0_loaded <= not(ghash_new_key_i or ghash_new_icb_i) and (j0_loaded_q or load_j0);
+
+    --------------------------------------------------------------------------------
+    --! Get J0
+    --------------------------------------------------------------------------------
+    get_j0_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            J0_q <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            if(load_j0 = '1') then
+                J0_q <= aes_ecb_data_i;
+            end if;
+        end if;
+    end process;
+
+    load_j0 <= not(j0_loaded_q) and aes_ecb_val_i and h_loaded_q;
+
+    --------------------------------------------------------------------------------
+    --! J0 of the TAG: sampled at the start of the packet. J0_q is free to take the
+    --! J0 of the next IV while the TAG of the packet is computed
+    --------------------------------------------------------------------------------
+    get_j0_tag_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            j0_tag_q <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            if(sop = '1') then
+                j0_tag_q <= J0_q;
+            end if;
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------------
+    --! Ghash next packet
+    --------------------------------------------------------------------------------
+    ghash_next_pkt_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            y_q <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            --! Save Y to xor with the next incoming X value. Y is cleared once the TAG
+            --! of the packet is sampled: the next packet starts from 0 even when its
+            --! first block comes after the start of the packet
+            if(y_val = '1') then
+                y_q <= gf_y;
+            elsif(j0_val_q = '1') then
+                y_q <= (others => '0');
+            end if;
+        end if;
+    end process;
+
+    y_val <= cnt_val_q or aad_val or ct_val;
+
+    --------------------------------------------------------------------------------
+    --! aad lenght
+    --------------------------------------------------------------------------------
+    aad_length_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            aad_cnt_q <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            if(aad_cnt_en = '1') then
+                aad_cnt_q <= bval_cnt;
+            end if;
+        end if;
+    end process;
+
+    aad_val    <= ghash_aad_val_i and bval_val;
+    aad_cnt_en <= j0_val_q or aad_val;
+
+    --------------------------------------------------------------------------------
+    --! cipher text lenght
+    --------------------------------------------------------------------------------
+    ct_length_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            ct_cnt_q <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            if(ct_cnt_en = '1') then
+                ct_cnt_q <= bval_cnt;
+            end if;
+        end if;
+    end process;
+
+    ct_val    <= ghash_ct_val_i and bval_val;
+    ct_cnt_en <= j0_val_q or ct_val;
+
+    --------------------------------------------------------------------------------
+    --! Split the data in lanes and calculate the length of each lane
+    --------------------------------------------------------------------------------
+    bval_sel <= ghash_aad_bval_i when (ghash_aad_val_i = '1') else ghash_ct_bval_i;
+    data_sel <= ghash_aad_i      when (ghash_aad_val_i = '1') else ghash_ct_i;
+
+    gen_lanes: for i in 0 to N_LANES_C-1 generate
+        lane_len(i)  <= bval_len(bval_sel((N_LANES_C-i) * NB_STAGE_C-1 downto (N_LANES_C-1-i) * NB_STAGE_C));
+        lane_data(i) <= data_sel((N_LANES_C-i) * GCM_DATA_WIDTH_C-1 downto (N_LANES_C-1-i) * GCM_DATA_WIDTH_C) and
+                        len_mask(lane_len(i));
+    end generate gen_lanes;
+
+    lane_cnt_p : process(lane_len)
+        variable n_v   : natural range 0 to N_LANES_C;
+        variable len_v : natural range 0 to N_LANES_C * NB_STAGE_C;
+    begin
+        n_v   := 0;
+        len_v := 0;
+        for i in 0 to N_LANES_C-1 loop
+            if(lane_len(i) /= 0) then
+                n_v := n_v + 1;
+            end if;
+            len_v := len_v + lane_len(i);
+        end loop;
+        n_val    <= n_v;
+        beat_len <= len_v;
+    end process;
+
+    bval_val <= '1' when (n_val /= 0) else '0';
+
+    bval_cnt <= (others => '0') when (j0_val_q = '1') else
+                    std_logic_vector(unsigned(cnt_sel) + to_unsigned(beat_len, bval_cnt'length));
+
+    cnt_sel  <= aad_cnt_q when (ghash_aad_val_i = '1') else ct_cnt_q;
+
+    --------------------------------------------------------------------------------
+    --! Bit counter: minimum size increment is 1 byte
+    bit_cnt  <= aad_cnt_q & "000" & ct_cnt_q & "000";
+
+    data_val <= ghash_aad_val_i or ghash_ct_val_i;
+
+    --! Output from the previous gfmul
+    y_prev   <= (others => '0') when (sop = '1') else y_q;
+
+    --! The length block is absorbed alone in lane 0
+    n_mul    <= n_val when (data_val = '1') else 1;
+
+    --! Start/End of packet
+    sop      <= ghash_pkt_val_i and not(pkt_val_q);
+    eop      <= pkt_val_q and not(ghash_pkt_val_i);
+
+    --------------------------------------------------------------------------------
+    --! Lane i of k valid lanes: (X_i xor Y) * H^(k-i) for lane 0, X_i * H^(k-i) otherwise
+    --------------------------------------------------------------------------------
+    lane_x(0) <= (lane_data(0) xor y_prev) when (data_val = '1') else (bit_cnt xor y_prev);
+
+    gen_lane_x: for i in 1 to N_LANES_C-1 generate
+        lane_x(i) <= lane_data(i) when (data_val = '1') else (others => '0');
+    end generate gen_lane_x;
+
+    gen_lane_gfmul: for i in 0 to N_LANES_C-1 generate
+        lane_h(i) <= h_pow_q(n_mul - i) when (i < n_mul) else (others => '0');
+
+        u_ghash_gfmul: ghash_gfmul
+            port map(
+                gf_mult_h_i => lane_h(i),
+                gf_mult_x_i => lane_x(i),
+                gf_mult_y_o => lane_y(i));
+    end generate gen_lane_gfmul;
+
+    xor_tree_p : process(lane_y)
+        variable y_v : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    begin
+        y_v := (others => '0');
+        for i in 0 to N_LANES_C-1 loop
+            y_v := y_v xor lane_y(i);
+        end loop;
+        gf_y <= y_v;
+    end process;
+
+    --------------------------------------------------------------------------------
+    --! Sample the ghash tag
+    --------------------------------------------------------------------------------
+    sample_tag_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            ghash_tag_q <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            if(j0_val_q = '1') then
+                ghash_tag_q <= ghash_tag;
+            end if;
+        end if;
+    end process;
+
+    --! TAG update result
+    ghash_tag <= y_q xor j0_tag_q;
+
+    --------------------------------------------------------------------------------
+    --! Sample valid signals
+    --------------------------------------------------------------------------------
+    ghash_tag_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            pkt_val_q       <= '0';
+            cnt_val_q       <= '0';
+            j0_val_q        <= '0';
+            ghash_tag_val_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            pkt_val_q       <= ghash_pkt_val_i;
+            cnt_val_q       <= eop;
+            j0_val_q        <= cnt_val_q;
+            ghash_tag_val_q <= j0_val_q;
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------------
+    ghash_h_loaded_o    <= h_loaded_q;
+    ghash_j0_loaded_o   <= j0_loaded_q;
+    ghash_h_pow_ready_o <= pow_ready_q;
+    ghash_tag_val_o     <= ghash_tag_val_q;
+    ghash_tag_o         <= ghash_tag_q;
+
+end architecture;
+''')
+
+    write_file(filename, "\n".join(file_lines))
+
+    return filename
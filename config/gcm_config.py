@@ -1,5 +1,7 @@
 import gcm_utils as gu
 
+from gcm_syn import syn_estimate
+
 if __name__ == "__main__":
 
     gen_base_path = '../src/'
@@ -17,3 +19,7 @@ if __name__ == "__main__":
     print(' >>\tOK   : AES-GCM IP configured as:')
     for key, value in conf.conf_param.items():
         print((' >>\tOK   : ' + key).ljust(26) + ': ' + str(value))
+
+    # Estimate the area and the logic depth of the generated blocks
+    if conf.args.syn == True:
+        syn_estimate(conf, gen_base_path + 'gen_rtl/')
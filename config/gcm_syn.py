@@ -0,0 +1,97 @@
+import os
+import re
+import json
+import shutil
+import subprocess
+
+# Folder of the synthesis results, one sub-folder per configuration hash
+SYN_BUILD  = os.path.dirname(os.path.abspath(__file__)) + '/../syn/build/'
+
+# Source folder of the files that are not generated
+SRC_PATH   = os.path.dirname(os.path.abspath(__file__)) + '/../src/'
+
+# Yosys plugin of the GHDL synthesis
+SYN_PLUGIN = os.environ.get('GHDL_YOSYS_PLUGIN', 'ghdl')
+
+# Synthesised entities: packages in src and generated files
+SYN_UNITS  = {'aes_round'   : (['aes_pkg.vhd', 'aes_func.vhd'], ['aes_round.vhd']),
+              'ghash_gfmul' : (['aes_pkg.vhd', 'gcm_pkg.vhd'],  ['ghash_gfmul.vhd'])}
+
+
+# ======================================================================================
+def syn_script(top, files, logpath):
+    '''
+    Yosys script: GHDL elaboration of the top, generic synthesis, flattened,
+    then the cell statistics and the longest topological path without the FFs '''
+
+    return '; '.join([  'ghdl -fexplicit --ieee=synopsys ' + ' '.join(files) + ' -e ' + top,
+                        'synth -flatten -top ' + top,
+                        'tee -q -o ' + logpath + top + '_stat.json stat -json',
+                        'tee -q -o ' + logpath + top + '_ltp.log ltp -noff'])
+
+
+# ======================================================================================
+def syn_report(top, logpath):
+    '''
+    Read the statistics of a synthesised entity:
+      * cells : number of generic cells
+      * ffs   : number of flip-flops and latches
+      * depth : number of cells of the longest combinational path '''
+
+    with open(logpath + top + '_stat.json', 'r') as stat_file:
+        stat = json.load(stat_file)
+
+    design = stat.get('design', next(iter(stat['modules'].values())))
+    cells  = design['num_cells_by_type']
+
+    with open(logpath + top + '_ltp.log', 'r') as ltp_file:
+        depth = re.search(r"length=(\d+)", ltp_file.read())
+
+    return {'cells' : design['num_cells'],
+            'ffs'   : sum(n for c, n in cells.items() if 'DFF' in c or 'DLATCH' in c),
+            'depth' : int(depth.group(1)) if depth != None else None}
+
+
+# ======================================================================================
+def syn_estimate(conf, rtl_path):
+    '''
+    Synthesise aes_round and ghash_gfmul of the configuration with GHDL and yosys.
+    rtl_path is the folder of the generated files. The results are cached in
+    syn/build/<hash>/syn.json by configuration hash. Return the results of each
+    entity, or None when yosys is not installed or the synthesis fails '''
+
+    cachepath = SYN_BUILD + conf.conf_hash() + '/'
+
+    if os.path.exists(cachepath + 'syn.json'):
+        with open(cachepath + 'syn.json', 'r') as syn_file:
+            print(' >>\tOK   : Synthesis results found in the cache ' + cachepath)
+            return json.load(syn_file)
+
+    if shutil.which('yosys') == None:
+        print(' >>\tError: yosys is not installed, the synthesis estimate is skipped')
+        return None
+
+    logpath = cachepath + 'log/'
+    os.makedirs(logpath, exist_ok=True)
+
+    results = {}
+    for top, (packages, gen_files) in SYN_UNITS.items():
+        files  = [SRC_PATH + f for f in packages] + [rtl_path + f for f in gen_files]
+        script = syn_script(top, files, logpath)
+
+        with open(logpath + top + '.log', 'w') as log_file:
+            ret = subprocess.call(['yosys', '-m', SYN_PLUGIN, '-p', script],
+                                  cwd=logpath, stdout=log_file, stderr=subprocess.STDOUT)
+
+        if ret != 0:
+            print(' >>\tError: synthesis of ' + top + ' failed, see ' + logpath + top + '.log')
+            return None
+
+        results[top] = syn_report(top, logpath)
+        print((' >>\tOK   : ' + top).ljust(26) + ': ' + ', '.join(f'{k} {v}' for k, v in results[top].items()))
+
+    # Write the results once all the entities are synthesised: a failed run is not cached
+    with open(cachepath + 'syn.json', 'w') as syn_file:
+        json.dump(results, syn_file, indent=4)
+
+    return results
@@ -1,14 +1,19 @@
 import os
 import sys
 import json
+import glob
+import hashlib
 import argparse
 import random
+import shutil
 
 from config_aes_round  import generate_aes_round
 from config_aes_ecb    import generate_aes_ecb
 from config_aes_kexp   import generate_aes_kexp_logic
 from config_aes_kprexp import generate_aes_pre_exp_key
 from config_aes_top    import generate_aes_top
+from config_gcm_ghash  import generate_gcm_ghash
+from config_gcm_gfmul  import generate_gcm_gfmul
 from argparse          import RawTextHelpFormatter
 
 RANDOM_PARAM = 'RANDOM'
@@ -22,8 +27,21 @@ class aes_conf(object):
     ip_ed     = ['enc', 'dec']
     ip_size   = ['XS', 'S', 'M', 'L']
     ip_pipe   = range(0, 8)
+    ip_lanes  = [1, 2, 4, 8]
+    ip_gfmul  = ['schoolbook', 'karatsuba1', 'karatsuba2', 'digit']
+    ip_digit  = [1, 2, 4, 8, 16, 32, 64]
+    ip_gf_reg = range(0, 4)
+    ip_slots  = [1, 2, 4, 8]
+    ip_fifo   = [0, 2, 4, 8, 16, 32]
     test_size = ['short', 'medium', 'long']
 
+    # Unit test modules and their toplevel entity
+    unit_toplevel = {'gcm_gfmul_test' : 'ghash_gfmul', 'gcm_round_test' : 'tb_aes_round'}
+
+    # Parameters that change the generated RTL
+    ip_conf_param = ['aes_mode', 'n_rounds', 'pipes_in_core', 'key_pre_exp', 'n_gfmul_ip', 'ghash_lanes', 'lanes',
+                     'gfmul_arch', 'gfmul_digit', 'gfmul_stages', 'key_slots', 'ks_fifo_depth']
+
 
     # ======================================================================================
     def __init__(self, basepath='./', config_ip_only = True):
@@ -69,6 +87,47 @@ class aes_conf(object):
                             type=int, default=1, metavar='GFMUL', choices=range(1,3),
                             help='Specify 1 (default) or 2 GFMUL IP in the GHASH block.')
 
+        self.parser.add_argument('-l', '--ghash-lanes',
+                            type=int, default=None, metavar='N', choices=self.ip_lanes,
+                            help='Set the number of blocks absorbed per clock by the GHASH: 1 (default), 2, 4 or 8.\
+                            \nWith N > 1 the powers H^1..H^N are computed once per key and N GFMUL IPs are instantiated.\
+                            \nThe multi-lane GHASH is only instantiated by the wide top: N must be equal to the lanes of \'-L\'.')
+
+        self.parser.add_argument('-L', '--lanes',
+                            type=int, default=None, metavar='N', choices=self.ip_lanes,
+                            help='Set the number of blocks encrypted per clock: 1 (default), 2, 4 or 8.\
+                            \nWith N > 1 the data buses are N blocks wide, N aes_ecb pipelines are instantiated\
+                            \nand the GHASH has N lanes.')
+
+        self.parser.add_argument('-G', '--gfmul',
+                            type=str.lower, default=None, metavar='ARCH', choices=self.ip_gfmul,
+                            help='Set the architecture of the GFMUL IP: schoolbook (default), karatsuba1,\
+                            \nkaratsuba2 (1 or 2 levels of Karatsuba) or digit (digit-serial, unrolled).')
+
+        self.parser.add_argument('-D', '--gfmul-digit',
+                            type=int, default=None, metavar='D', choices=self.ip_digit,
+                            help='Set the digit size of the digit-serial GFMUL IP: 1, 2, 4, 8 (default), 16, 32 or 64 bits.')
+
+        self.parser.add_argument('-S', '--gfmul-stages',
+                            type=int, default=None, metavar='N', choices=self.ip_gf_reg,
+                            help='Set the number of register stages in the GFMUL IP: 0 (default) to 3.\
+                            \nThe GHASH needs a product per clock: N > 0 is only allowed with the unit test gcm_gfmul_test.')
+
+        self.parser.add_argument('-K', '--key-slots',
+                            type=int, default=None, metavar='N', choices=self.ip_slots,
+                            help='Set the number of keys stored in the IP: 1 (default), 2, 4 or 8.\
+                            \nWith N > 1 each slot keeps its key and its H, and the input aes_gcm_key_slot_i selects the slot of a packet.')
+
+        self.parser.add_argument('-F', '--ks-fifo',
+                            type=int, default=None, metavar='N', choices=self.ip_fifo,
+                            help='Set the depth of the key stream FIFO: 0 (default, no FIFO), 2, 4, 8, 16 or 32 blocks.\
+                            \nThe ECB encrypts up to N counters ahead of the PT: a gap in the PT does not stall the AES pipeline.')
+
+        self.parser.add_argument('-Y', '--syn',
+                            action='store_true',
+                            help='Estimate the cells, the FFs and the logic depth of aes_round and ghash_gfmul with GHDL and yosys.\
+                            \nThe results are cached in syn/build/<hash>/ by configuration hash.')
+
 
         if self.config_ip_only == True:
             return
@@ -90,6 +149,11 @@ class aes_conf(object):
                             type=str.upper, metavar='IV',
                             help='Load a specific IV')
 
+        self.parser.add_argument('-I', '--iv-bytes',
+                            type=int, default=None, metavar='N',
+                            help='Number of IV bytes. The 96-bit IV (12) is loaded in a clock, the other lengths are hashed into J0.\
+                            \n0 (default) draws the length of each packet, a user IV is 96 bit long unless N is given.')
+
         self.parser.add_argument('-a', '--aad',
                             type=str.upper, metavar='AAD',
                             help='Load a specific stream of AAD data; \'empty\' loads 0 AAD bytes')
@@ -122,10 +186,41 @@ class aes_conf(object):
                             default=None, metavar='SIZE', choices=self.test_size,
                             help='Set the maximum number of byte that can be generated for the AAD and the PT: short (2^10-1), medium (2^16-1), long (2^32-1)')
 
+        self.parser.add_argument('-o', '--module',
+                            type=str, default=None, metavar='MODULE',
+                            help='Run the cocotb tests of MODULE instead of gcm_test, e.g. gcm_bench_test or gcm_setup_test.\
+                            \nThe unit tests gcm_gfmul_test and gcm_round_test run on ghash_gfmul and on a single aes_round.')
+
         self.parser.add_argument('-z', '--verbose',
                             action='store_true',
                             help='increase output verbosity.')
 
+        self.parser.add_argument('-q', '--n-pkt',
+                            type=int, default=None, metavar='K',
+                            help='Send K packets back-to-back in the same simulation. Each packet has its own Key, IV, AAD and PT.')
+
+        self.parser.add_argument('-j', '--jobs',
+                            type=int, default=1, metavar='N',
+                            help='Run up to N tests in parallel. Each test is built and run in its own work directory.')
+
+        self.parser.add_argument('-y', '--model',
+                            type=str.lower, default=None, choices=['crypto', 'ref'],
+                            help='Reference model: crypto (default) uses pycryptodome, ref the pure Python model of gcm_ref.py.')
+
+        self.parser.add_argument('-Q', '--queue',
+                            default=None, action='store_true',
+                            help='Queue the IV and the start of the next packet while a packet is processed: its counter blocks\
+                            \nfollow the last block of the packet in the AES pipeline. The packets keep the Key of the first one.')
+
+        self.parser.add_argument('-u', '--perf',
+                            type=float, nargs='?', const=10.0, default=None, metavar='TOL',
+                            help='Disable the random delays and fail the test if the DUT throughput or latency miss the expected values by more than TOL percent (10 by default).')
+
+        self.parser.add_argument('-W', '--delays',
+                            type=int, default=None, metavar='MASK',
+                            help='Turn on the random delays of MASK in every packet, e.g. 1 delays the first AAD block after the start of the packet.\
+                            \nThe other delays are still drawn for each packet. See config_data in tb/gcm_gctr.py for the bits.')
+
 
     # ======================================================================================
     def create_seed(self):
@@ -134,8 +229,9 @@ class aes_conf(object):
 
     # ======================================================================================
     def wipe_dir(self, dir):
-        os.system('rm -rv ' + dir)
-        os.system('mkdir -v ' + dir)
+        shutil.rmtree(dir, ignore_errors=True)
+        os.makedirs(dir)
+        print(' >>\tOK   : Folder ' + dir + ' has been wiped')
 
 
     # ======================================================================================
@@ -181,6 +277,21 @@ class aes_conf(object):
         self.set_default_value( self.args.data     , self.args.seed , 'data'      , RANDOM_PARAM )
         self.set_default_value( self.args.ed       , self.args.seed , 'enc_dec'   , 'enc'        )
         self.set_default_value( self.args.compiler , self.args.seed , 'compiler'  , 'ghdl'       )
+        self.set_default_value( self.args.n_pkt    , self.args.seed , 'n_pkt'     , 1            )
+        self.set_default_value( self.args.perf     , self.args.seed , 'perf_tol'  , None         )
+        self.set_default_value( self.args.model    , self.args.seed , 'model'     , 'crypto'     )
+        self.set_default_value( self.args.queue    , self.args.seed , 'queue_pkt' , False        )
+        self.set_default_value( self.args.iv_bytes , self.args.seed , 'iv_n_bytes', 0            )
+        self.set_default_value( self.args.delays   , self.args.seed , 'delays_on' , 0            )
+
+        if self.conf_param.get('iv_n_bytes', 0) < 0:
+            sys.exit(" >>\tError: the number of IV bytes cannot be negative")
+
+        if self.conf_param.get('delays_on', 0) not in range(32):
+            sys.exit(" >>\tError: the delay mask must be between 0 and 31")
+
+        if self.conf_param.get('delays_on', 0) and self.conf_param.get('perf_tol') != None:
+            sys.exit(" >>\tError: the performance check disables the random delays: \'-W\' is not allowed with \'-u\'")
 
         self.conf_param['max_n_byte'] = test_size[self.conf_param['test_size']]
 
@@ -206,10 +317,46 @@ class aes_conf(object):
         else:
             seed = None
 
-        self.set_default_value( self.args.size   , seed , 'aes_size'      , 'XS'  )
-        self.set_default_value( self.args.mode   , seed , 'aes_mode'      , '128' )
-        self.set_default_value( self.args.pipe   , seed , 'pipes_in_core' , 0     )
-        self.set_default_value( self.args.ngfmul , seed , 'n_gfmul_ip'    , 1     )
+        self.set_default_value( self.args.size         , seed , 'aes_size'      , 'XS'         )
+        self.set_default_value( self.args.mode         , seed , 'aes_mode'      , '128'        )
+        self.set_default_value( self.args.pipe         , seed , 'pipes_in_core' , 0            )
+        self.set_default_value( self.args.ngfmul       , seed , 'n_gfmul_ip'    , 1            )
+        self.set_default_value( self.args.ghash_lanes  , seed , 'ghash_lanes'   , 1            )
+        self.set_default_value( self.args.lanes        , seed , 'lanes'         , 1            )
+        self.set_default_value( self.args.gfmul        , seed , 'gfmul_arch'    , 'schoolbook' )
+        self.set_default_value( self.args.gfmul_digit  , seed , 'gfmul_digit'   , 8            )
+        self.set_default_value( self.args.gfmul_stages , seed , 'gfmul_stages'  , 0            )
+        self.set_default_value( self.args.key_slots    , seed , 'key_slots'     , 1            )
+        self.set_default_value( self.args.ks_fifo      , seed , 'ks_fifo_depth' , 0            )
+
+        # Y = (Y xor X) * H is computed in a clock: a register in the GFMUL would break the loop
+        if self.conf_param.get('gfmul_stages', 0) > 0 and getattr(self.args, 'module', None) != 'gcm_gfmul_test':
+            sys.exit(" >>\tError: the GHASH needs a combinational GFMUL IP: register stages are only allowed for the standalone GFMUL")
+
+        # A queued packet keeps the Key and the key slot of the packet in progress
+        if self.conf_param.get('queue_pkt', False) and self.conf_param.get('key_slots', 1) != 1:
+            sys.exit(" >>\tError: the packets cannot be queued with more key slots")
+
+        # The wide top absorbs a block per lane in the GHASH
+        if self.conf_param.get('lanes', 1) > 1:
+            if self.args.ghash_lanes not in [None, self.conf_param['lanes']]:
+                sys.exit(" >>\tError: the GHASH lanes must be equal to the lanes of the IP")
+            if self.conf_param['n_gfmul_ip'] != 1:
+                sys.exit(" >>\tError: the GFMUL IP cannot be split when the IP has more lanes")
+            if self.conf_param.get('key_slots', 1) != 1:
+                sys.exit(" >>\tError: the key slots are not supported when the IP has more lanes")
+            if self.conf_param.get('queue_pkt', False):
+                sys.exit(" >>\tError: the packets cannot be queued when the IP has more lanes")
+            if self.conf_param.get('ks_fifo_depth', 0) != 0:
+                sys.exit(" >>\tError: the key stream FIFO is not supported when the IP has more lanes")
+            if getattr(self.args, 'iv_bytes', None) not in [None, 12]:
+                sys.exit(" >>\tError: the IV must be 96 bit long when the IP has more lanes")
+            self.conf_param['iv_n_bytes'] = 12
+            self.conf_param['ghash_lanes'] = self.conf_param['lanes']
+
+        # aes_gcm has a single lane GHASH: a multi-lane GHASH would be generated and not used
+        elif self.conf_param.get('ghash_lanes', 1) > 1:
+            sys.exit(" >>\tError: the GHASH lanes must be equal to the lanes of the IP: set \'-L\' too")
 
 
         if self.conf_param['aes_size'] == 'XS':
@@ -231,31 +378,57 @@ class aes_conf(object):
 
 
     # ======================================================================================
-    def cocotb_params(self):
+    def cocotb_params(self, workpath=None, buildpath=None):
+        # The work path isolates the simulation build, the results and the configuration
+        # file of a test from the tests running in parallel. The build path contains the
+        # generated files. The simulation build is always in the work path: the build path
+        # is shared and its libraries are only copied to and from the cache by the runner
+        if workpath == None:
+            workpath = self.basepath
+        if buildpath == None:
+            buildpath = workpath
+
         config  = ''
         config += ' COCOTB_LOG_LEVEL=' + self.conf_param['verbose']
         config += ' RANDOM_SEED=' + str(self.conf_param['seed'])
         config += ' SIM=' + self.conf_param['compiler']
 
+        # The test module is not saved in the configuration file
+        if self.args.module != None:
+            config += ' MODULE=' + self.args.module
+            if self.args.module in self.unit_toplevel:
+                config += ' TOPLEVEL=' + self.unit_toplevel[self.args.module]
+
+        if buildpath != self.basepath:
+            config += ' BUILDIR=' + os.path.abspath(buildpath) + '/gen_rtl'
+
+        if workpath != self.basepath:
+            config += ' SIM_BUILD=' + os.path.abspath(workpath) + '/sim_build'
+            workpath = os.path.abspath(workpath) + '/'
+            config += ' COCOTB_RESULTS_FILE=' + workpath + 'results.xml'
+            config += ' GCM_TMP_DIR=' + workpath + 'tmp/'
+
         # Gui setting is not saved in the configuration file
         if self.args.gui != None:
             config += ' WAVE_ON=true'
-            config += ' DUMP_FILENAME=' + self.basepath + 'tmp/' + self.args.gui + '.ghw'
+            config += ' DUMP_FILENAME=' + workpath + 'tmp/' + self.args.gui + '.ghw'
         return config
 
 
     # ======================================================================================
-    def save_configuration(self):
+    def save_configuration(self, workpath=None):
+        if workpath == None:
+            workpath = self.basepath
+
         # Save the verbosity
         store_verb = self.conf_param['verbose']
 
         # Do not save the verbosity
         del self.conf_param['verbose']
 
-        if os.path.exists('./tmp') == False:
-           os.system('mkdir -v tmp')
+        os.makedirs(workpath + 'tmp', exist_ok=True)
 
-        with open(self.basepath + 'tmp/' + str(self.conf_param['seed']) + '.json', 'w') as config_file:
+        with open(workpath + 'tmp/' + str(self.conf_param['seed']) + '.json', 'w') as config_file:
             json.dump(self.conf_param, config_file, indent=4)
             config_file.close()
 
@@ -264,36 +437,111 @@ class aes_conf(object):
 
 
     # ======================================================================================
-    def generate_templated_file(self):
-        # Clean paths
-        gen_rtl_path = str(self.basepath) + 'gen_rtl/'
-        os.system('rm -rv '   + gen_rtl_path)
-        os.system('mkdir -v ' + gen_rtl_path)
+    def generate_templated_file(self, workpath=None):
+        if workpath == None:
+            workpath = self.basepath
+
+        # The files are generated in place: only the files whose content changes are
+        # rewritten, the others keep their modification time
+        gen_rtl_path = str(workpath) + 'gen_rtl/'
+        os.makedirs(gen_rtl_path, exist_ok=True)
+
+        files = []
 
         # Generate the number of pipe stages in the round core file
-        generate_aes_round( self.conf_param['pipes_in_core'],
-                            gen_rtl_path)
+        files += [generate_aes_round( self.conf_param['pipes_in_core'],
+                                      gen_rtl_path)]
 
-        # Generate the aes_kexp file
+        # Generate the aes_kexp file. The pre-expanded keys are stored per key slot, the
+        # expansion logic expands the key of the slot selected in aes_ecb
         if self.conf_param['key_pre_exp'] == True:
-            generate_aes_key = generate_aes_pre_exp_key
+            files += [generate_aes_pre_exp_key( self.conf_param['aes_mode'],
+                                                self.conf_param['n_rounds'],
+                                                gen_rtl_path,
+                                                self.conf_param.get('key_slots', 1))]
         else:
-            generate_aes_key = generate_aes_kexp_logic
-
-        generate_aes_key( self.conf_param['aes_mode'],
-                          self.conf_param['n_rounds'],
-                          gen_rtl_path)
+            files += [generate_aes_kexp_logic(  self.conf_param['aes_mode'],
+                                                self.conf_param['n_rounds'],
+                                                gen_rtl_path)]
 
         # Generate the ecb file
-        generate_aes_ecb( self.conf_param['key_pre_exp'],
-                          gen_rtl_path)
+        files += [generate_aes_ecb( self.conf_param['key_pre_exp'],
+                                    gen_rtl_path,
+                                    self.conf_param.get('key_slots', 1))]
 
         # Generate the top entity file
-        generate_aes_top( self.conf_param['aes_mode'],
-                          self.conf_param['n_rounds'],
-                          self.conf_param['pipes_in_core'],
-                          self.conf_param['n_gfmul_ip']-1,
-                          gen_rtl_path)
+        files += [generate_aes_top( self.conf_param['aes_mode'],
+                                    self.conf_param['n_rounds'],
+                                    self.conf_param['pipes_in_core'],
+                                    self.conf_param['n_gfmul_ip']-1,
+                                    gen_rtl_path,
+                                    self.conf_param.get('lanes', 1),
+                                    self.conf_param.get('key_slots', 1),
+                                    self.conf_param.get('ks_fifo_depth', 0))]
+
+        # Generate the GF multiplier file
+        files += [generate_gcm_gfmul( self.conf_param.get('gfmul_arch', 'schoolbook'),
+                                      self.conf_param.get('gfmul_stages', 0),
+                                      self.conf_param.get('gfmul_digit', 8),
+                                      gen_rtl_path)]
+
+        # Generate the multi-lane GHASH file
+        if self.conf_param.get('ghash_lanes', 1) > 1:
+            files += [generate_gcm_ghash( self.conf_param['ghash_lanes'],
+                                          gen_rtl_path)]
+
+        # Remove the files of a previous configuration that are not generated anymore
+        for f in sorted(os.listdir(gen_rtl_path)):
+            if gen_rtl_path + f not in files and os.path.isfile(gen_rtl_path + f):
+                os.remove(gen_rtl_path + f)
+                print(' >>\tOK   : File ' + gen_rtl_path + f + ' has been removed')
+
+    # ======================================================================================
+    def conf_hash(self):
+        '''
+        Hash of the IP configuration, of the simulator and of the files the build
+        depends on: sources, generators, testbench HDL and Makefile. Configurations
+        with the same hash produce the same RTL and the same compiled libraries '''
+
+        conf_path = os.path.dirname(os.path.abspath(__file__)) + '/'
+        files     = sorted(glob.glob(conf_path + '../src/*.vhd')) + \
+                    sorted(glob.glob(conf_path + 'config_*.py')) + \
+                    [conf_path + 'gen_file.py', conf_path + 'gcm_utils.py'] + \
+                    sorted(glob.glob(conf_path + '../tb/hdl/*.vhd')) + \
+                    [conf_path + '../tb/Makefile']
+
+        h = hashlib.sha1()
+        h.update(json.dumps([self.conf_param.get(p) for p in self.ip_conf_param]).encode())
+        h.update(json.dumps(self.conf_param.get('compiler')).encode())
+        for f in files:
+            with open(f, 'rb') as fp:
+                h.update(fp.read())
+
+        return h.hexdigest()[:16]
+
+
+    # ======================================================================================
+    def cache_path(self):
+        return self.basepath + 'build/' + self.conf_hash() + '/'
+
+
+    # ======================================================================================
+    def generate_cached_file(self, cachepath):
+        '''
+        Generate the files from the python templates only if the cache does not
+        contain them yet. Return True when the files are found in the cache '''
+
+        if os.path.exists(cachepath + 'gen_rtl/'):
+            print(' >>\tOK   : Files found in the cache ' + cachepath + 'gen_rtl/')
+            return True
+
+        # Generate in a temporary folder: a partially generated folder is never used
+        self.generate_templated_file(cachepath + 'new/')
+        os.rename(cachepath + 'new/gen_rtl/', cachepath + 'gen_rtl/')
+        os.rmdir(cachepath + 'new/')
+
+        return False
+
 
     # ======================================================================================
     def set_default_value(self, arg, seed, pname, value):
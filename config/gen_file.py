@@ -0,0 +1,31 @@
+import os
+import sys
+import hashlib
+
+
+# ======================================================================================
+def write_file(filename, content):
+    '''
+    Write the rendered content in filename only if it differs from the file on disk:
+    an unchanged file keeps its modification time and is not analysed again.
+    The content is written in a temporary file and renamed, so the file is never
+    partially written. Return True when the file has been written '''
+
+    data = content.encode()
+
+    if os.path.isfile(filename):
+        with open(filename, 'rb') as fp:
+            if hashlib.sha1(fp.read()).digest() == hashlib.sha1(data).digest():
+                print(' >>\tOK   : File ' + filename + ' is up to date')
+                return False
+
+    try:
+        with open(filename + '.tmp', 'wb') as fp:
+            fp.write(data)
+        os.replace(filename + '.tmp', filename)
+        print(' >>\tOK   : File ' + filename + ' has been successfully generated')
+    except:
+        print(' >>\tError: File ' + filename + ' could not be generated')
+        sys.exit()
+
+    return True
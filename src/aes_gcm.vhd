@@ -17,7 +17,9 @@ entity aes_gcm is
     generic(
         aes_gcm_mode_g              : std_logic_vector(1 downto 0)  := AES_MODE_128_C;
         aes_gcm_n_rounds_g          : natural range 0 to NR_256_C   := NR_128_C;
-        aes_gcm_split_gfmul         : natural range 0 to 1          := 0);
+        aes_gcm_split_gfmul         : natural range 0 to 1          := 0;
+        aes_gcm_key_slots_g         : natural range 1 to 8          := 1;
+        aes_gcm_ks_fifo_g           : natural range 0 to 32         := 0);
     port(
         rst_i                       : in  std_logic;
         clk_i                       : in  std_logic;
@@ -26,8 +28,11 @@ entity aes_gcm is
         aes_gcm_pipe_reset_i        : in  std_logic;
         aes_gcm_key_word_val_i      : in  std_logic_vector(3 downto 0);
         aes_gcm_key_word_i          : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+        aes_gcm_key_slot_i          : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);
         aes_gcm_iv_val_i            : in  std_logic;
         aes_gcm_iv_i                : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+        aes_gcm_icb_n_blocks_i      : in  std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+        aes_gcm_iv_hash_i           : in  std_logic;
         aes_gcm_icb_start_cnt_i     : in  std_logic;
         aes_gcm_icb_stop_cnt_i      : in  std_logic;
         aes_gcm_ghash_pkt_val_i     : in  std_logic;
@@ -64,6 +69,9 @@ architecture arch_aes_gcm of aes_gcm is
     signal ghash_aad_val          : std_logic;
     signal ghash_ct_val           : std_logic;
     signal ghash_new_key          : std_logic;
+    signal ghash_new_icb          : std_logic;
+    signal ghash_j0_val           : std_logic;
+    signal ghash_j0               : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
 
     --------------------------------------------------------------------------------
     --! Component declaration
@@ -71,15 +79,19 @@ architecture arch_aes_gcm of aes_gcm is
     component gcm_gctr is
         generic(
             gctr_mode_g                 : std_logic_vector(1 downto 0)  := AES_MODE_128_C;
-            gctr_n_rounds_g             : natural range 0 to NR_256_C   := NR_128_C);
+            gctr_n_rounds_g             : natural range 0 to NR_256_C   := NR_128_C;
+            gctr_ks_fifo_g              : natural range 0 to 32         := 0);
         port(
             rst_i                       : in  std_logic;
             clk_i                       : in  std_logic;
             gctr_mode_i                 : in  std_logic_vector(1 downto 0);
             gctr_key_word_val_i         : in  std_logic_vector(3 downto 0);
             gctr_key_word_i             : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+            gctr_key_slot_i             : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);
             gctr_iv_val_i               : in  std_logic;
             gctr_iv_i                   : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+            gctr_icb_n_blocks_i         : in  std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+            gctr_iv_hash_i              : in  std_logic;
             gctr_icb_start_cnt_i        : in  std_logic;
             gctr_icb_stop_cnt_i         : in  std_logic;
             gctr_pipe_reset_i           : in  std_logic;
@@ -87,9 +99,12 @@ architecture arch_aes_gcm of aes_gcm is
             gctr_data_in_i              : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
             ghash_h_loaded_i            : in  std_logic;
             ghash_j0_loaded_i           : in  std_logic;
+            ghash_j0_val_i              : in  std_logic;
+            ghash_j0_i                  : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
             aes_ecb_val_o               : out std_logic;
             aes_ecb_data_o              : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
             gctr_ready_o                : out std_logic;
+            gctr_new_icb_o              : out std_logic;
             gctr_data_out_val_o         : out std_logic;
             gctr_data_out_bval_o        : out std_logic_vector(NB_STAGE_C-1 downto 0);
             gctr_data_out_o             : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
@@ -98,13 +113,16 @@ architecture arch_aes_gcm of aes_gcm is
 
     component gcm_ghash is
         generic(
-            aes_gcm_split_gfmul         : natural range 0 to 1 := 0);
+            aes_gcm_split_gfmul         : natural range 0 to 1 := 0;
+            ghash_key_slots_g           : natural range 1 to 8 := 1);
         port(
             rst_i                       : in  std_logic;
             clk_i                       : in  std_logic;
             ghash_pkt_val_i             : in  std_logic;
+            ghash_iv_hash_i             : in  std_logic;
             ghash_new_icb_i             : in  std_logic;
             ghash_new_key_i             : in  std_logic;
+            ghash_key_slot_i            : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);
             aes_ecb_val_i               : in  std_logic;
             aes_ecb_data_i              : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
             ghash_aad_val_i             : in  std_logic;
@@ -115,6 +133,8 @@ architecture arch_aes_gcm of aes_gcm is
             ghash_ct_i                  : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
             ghash_h_loaded_o            : out std_logic;
             ghash_j0_loaded_o           : out std_logic;
+            ghash_j0_val_o              : out std_logic;
+            ghash_j0_o                  : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
             ghash_tag_val_o             : out std_logic;
             ghash_tag_o                 : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0));
     end component;
@@ -139,7 +159,8 @@ begin
     u_gcm_gctr: gcm_gctr
         generic map(
             gctr_mode_g                 => aes_gcm_mode_g,
-            gctr_n_rounds_g             => aes_gcm_n_rounds_g
+            gctr_n_rounds_g             => aes_gcm_n_rounds_g,
+            gctr_ks_fifo_g              => aes_gcm_ks_fifo_g
         )
         port map(
             rst_i                       => rst_i,
@@ -147,8 +168,11 @@ begin
             gctr_mode_i                 => aes_gcm_mode_i,
             gctr_key_word_val_i         => aes_gcm_key_word_val_i,
             gctr_key_word_i             => aes_gcm_key_word_i,
+            gctr_key_slot_i             => aes_gcm_key_slot_i,
             gctr_iv_val_i               => aes_gcm_iv_val_i,
             gctr_iv_i                   => aes_gcm_iv_i,
+            gctr_icb_n_blocks_i         => aes_gcm_icb_n_blocks_i,
+            gctr_iv_hash_i              => aes_gcm_iv_hash_i,
             gctr_icb_start_cnt_i        => aes_gcm_icb_start_cnt_i,
             gctr_icb_stop_cnt_i         => aes_gcm_icb_stop_cnt_i,
             gctr_pipe_reset_i           => aes_gcm_pipe_reset_i,
@@ -156,9 +180,12 @@ begin
             gctr_data_in_i              => aes_gcm_data_in_i,
             ghash_h_loaded_i            => ghash_h_loaded,
             ghash_j0_loaded_i           => ghash_j0_loaded,
+            ghash_j0_val_i              => ghash_j0_val,
+            ghash_j0_i                  => ghash_j0,
             aes_ecb_val_o               => aes_ecb_val,
             aes_ecb_data_o              => aes_ecb_data,
             gctr_ready_o                => aes_gcm_ready,
+            gctr_new_icb_o              => ghash_new_icb,
             gctr_data_out_val_o         => aes_gcm_data_out_val_o,
             gctr_data_out_bval_o        => gctr_data_out_bval,
             gctr_data_out_o             => gctr_data_out,
@@ -167,14 +194,17 @@ begin
 
     u_gcm_ghash: gcm_ghash
         generic map(
-            aes_gcm_split_gfmul         => aes_gcm_split_gfmul
+            aes_gcm_split_gfmul         => aes_gcm_split_gfmul,
+            ghash_key_slots_g           => aes_gcm_key_slots_g
         )
         port map(
             rst_i                       => rst_i,
             clk_i                       => clk_i,
             ghash_pkt_val_i             => aes_gcm_ghash_pkt_val_i,
-            ghash_new_icb_i             => aes_gcm_iv_val_i,
+            ghash_iv_hash_i             => aes_gcm_iv_hash_i,
+            ghash_new_icb_i             => ghash_new_icb,
             ghash_new_key_i             => ghash_new_key,
+            ghash_key_slot_i            => aes_gcm_key_slot_i,
             aes_ecb_val_i               => aes_ecb_val,
             aes_ecb_data_i              => aes_ecb_data,
             ghash_aad_val_i             => ghash_aad_val,
@@ -185,6 +215,8 @@ begin
             ghash_ct_i                  => ghash_data_in,
             ghash_h_loaded_o            => ghash_h_loaded,
             ghash_j0_loaded_o           => ghash_j0_loaded,
+            ghash_j0_val_o              => ghash_j0_val,
+            ghash_j0_o                  => ghash_j0,
             ghash_tag_val_o             => aes_gcm_ghash_tag_val_o,
             ghash_tag_o                 => aes_gcm_ghash_tag_o
         );
@@ -212,7 +244,8 @@ begin
 
 
     --------------------------------------------------------------------------------
-    aes_gcm_ready_o         <= aes_gcm_ready;
+    --! With the IV hash set, the IP is ready for the IV blocks as soon as H is loaded
+    aes_gcm_ready_o         <= aes_gcm_ready or (aes_gcm_iv_hash_i and ghash_h_loaded);
     aes_gcm_data_out_bval_o <= gctr_data_out_bval;
     aes_gcm_data_out_o      <= gctr_data_out;
 
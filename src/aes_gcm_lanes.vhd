@@ -0,0 +1,300 @@
+--------------------------------------------------------------------------------
+--! @File name:     aes_gcm_lanes
+--! @Date:          18/10/2026
+--! @Description:   the module performs the AES-GCM encryption and authentication
+--!                 of up to N blocks per clock. The N aes_ecb pipelines receive
+--!                 the same key and run in lock-step on N consecutive counters
+--! @Reference:     NIST Special Publication 800-38D, November, 2007
+--! @Source:        https://nvlpubs.nist.gov/nistpubs/Legacy/SP/nistspecialpublication800-38d.pdf
+--------------------------------------------------------------------------------
+library ieee;
+use ieee.std_logic_misc.or_reduce;
+use ieee.std_logic_1164.all;
+use work.gcm_pkg.all;
+use work.aes_pkg.all;
+
+--------------------------------------------------------------------------------
+--! Lane 0 is the most significant block of the data vectors. Valid lanes are
+--! contiguous from lane 0 and only the last valid lane can have less than 16
+--! valid bytes. A beat with less than N valid lanes ends the AAD or the data.
+--------------------------------------------------------------------------------
+entity aes_gcm_lanes is
+    generic(
+        aes_gcm_mode_g              : std_logic_vector(1 downto 0)  := AES_MODE_128_C;
+        aes_gcm_n_rounds_g          : natural range 0 to NR_256_C   := NR_128_C;
+        aes_gcm_n_lanes_g           : natural range 1 to 8          := 2);
+    port(
+        rst_i                       : in  std_logic;
+        clk_i                       : in  std_logic;
+        aes_gcm_mode_i              : in  std_logic_vector(1 downto 0);
+        aes_gcm_enc_dec_i           : in  std_logic;
+        aes_gcm_pipe_reset_i        : in  std_logic;
+        aes_gcm_key_word_val_i      : in  std_logic_vector(3 downto 0);
+        aes_gcm_key_word_i          : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+        aes_gcm_iv_val_i            : in  std_logic;
+        aes_gcm_iv_i                : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+        aes_gcm_icb_start_cnt_i     : in  std_logic;
+        aes_gcm_icb_stop_cnt_i      : in  std_logic;
+        aes_gcm_ghash_pkt_val_i     : in  std_logic;
+        aes_gcm_ghash_aad_bval_i    : in  std_logic_vector(aes_gcm_n_lanes_g * NB_STAGE_C-1 downto 0);
+        aes_gcm_ghash_aad_i         : in  std_logic_vector(aes_gcm_n_lanes_g * GCM_DATA_WIDTH_C-1 downto 0);
+        aes_gcm_data_in_bval_i      : in  std_logic_vector(aes_gcm_n_lanes_g * NB_STAGE_C-1 downto 0);
+        aes_gcm_data_in_i           : in  std_logic_vector(aes_gcm_n_lanes_g * AES_DATA_WIDTH_C-1 downto 0);
+        aes_gcm_ready_o             : out std_logic;
+        aes_gcm_data_out_val_o      : out std_logic;
+        aes_gcm_data_out_bval_o     : out std_logic_vector(aes_gcm_n_lanes_g * NB_STAGE_C-1 downto 0);
+        aes_gcm_data_out_o          : out std_logic_vector(aes_gcm_n_lanes_g * AES_DATA_WIDTH_C-1 downto 0);
+        aes_gcm_ghash_tag_val_o     : out std_logic;
+        aes_gcm_ghash_tag_o         : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+        aes_gcm_icb_cnt_overflow_o  : out std_logic);
+end entity;
+
+--------------------------------------------------------------------------------
+architecture arch_aes_gcm_lanes of aes_gcm_lanes is
+
+    --! Constants
+    constant N_LANES_C              : natural := aes_gcm_n_lanes_g;
+    constant BVAL_WIDTH_C           : natural := N_LANES_C * NB_STAGE_C;
+    constant DATA_WIDTH_C           : natural := N_LANES_C * AES_DATA_WIDTH_C;
+
+    --! Types
+
+    --! Signals
+    signal gctr_mode                : std_logic_vector(1 downto 0);
+    signal icb_val                  : std_logic;
+    signal icb_iv                   : std_logic_vector(DATA_WIDTH_C-1 downto 0);
+    signal load_h0                  : std_logic;
+    signal gctr_data_in_val         : std_logic;
+    signal gctr_data_in             : std_logic_vector(DATA_WIDTH_C-1 downto 0);
+    signal gctr_ack                 : std_logic;
+    signal gctr_ready               : std_logic;
+    signal aes_ecb_busy             : std_logic_vector(N_LANES_C-1 downto 0);
+    signal aes_ecb_val              : std_logic_vector(N_LANES_C-1 downto 0);
+    signal aes_ecb_data             : std_logic_vector(DATA_WIDTH_C-1 downto 0);
+    signal gctr_data_out_val        : std_logic;
+    signal gctr_data_out_val_q      : std_logic;
+    signal gctr_data_out_bval       : std_logic_vector(BVAL_WIDTH_C-1 downto 0);
+    signal gctr_data_out_bval_q     : std_logic_vector(BVAL_WIDTH_C-1 downto 0);
+    signal gctr_data_out            : std_logic_vector(DATA_WIDTH_C-1 downto 0);
+    signal gctr_data_out_q          : std_logic_vector(DATA_WIDTH_C-1 downto 0);
+    signal ghash_data_in_bval       : std_logic_vector(BVAL_WIDTH_C-1 downto 0);
+    signal ghash_data_in            : std_logic_vector(DATA_WIDTH_C-1 downto 0);
+    signal ghash_h_loaded           : std_logic;
+    signal ghash_j0_loaded          : std_logic;
+    signal ghash_h_pow_ready        : std_logic;
+    signal ghash_aad_val            : std_logic;
+    signal ghash_ct_val             : std_logic;
+    signal ghash_new_key            : std_logic;
+
+    --------------------------------------------------------------------------------
+    --! Component declaration
+    --------------------------------------------------------------------------------
+    component aes_icb_lanes is
+        generic(
+            icb_n_lanes_g               : natural range 1 to 8 := 2);
+        port(
+            rst_i                       : in  std_logic;
+            clk_i                       : in  std_logic;
+            icb_start_cnt_i             : in  std_logic;
+            icb_stop_cnt_i              : in  std_logic;
+            icb_iv_val_i                : in  std_logic;
+            icb_iv_i                    : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+            aes_ecb_busy_i              : in  std_logic;
+            icb_val_o                   : out std_logic;
+            icb_iv_o                    : out std_logic_vector(icb_n_lanes_g * AES_DATA_WIDTH_C-1 downto 0);
+            icb_cnt_overflow_o          : out std_logic);
+    end component;
+
+    component aes_ecb is
+        generic(
+            aes_n_rounds_g              : natural range 0 to NR_256_C   := NR_128_C
+        );
+        port(
+            rst_i                       : in  std_logic;
+            clk_i                       : in  std_logic;
+            aes_mode_i                  : in  std_logic_vector(1 downto 0);
+            aes_key_word_val_i          : in  std_logic_vector(3 downto 0);
+            aes_key_word_i              : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+            aes_key_slot_i              : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);
+            aes_pipe_reset_i            : in  std_logic;
+            aes_plain_text_val_i        : in  std_logic;
+            aes_plain_text_i            : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+            aes_cipher_text_ack_i       : in  std_logic;
+            aes_cipher_text_val_o       : out std_logic;
+            aes_cipher_text_o           : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+            aes_ecb_busy_o              : out std_logic);
+    end component;
+
+    component gcm_ghash_lanes is
+        port(
+            rst_i                       : in  std_logic;
+            clk_i                       : in  std_logic;
+            ghash_pkt_val_i             : in  std_logic;
+            ghash_new_icb_i             : in  std_logic;
+            ghash_new_key_i             : in  std_logic;
+            aes_ecb_val_i               : in  std_logic;
+            aes_ecb_data_i              : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+            ghash_aad_val_i             : in  std_logic;
+            ghash_aad_bval_i            : in  std_logic_vector(aes_gcm_n_lanes_g * NB_STAGE_C-1 downto 0);
+            ghash_aad_i                 : in  std_logic_vector(aes_gcm_n_lanes_g * GCM_DATA_WIDTH_C-1 downto 0);
+            ghash_ct_val_i              : in  std_logic;
+            ghash_ct_bval_i             : in  std_logic_vector(aes_gcm_n_lanes_g * NB_STAGE_C-1 downto 0);
+            ghash_ct_i                  : in  std_logic_vector(aes_gcm_n_lanes_g * GCM_DATA_WIDTH_C-1 downto 0);
+            ghash_h_loaded_o            : out std_logic;
+            ghash_j0_loaded_o           : out std_logic;
+            ghash_h_pow_ready_o         : out std_logic;
+            ghash_tag_val_o             : out std_logic;
+            ghash_tag_o                 : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0));
+    end component;
+
+    component aes_enc_dec_ctrl is
+        port(
+            rst_i                       : in  std_logic;
+            clk_i                       : in  std_logic;
+            aes_gcm_enc_dec_i           : in  std_logic;
+            ghash_pkt_val_i             : in  std_logic;
+            ghash_aad_bval_i            : in  std_logic_vector(NB_STAGE_C-1 downto 0);
+            ghash_ct_bval_i             : in  std_logic_vector(NB_STAGE_C-1 downto 0);
+            ghash_aad_val_o             : out std_logic;
+            ghash_ct_val_o              : out std_logic);
+    end component;
+
+begin
+
+    gctr_mode <= aes_gcm_mode_i when (aes_gcm_mode_g = AES_MODE_ALL_C) else aes_gcm_mode_g;
+
+    --------------------------------------------------------------------------------
+    --! Component instantiation
+    --------------------------------------------------------------------------------
+    u_aes_icb_lanes: aes_icb_lanes
+        generic map(
+            icb_n_lanes_g               => N_LANES_C)
+        port map(
+            rst_i                       => rst_i,
+            clk_i                       => clk_i,
+            icb_start_cnt_i             => aes_gcm_icb_start_cnt_i,
+            icb_stop_cnt_i              => aes_gcm_icb_stop_cnt_i,
+            icb_iv_val_i                => aes_gcm_iv_val_i,
+            icb_iv_i                    => aes_gcm_iv_i,
+            aes_ecb_busy_i              => aes_ecb_busy(0),
+            icb_val_o                   => icb_val,
+            icb_iv_o                    => icb_iv,
+            icb_cnt_overflow_o          => aes_gcm_icb_cnt_overflow_o);
+
+    --! The pipelines get the same inputs: they are always aligned
+    gen_aes_ecb: for i in 0 to N_LANES_C-1 generate
+        u_aes_ecb: aes_ecb
+            generic map (
+                aes_n_rounds_g          => aes_gcm_n_rounds_g)
+            port map (
+                rst_i                   => rst_i,
+                clk_i                   => clk_i,
+                aes_mode_i              => gctr_mode,
+                aes_key_word_val_i      => aes_gcm_key_word_val_i,
+                aes_key_word_i          => aes_gcm_key_word_i,
+                aes_key_slot_i          => (others => '0'),
+                aes_pipe_reset_i        => aes_gcm_pipe_reset_i,
+                aes_plain_text_val_i    => gctr_data_in_val,
+                aes_plain_text_i        => gctr_data_in((N_LANES_C-i) * AES_DATA_WIDTH_C-1 downto (N_LANES_C-1-i) * AES_DATA_WIDTH_C),
+                aes_cipher_text_ack_i   => gctr_ack,
+                aes_cipher_text_val_o   => aes_ecb_val(i),
+                aes_cipher_text_o       => aes_ecb_data((N_LANES_C-i) * AES_DATA_WIDTH_C-1 downto (N_LANES_C-1-i) * AES_DATA_WIDTH_C),
+                aes_ecb_busy_o          => aes_ecb_busy(i));
+    end generate gen_aes_ecb;
+
+    u_gcm_ghash_lanes: gcm_ghash_lanes
+        port map(
+            rst_i                       => rst_i,
+            clk_i                       => clk_i,
+            ghash_pkt_val_i             => aes_gcm_ghash_pkt_val_i,
+            ghash_new_icb_i             => aes_gcm_iv_val_i,
+            ghash_new_key_i             => ghash_new_key,
+            aes_ecb_val_i               => aes_ecb_val(0),
+            aes_ecb_data_i              => aes_ecb_data(DATA_WIDTH_C-1 downto DATA_WIDTH_C-AES_DATA_WIDTH_C),
+            ghash_aad_val_i             => ghash_aad_val,
+            ghash_aad_bval_i            => aes_gcm_ghash_aad_bval_i,
+            ghash_aad_i                 => aes_gcm_ghash_aad_i,
+            ghash_ct_val_i              => ghash_ct_val,
+            ghash_ct_bval_i             => ghash_data_in_bval,
+            ghash_ct_i                  => ghash_data_in,
+            ghash_h_loaded_o            => ghash_h_loaded,
+            ghash_j0_loaded_o           => ghash_j0_loaded,
+            ghash_h_pow_ready_o         => ghash_h_pow_ready,
+            ghash_tag_val_o             => aes_gcm_ghash_tag_val_o,
+            ghash_tag_o                 => aes_gcm_ghash_tag_o);
+
+    --! Lane 0 is valid whenever a beat is valid
+    u_aes_enc_dec_ctrl: aes_enc_dec_ctrl
+        port map(
+            rst_i                       => rst_i,
+            clk_i                       => clk_i,
+            aes_gcm_enc_dec_i           => aes_gcm_enc_dec_i,
+            ghash_pkt_val_i             => aes_gcm_ghash_pkt_val_i,
+            ghash_aad_bval_i            => aes_gcm_ghash_aad_bval_i(BVAL_WIDTH_C-1 downto BVAL_WIDTH_C-NB_STAGE_C),
+            ghash_ct_bval_i             => aes_gcm_data_in_bval_i(BVAL_WIDTH_C-1 downto BVAL_WIDTH_C-NB_STAGE_C),
+            ghash_aad_val_o             => ghash_aad_val,
+            ghash_ct_val_o              => ghash_ct_val);
+
+    --------------------------------------------------------------------------------
+    --! GCTR
+    --------------------------------------------------------------------------------
+    --! Only create H0 when starting the counter.
+    --! Keep H0 if a new key wasn't loaded after H0 was calculated.
+    load_h0            <= aes_gcm_icb_start_cnt_i and not(ghash_h_loaded);
+    gctr_data_in_val   <= load_h0 or icb_val;
+    gctr_data_in       <= (others => '0') when (load_h0 = '1') else icb_iv;
+
+    --! The keystream is held until the powers of H are ready
+    gctr_ack           <= not(ghash_h_loaded and ghash_j0_loaded) or
+                            (or_reduce(aes_gcm_data_in_bval_i) and ghash_h_pow_ready);
+
+    --! PT can be xor-ed after H0, J0 and the powers of H have been calculated
+    gctr_ready         <= aes_ecb_val(0) and ghash_h_loaded and ghash_j0_loaded and ghash_h_pow_ready;
+    gctr_data_out_val  <= gctr_ready and or_reduce(aes_gcm_data_in_bval_i);
+    gctr_data_out      <= aes_gcm_data_in_i xor aes_ecb_data;
+    gctr_data_out_bval <= aes_gcm_data_in_bval_i when (gctr_data_out_val = '1') else (others => '0');
+
+    --------------------------------------------------------------------------------
+    --! Sample data
+    --------------------------------------------------------------------------------
+    cipher_text_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            gctr_data_out_q <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            if(gctr_data_out_val = '1') then
+                gctr_data_out_q <= gctr_data_out;
+            end if;
+        end if;
+    end process;
+
+    cipher_text_val_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            gctr_data_out_val_q  <= '0';
+            gctr_data_out_bval_q <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            gctr_data_out_val_q  <= gctr_data_out_val;
+            gctr_data_out_bval_q <= gctr_data_out_bval;
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------------
+    --! GHASH CT
+    --------------------------------------------------------------------------------
+    ghash_new_key      <= or_reduce(aes_gcm_key_word_val_i);
+
+    ghash_data_in_bval <= gctr_data_out_bval_q   when (aes_gcm_enc_dec_i = '0') else
+                          aes_gcm_data_in_bval_i when (gctr_ready = '1')        else
+                          (others => '0');
+
+    ghash_data_in      <= gctr_data_out_q when (aes_gcm_enc_dec_i = '0') else aes_gcm_data_in_i;
+
+
+    --------------------------------------------------------------------------------
+    aes_gcm_ready_o         <= gctr_ready;
+    aes_gcm_data_out_val_o  <= gctr_data_out_val_q;
+    aes_gcm_data_out_bval_o <= gctr_data_out_bval_q;
+    aes_gcm_data_out_o      <= gctr_data_out_q;
+
+end architecture;
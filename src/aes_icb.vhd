@@ -6,7 +6,7 @@
 --! @Source:        https://nvlpubs.nist.gov/nistpubs/Legacy/SP/nistspecialpublication800-38d.pdf
 --------------------------------------------------------------------------------
 library ieee;
-use ieee.std_logic_misc.and_reduce;
+use ieee.std_logic_misc.or_reduce;
 use ieee.std_logic_1164.all;
 use ieee.std_logic_unsigned.all;
 use work.aes_pkg.all;
@@ -21,7 +21,13 @@ entity aes_icb is
         icb_stop_cnt_i          : in  std_logic;
         icb_iv_val_i            : in  std_logic;
         icb_iv_i                : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+        icb_n_blocks_i          : in  std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+        icb_iv_hash_i           : in  std_logic;
+        icb_j0_val_i            : in  std_logic;
+        icb_j0_i                : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
         aes_ecb_busy_i          : in  std_logic;
+        icb_start_o             : out std_logic;
+        icb_new_j0_o            : out std_logic;
         icb_val_o               : out std_logic;
         icb_iv_o                : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
         icb_cnt_overflow_o      : out std_logic);
@@ -32,11 +38,28 @@ architecture arch_aes_icb of aes_icb is
 
     --! Constants
     constant IV_CNT_RST_VALUE_C : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0) := x"00000001";
+    constant IV_CNT_LAST_C      : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0) := x"FFFFFFFF";
 
     --! Types
 
     --! Signals
-    signal iv_load_en        : std_logic;
+    signal iv_next           : std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+    signal iv_next_q         : std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+    signal n_next            : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+    signal n_next_q          : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+    signal n_blocks_q        : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+    signal start_queue       : std_logic;
+    signal start_now         : std_logic;
+    signal start_q           : std_logic;
+    signal pkt_load          : std_logic;
+    signal pkt_last          : std_logic;
+    signal pkt_switch        : std_logic;
+    signal pkt_end           : std_logic;
+    signal hash_start        : std_logic;
+    signal j0_wait_q         : std_logic;
+    signal j0_load           : std_logic;
+    signal iv_cnt_last       : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+    signal iv_cnt_last_q     : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
     signal iv_cnt_val        : std_logic;
     signal iv_cnt_val_en     : std_logic;
     signal iv_val            : std_logic;
@@ -62,23 +85,90 @@ begin
         end if;
     end process;
 
-    iv_val <= not(icb_stop_cnt_i or iv_cnt_of) and (iv_val_q or icb_start_cnt_i);
+    iv_val <= not(icb_stop_cnt_i or iv_cnt_of or pkt_end or hash_start) and (iv_val_q or pkt_load);
 
     --------------------------------------------------------------------------------
-    --! Load IV 96-bit
+    --! Shadow IV 96-bit and number of blocks: an IV can be loaded while the
+    --! counter runs, it is used by the next start
+    --------------------------------------------------------------------------------
+    load_iv_next_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            iv_next_q <= (others => '0');
+            n_next_q  <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            if(icb_iv_val_i = '1') then
+                iv_next_q <= icb_iv_i;
+                n_next_q  <= icb_n_blocks_i;
+            end if;
+        end if;
+    end process;
+
+    iv_next <= icb_iv_i       when (icb_iv_val_i = '1') else iv_next_q;
+    n_next  <= icb_n_blocks_i when (icb_iv_val_i = '1') else n_next_q;
+
+    --------------------------------------------------------------------------------
+    --! Start queue: with the number of blocks of the packet set, a start while the
+    --! counter runs is queued. The counter switches to the shadow IV after the last
+    --! block of the packet, or stops if no start is queued
+    --------------------------------------------------------------------------------
+    start_queue_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            start_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            start_q <= not(icb_stop_cnt_i or pkt_switch) and (start_q or start_queue);
+        end if;
+    end process;
+
+    start_queue <= icb_start_cnt_i and iv_val_q and or_reduce(n_blocks_q) and not(icb_iv_hash_i);
+    start_now   <= icb_start_cnt_i and not(start_queue);
+
+    pkt_last    <= '1' when ((iv_cnt_q = n_blocks_q) and (or_reduce(n_blocks_q) = '1')) else '0';
+    pkt_switch  <= iv_cnt_val and pkt_last and (start_q or start_queue);
+    pkt_end     <= iv_cnt_val and pkt_last and not(start_q or start_queue);
+    pkt_load    <= (start_now and not(icb_iv_hash_i)) or pkt_switch or j0_load;
+
+    --------------------------------------------------------------------------------
+    --! Hashed IV: a start with the IV hash set only creates H, the counter waits
+    --! for the J0 computed by the GHASH from the IV blocks and starts from it
+    --------------------------------------------------------------------------------
+    j0_wait_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            j0_wait_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            j0_wait_q <= not(icb_stop_cnt_i or j0_load) and (j0_wait_q or hash_start);
+        end if;
+    end process;
+
+    hash_start  <= start_now and icb_iv_hash_i;
+    j0_load     <= j0_wait_q and icb_j0_val_i;
+
+    --------------------------------------------------------------------------------
+    --! Load IV 96-bit, or the upper 96-bit of a hashed J0
     --------------------------------------------------------------------------------
     load_iv_p : process(rst_i, clk_i)
     begin
         if(rst_i = '1') then
-            iv_q <= (others => '0');
+            iv_q          <= (others => '0');
+            n_blocks_q    <= (others => '0');
+            iv_cnt_last_q <= IV_CNT_LAST_C;
         elsif(rising_edge(clk_i)) then
-            if(iv_load_en = '1') then
-                iv_q <= icb_iv_i;                   --! Preload the IV base
+            if(j0_load = '1') then
+                iv_q          <= icb_j0_i(AES_DATA_WIDTH_C-1 downto GCM_CNT_WIDTH_C);
+                n_blocks_q    <= (others => '0');
+                iv_cnt_last_q <= iv_cnt_last;
+            elsif(pkt_load = '1') then
+                iv_q          <= iv_next;       --! Preload the IV base
+                n_blocks_q    <= n_next;        --! 0: the counter runs until it is stopped
+                iv_cnt_last_q <= IV_CNT_LAST_C;
             end if;
         end if;
     end process;
 
-    iv_load_en <= icb_iv_val_i and not(iv_val_q);   --! Valid rising edge
+    --! inc32 wraps the counter of a hashed J0: the last block is 2^32 - 2 blocks after J0
+    iv_cnt_last <= icb_j0_i(GCM_CNT_WIDTH_C-1 downto 0) - 2;
 
     --------------------------------------------------------------------------------
     --! Increment the lower 32-bit of the IV
@@ -94,9 +184,11 @@ begin
         end if;
     end process;
 
-    iv_cnt_val_en <= (icb_start_cnt_i or iv_cnt_val);
+    iv_cnt_val_en <= (pkt_load or iv_cnt_val);
     iv_cnt_val    <= iv_val_q and not(aes_ecb_busy_i) and not(iv_cnt_of);
-    iv_cnt        <= IV_CNT_RST_VALUE_C when (icb_start_cnt_i = '1') else iv_cnt_inc;
+    iv_cnt        <= icb_j0_i(GCM_CNT_WIDTH_C-1 downto 0) when (j0_load  = '1') else
+                     IV_CNT_RST_VALUE_C                   when (pkt_load = '1') else
+                     iv_cnt_inc;
     iv_cnt_inc    <= iv_cnt_q + 1;
 
     --------------------------------------------------------------------------------
@@ -111,9 +203,11 @@ begin
         end if;
     end process;
 
-    iv_cnt_of <= and_reduce(iv_cnt_q);
+    iv_cnt_of <= '1' when (iv_cnt_q = iv_cnt_last_q) else '0';
 
     ---------------------------------------------------------------
+    icb_start_o         <= start_now;                                 --! Creates H, if not loaded
+    icb_new_j0_o        <= start_now and not(or_reduce(n_blocks_q));  --! The previous packet ran until it was stopped
     icb_val_o           <= iv_val_q;
     icb_iv_o            <= iv_q & iv_cnt_q;
     icb_cnt_overflow_o  <= iv_cnt_of_q;
@@ -0,0 +1,148 @@
+--------------------------------------------------------------------------------
+--! @File name:     aes_icb_lanes
+--! @Date:          18/10/2026
+--! @Description:   the module contains the IV and the counter to form N ICBs
+--!                 per clock. Lane i gets the counter + i: after the J0 block
+--!                 the counter is incremented by the number of lanes
+--! @Reference:     NIST Special Publication 800-38D, November, 2007
+--! @Source:        https://nvlpubs.nist.gov/nistpubs/Legacy/SP/nistspecialpublication800-38d.pdf
+--------------------------------------------------------------------------------
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.std_logic_unsigned.all;
+use work.aes_pkg.all;
+use work.gcm_pkg.all;
+
+--------------------------------------------------------------------------------
+entity aes_icb_lanes is
+    generic(
+        icb_n_lanes_g           : natural range 1 to 8 := 2);
+    port(
+        rst_i                   : in  std_logic;
+        clk_i                   : in  std_logic;
+        icb_start_cnt_i         : in  std_logic;
+        icb_stop_cnt_i          : in  std_logic;
+        icb_iv_val_i            : in  std_logic;
+        icb_iv_i                : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+        aes_ecb_busy_i          : in  std_logic;
+        icb_val_o               : out std_logic;
+        icb_iv_o                : out std_logic_vector(icb_n_lanes_g * AES_DATA_WIDTH_C-1 downto 0);
+        icb_cnt_overflow_o      : out std_logic);
+end entity;
+
+--------------------------------------------------------------------------------
+architecture arch_aes_icb_lanes of aes_icb_lanes is
+
+    --! Constants
+    constant IV_CNT_RST_VALUE_C : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0) := x"00000001";
+    constant IV_CNT_MAX_C       : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0) := x"FFFFFFFF";
+
+    --! Types
+
+    --! Signals
+    signal iv_load_en        : std_logic;
+    signal iv_cnt_val        : std_logic;
+    signal iv_cnt_val_en     : std_logic;
+    signal iv_val            : std_logic;
+    signal iv_val_q          : std_logic;
+    signal iv_cnt_of         : std_logic;
+    signal iv_cnt_of_q       : std_logic;
+    signal j0_beat_q         : std_logic;
+    signal iv_q              : std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+    signal iv_cnt            : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+    signal iv_cnt_q          : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+    signal iv_cnt_inc        : std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+
+begin
+
+    --------------------------------------------------------------------------------
+    --! Counter start/stop
+    --------------------------------------------------------------------------------
+    cnt_start_stop_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            iv_val_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            iv_val_q <= iv_val;
+        end if;
+    end process;
+
+    iv_val <= not(icb_stop_cnt_i or iv_cnt_of) and (iv_val_q or icb_start_cnt_i);
+
+    --------------------------------------------------------------------------------
+    --! Load IV 96-bit
+    --------------------------------------------------------------------------------
+    load_iv_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            iv_q <= (others => '0');
+        elsif(rising_edge(clk_i)) then
+            if(iv_load_en = '1') then
+                iv_q <= icb_iv_i;                   --! Preload the IV base
+            end if;
+        end if;
+    end process;
+
+    iv_load_en <= icb_iv_val_i and not(iv_val_q);   --! Valid rising edge
+
+    --------------------------------------------------------------------------------
+    --! The first block after the start is J0: only lane 0 is used
+    --------------------------------------------------------------------------------
+    j0_beat_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            j0_beat_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            if(icb_start_cnt_i = '1') then
+                j0_beat_q <= '1';
+            elsif(iv_cnt_val = '1') then
+                j0_beat_q <= '0';
+            end if;
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------------
+    --! Increment the lower 32-bit of the IV
+    --------------------------------------------------------------------------------
+    iv_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            iv_cnt_q <= IV_CNT_RST_VALUE_C;
+        elsif(rising_edge(clk_i)) then
+            if(iv_cnt_val_en = '1') then
+                iv_cnt_q <= iv_cnt;
+            end if;
+        end if;
+    end process;
+
+    iv_cnt_val_en <= (icb_start_cnt_i or iv_cnt_val);
+    iv_cnt_val    <= iv_val_q and not(aes_ecb_busy_i) and not(iv_cnt_of);
+    iv_cnt        <= IV_CNT_RST_VALUE_C when (icb_start_cnt_i = '1') else iv_cnt_inc;
+    iv_cnt_inc    <= iv_cnt_q + 1 when (j0_beat_q = '1') else iv_cnt_q + icb_n_lanes_g;
+
+    --------------------------------------------------------------------------------
+    --! Counter overflow: the counter of the last lane cannot wrap
+    --------------------------------------------------------------------------------
+    cnt_of_p: process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            iv_cnt_of_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            iv_cnt_of_q <= iv_cnt_of;
+        end if;
+    end process;
+
+    iv_cnt_of <= '1' when (iv_cnt_q >= IV_CNT_MAX_C - (icb_n_lanes_g - 1)) else '0';
+
+    --------------------------------------------------------------------------------
+    --! Lane 0 is the most significant block
+    --------------------------------------------------------------------------------
+    gen_lanes: for i in 0 to icb_n_lanes_g-1 generate
+        icb_iv_o((icb_n_lanes_g-i) * AES_DATA_WIDTH_C-1 downto (icb_n_lanes_g-1-i) * AES_DATA_WIDTH_C) <= iv_q & (iv_cnt_q + i);
+    end generate gen_lanes;
+
+    ---------------------------------------------------------------
+    icb_val_o           <= iv_val_q;
+    icb_cnt_overflow_o  <= iv_cnt_of_q;
+
+end architecture;
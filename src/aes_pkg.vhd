@@ -34,6 +34,8 @@ package aes_pkg is
 
     constant WORD_WIDTH_C           : natural   := 32;          --! Nummber of bits in a word
 
+    constant KEY_SLOT_WIDTH_C       : natural   := 3;           --! Key slot index width: up to 8 key slots
+
     constant ZERO_128_C             : std_logic_vector(AES_DATA_WIDTH_C-1 downto 0) := (others => '0');
 
     --! Types
@@ -15,15 +15,19 @@ use work.gcm_pkg.all;
 entity gcm_gctr is
     generic(
         gctr_mode_g                 : std_logic_vector(1 downto 0)  := AES_MODE_128_C;
-        gctr_n_rounds_g             : natural range 0 to NR_256_C   := NR_128_C);
+        gctr_n_rounds_g             : natural range 0 to NR_256_C   := NR_128_C;
+        gctr_ks_fifo_g              : natural range 0 to 32         := 0);
     port(
         rst_i                       : in  std_logic;
         clk_i                       : in  std_logic;
         gctr_mode_i                 : in  std_logic_vector(1 downto 0);
         gctr_key_word_val_i         : in  std_logic_vector(3 downto 0);
         gctr_key_word_i             : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+        gctr_key_slot_i             : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);
         gctr_iv_val_i               : in  std_logic;
         gctr_iv_i                   : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+        gctr_icb_n_blocks_i         : in  std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+        gctr_iv_hash_i              : in  std_logic;
         gctr_icb_start_cnt_i        : in  std_logic;
         gctr_icb_stop_cnt_i         : in  std_logic;
         gctr_pipe_reset_i           : in  std_logic;
@@ -31,9 +35,12 @@ entity gcm_gctr is
         gctr_data_in_i              : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
         ghash_h_loaded_i            : in  std_logic;
         ghash_j0_loaded_i           : in  std_logic;
+        ghash_j0_val_i              : in  std_logic;
+        ghash_j0_i                  : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
         aes_ecb_val_o               : out std_logic;
         aes_ecb_data_o              : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
         gctr_ready_o                : out std_logic;
+        gctr_new_icb_o              : out std_logic;
         gctr_data_out_val_o         : out std_logic;
         gctr_data_out_bval_o        : out std_logic_vector(NB_STAGE_C-1 downto 0);
         gctr_data_out_o             : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
@@ -48,6 +55,8 @@ architecture arch_gcm_gctr of gcm_gctr is
     --! Types
 
     --! Signals
+    signal icb_start                : std_logic;
+    signal icb_new_j0               : std_logic;
     signal icb_val                  : std_logic;
     signal icb_iv                   : std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
     signal gctr_data_in_val         : std_logic;
@@ -55,6 +64,9 @@ architecture arch_gcm_gctr of gcm_gctr is
     signal aes_ecb_busy             : std_logic;
     signal aes_ecb_val              : std_logic;
     signal aes_ecb_data             : std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+    signal aes_ecb_ack              : std_logic;
+    signal ks_val                   : std_logic;
+    signal ks_data                  : std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
     signal gctr_data_out_val        : std_logic;
     signal gctr_data_out_val_q      : std_logic;
     signal gctr_data_out_bval       : std_logic_vector(NB_STAGE_C-1 downto 0);
@@ -78,6 +90,7 @@ architecture arch_gcm_gctr of gcm_gctr is
             aes_mode_i                  : in  std_logic_vector(1 downto 0);
             aes_key_word_val_i          : in  std_logic_vector(3 downto 0);
             aes_key_word_i              : in  std_logic_vector(AES_256_KEY_WIDTH_C-1 downto 0);
+            aes_key_slot_i              : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);
             aes_pipe_reset_i            : in  std_logic;
             aes_plain_text_val_i        : in  std_logic;
             aes_plain_text_i            : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
@@ -95,12 +108,33 @@ architecture arch_gcm_gctr of gcm_gctr is
             icb_stop_cnt_i              : in  std_logic;
             icb_iv_val_i                : in  std_logic;
             icb_iv_i                    : in  std_logic_vector(GCM_ICB_WIDTH_C-1 downto 0);
+            icb_n_blocks_i              : in  std_logic_vector(GCM_CNT_WIDTH_C-1 downto 0);
+            icb_iv_hash_i               : in  std_logic;
+            icb_j0_val_i                : in  std_logic;
+            icb_j0_i                    : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
             aes_ecb_busy_i              : in  std_logic;
+            icb_start_o                 : out std_logic;
+            icb_new_j0_o                : out std_logic;
             icb_val_o                   : out std_logic;
             icb_iv_o                    : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
             icb_cnt_overflow_o          : out std_logic);
     end component;
 
+    component gcm_ks_fifo is
+        generic(
+            ks_fifo_depth_g             : natural range 1 to 32 := 8);
+        port(
+            rst_i                       : in  std_logic;
+            clk_i                       : in  std_logic;
+            ks_flush_i                  : in  std_logic;
+            aes_ecb_val_i               : in  std_logic;
+            aes_ecb_data_i              : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+            ks_ack_i                    : in  std_logic;
+            aes_ecb_ack_o               : out std_logic;
+            ks_val_o                    : out std_logic;
+            ks_data_o                   : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0));
+    end component;
+
 begin
 
     gctr_mode <= gctr_mode_i when (gctr_mode_g = AES_MODE_ALL_C) else gctr_mode_g;
@@ -116,7 +150,13 @@ begin
             icb_stop_cnt_i              => gctr_icb_stop_cnt_i,
             icb_iv_val_i                => gctr_iv_val_i,
             icb_iv_i                    => gctr_iv_i,
+            icb_n_blocks_i              => gctr_icb_n_blocks_i,
+            icb_iv_hash_i               => gctr_iv_hash_i,
+            icb_j0_val_i                => ghash_j0_val_i,
+            icb_j0_i                    => ghash_j0_i,
             aes_ecb_busy_i              => aes_ecb_busy,
+            icb_start_o                 => icb_start,
+            icb_new_j0_o                => icb_new_j0,
             icb_val_o                   => icb_val,
             icb_iv_o                    => icb_iv,
             icb_cnt_overflow_o          => gctr_icb_cnt_overflow_o);
@@ -130,24 +170,49 @@ begin
             aes_mode_i                  => gctr_mode,
             aes_key_word_val_i          => gctr_key_word_val_i,
             aes_key_word_i              => gctr_key_word_i,
+            aes_key_slot_i              => gctr_key_slot_i,
             aes_pipe_reset_i            => gctr_pipe_reset_i,
             aes_plain_text_val_i        => gctr_data_in_val,
             aes_plain_text_i            => gctr_data_in,
-            aes_cipher_text_ack_i       => gctr_ack,           --! Acknoledge the ECB block that a data has been read
+            aes_cipher_text_ack_i       => aes_ecb_ack,        --! Acknoledge the ECB block that a data has been read
             aes_cipher_text_val_o       => aes_ecb_val,
             aes_cipher_text_o           => aes_ecb_data,
             aes_ecb_busy_o              => aes_ecb_busy);
 
-    gctr_data_in_val   <= (gctr_icb_start_cnt_i and not(ghash_h_loaded_i)) or icb_val;
-     --! Only create H0 when starting the counter.
+    --! Without FIFO the key stream is read at the output of the ECB
+    gen_no_ks_fifo: if gctr_ks_fifo_g = 0 generate
+        aes_ecb_ack <= gctr_ack;
+        ks_val      <= aes_ecb_val;
+        ks_data     <= aes_ecb_data;
+    end generate;
+
+    --! The FIFO lets the ECB encrypt the next counters while the PT is not valid
+    gen_ks_fifo: if gctr_ks_fifo_g > 0 generate
+        u_gcm_ks_fifo : gcm_ks_fifo
+            generic map (
+                ks_fifo_depth_g             => gctr_ks_fifo_g)
+            port map (
+                rst_i                       => rst_i,
+                clk_i                       => clk_i,
+                ks_flush_i                  => gctr_pipe_reset_i,
+                aes_ecb_val_i               => aes_ecb_val,
+                aes_ecb_data_i              => aes_ecb_data,
+                ks_ack_i                    => gctr_ack,
+                aes_ecb_ack_o               => aes_ecb_ack,
+                ks_val_o                    => ks_val,
+                ks_data_o                   => ks_data);
+    end generate;
+
+    gctr_data_in_val   <= (icb_start and not(ghash_h_loaded_i)) or icb_val;
+     --! Only create H0 when starting the counter. A queued start keeps the key: H0 is loaded.
      --! Keep H0 if a new key wasn't loaded after H0 was calculated.
-    gctr_data_in       <= ZERO_128_C when ((gctr_icb_start_cnt_i and not(ghash_h_loaded_i)) = '1') else icb_iv;
+    gctr_data_in       <= ZERO_128_C when ((icb_start and not(ghash_h_loaded_i)) = '1') else icb_iv;
     gctr_ack           <= not(ghash_h_loaded_i and ghash_j0_loaded_i) or or_reduce(gctr_data_in_bval_i);
 
     --! PT can be xor-ed after H0 and J0 have been calculated
-    gctr_ready         <= aes_ecb_val and ghash_h_loaded_i and ghash_j0_loaded_i;
+    gctr_ready         <= ks_val and ghash_h_loaded_i and ghash_j0_loaded_i;
     gctr_data_out_val  <= gctr_ready and or_reduce(gctr_data_in_bval_i);
-    gctr_data_out      <= gctr_data_in_i xor aes_ecb_data;
+    gctr_data_out      <= gctr_data_in_i xor ks_data;
 
     --------------------------------------------------------------------------------
     --! Sample data
@@ -184,9 +249,10 @@ begin
     gctr_data_out_bval <= gctr_data_in_bval_i when (gctr_data_out_val = '1') else (others => '0');
 
     ---------------------------------------------------------------
-    aes_ecb_val_o           <= aes_ecb_val;
-    aes_ecb_data_o          <= aes_ecb_data;
+    aes_ecb_val_o           <= ks_val;
+    aes_ecb_data_o          <= ks_data;
     gctr_ready_o            <= gctr_ready;
+    gctr_new_icb_o          <= icb_new_j0;
     gctr_data_out_val_o     <= gctr_data_out_val_q;
     gctr_data_out_bval_o    <= gctr_data_out_bval_q;
     gctr_data_out_o         <= gctr_data_out_q;
@@ -9,18 +9,22 @@ library ieee;
 use ieee.std_logic_1164.all;
 use ieee.numeric_std.all;
 use work.aes_pkg.NB_STAGE_C;
+use work.aes_pkg.KEY_SLOT_WIDTH_C;
 use work.gcm_pkg.all;
 
 --------------------------------------------------------------------------------
 entity gcm_ghash is
     generic(
-        aes_gcm_split_gfmul         : natural range 0 to 1 := 0);
+        aes_gcm_split_gfmul         : natural range 0 to 1 := 0;
+        ghash_key_slots_g           : natural range 1 to 8 := 1);
     port(
         rst_i                       : in  std_logic;
         clk_i                       : in  std_logic;
         ghash_pkt_val_i             : in  std_logic;
+        ghash_iv_hash_i             : in  std_logic;
         ghash_new_icb_i             : in  std_logic;
         ghash_new_key_i             : in  std_logic;
+        ghash_key_slot_i            : in  std_logic_vector(KEY_SLOT_WIDTH_C-1 downto 0);
         aes_ecb_val_i               : in  std_logic;
         aes_ecb_data_i              : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
         ghash_aad_val_i             : in  std_logic;
@@ -31,6 +35,8 @@ entity gcm_ghash is
         ghash_ct_i                  : in  std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
         ghash_h_loaded_o            : out std_logic;
         ghash_j0_loaded_o           : out std_logic;
+        ghash_j0_val_o              : out std_logic;
+        ghash_j0_o                  : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
         ghash_tag_val_o             : out std_logic;
         ghash_tag_o                 : out std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0));
 end entity;
@@ -42,21 +48,29 @@ architecture arch_gcm_ghash of gcm_ghash is
     constant ZERO_C : std_logic_vector(63 downto 0) := (others => '0');
 
     --! Types
-
+    type h_arr_t is array (0 to ghash_key_slots_g-1) of std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
 
     --! Signals
-    signal h_q                  : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal h_q                  : h_arr_t;
+    signal h_sel                : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal key_slot             : natural range 0 to ghash_key_slots_g-1;
+    signal key_slot_dec         : std_logic_vector(ghash_key_slots_g-1 downto 0);
     signal J0_q                 : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal j0_tag_q             : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
+    signal j0_tag_en            : std_logic;
+    signal j0_tag_val_q         : std_logic;
     signal gf_x                 : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
     signal gf_y                 : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
     signal gf_y_whole           : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
     signal y_q                  : std_logic_vector(GCM_DATA_WIDTH_C-1 downto 0);
     signal y_val                : std_logic;
     signal pkt_val_q            : std_logic;
+    signal iv_hash_q            : std_logic;
     signal eop                  : std_logic;
     signal sop                  : std_logic;
-    signal h_loaded             : std_logic;
-    signal h_loaded_q           : std_logic;
+    signal h_loaded             : std_logic_vector(ghash_key_slots_g-1 downto 0);
+    signal h_loaded_q           : std_logic_vector(ghash_key_slots_g-1 downto 0);
+    signal h_loaded_sel         : std_logic;
     signal load_h               : std_logic;
     signal j0_loaded            : std_logic;
     signal j0_loaded_q          : std_logic;
@@ -108,19 +122,32 @@ architecture arch_gcm_ghash of gcm_ghash is
 
 begin
 
+    --------------------------------------------------------------------------------
+    --! Key slot: each slot keeps the H of its key. A new key clears the H of its slot only
+    --------------------------------------------------------------------------------
+    key_slot <= to_integer(unsigned(ghash_key_slot_i)) mod ghash_key_slots_g;
+
+    gen_slot_dec: for i in 0 to ghash_key_slots_g-1 generate
+        key_slot_dec(i) <= '1' when (key_slot = i) else '0';
+    end generate gen_slot_dec;
+
     --------------------------------------------------------------------------------
     --! Enable H
     --------------------------------------------------------------------------------
     enable_h_p : process(rst_i, clk_i)
     begin
         if(rst_i = '1') then
-            h_loaded_q <= '0';
+            h_loaded_q <= (others => '0');
         elsif(rising_edge(clk_i)) then
             h_loaded_q <= h_loaded;
         end if;
     end process;
 
-    h_loaded <= not(ghash_new_key_i) and (h_loaded_q or load_h);
+    gen_h_loaded: for i in 0 to ghash_key_slots_g-1 generate
+        h_loaded(i) <= not(ghash_new_key_i and key_slot_dec(i)) and (h_loaded_q(i) or (load_h and key_slot_dec(i)));
+    end generate gen_h_loaded;
+
+    h_loaded_sel <= h_loaded_q(key_slot);
 
     --------------------------------------------------------------------------------
     --! Get H
@@ -128,15 +155,16 @@ begin
     get_h_p : process(rst_i, clk_i)
     begin
         if(rst_i = '1') then
-            h_q <= (others => '0');
+            h_q <= (others => (others => '0'));
         elsif(rising_edge(clk_i)) then
             if(load_h = '1') then
-                h_q <= aes_ecb_data_i;
+                h_q(key_slot) <= aes_ecb_data_i;
             end if;
         end if;
     end process;
 
-    load_h <= not(h_loaded_q) and aes_ecb_val_i;
+    load_h <= not(h_loaded_sel) and aes_ecb_val_i;
+    h_sel  <= h_q(key_slot);
 
     --------------------------------------------------------------------------------
     --! Enable J0
@@ -150,7 +178,8 @@ begin
         end if;
     end process;
 
-    j0_loaded <= not(ghash_new_key_i or ghash_new_icb_i) and (j0_loaded_q or load_j0);
+    --! A packet uses its own J0: the block after the keystream of the packet is the J0 of the next one
+    j0_loaded <= not(ghash_new_key_i or ghash_new_icb_i or eop) and (j0_loaded_q or load_j0);
 
     --------------------------------------------------------------------------------
     --! Get J0
@@ -166,7 +195,26 @@ begin
         end if;
     end process;
 
-    load_j0 <= not(j0_loaded_q) and aes_ecb_val_i and h_loaded_q;
+    load_j0 <= not(j0_loaded_q) and aes_ecb_val_i and h_loaded_sel;
+
+    --------------------------------------------------------------------------------
+    --! J0 of the TAG: sampled in the packet, as soon as J0 is loaded. J0_q is free
+    --! to take the J0 of the next IV while the TAG of the packet is computed
+    --------------------------------------------------------------------------------
+    get_j0_tag_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            j0_tag_q     <= (others => '0');
+            j0_tag_val_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            if(j0_tag_en = '1') then
+                j0_tag_q <= J0_q;
+            end if;
+            j0_tag_val_q <= ghash_pkt_val_i and (j0_tag_val_q or j0_tag_en);
+        end if;
+    end process;
+
+    j0_tag_en <= ghash_pkt_val_i and j0_loaded_q and not(j0_tag_val_q);
 
     --------------------------------------------------------------------------------
     --! Ghash next packet
@@ -176,9 +224,13 @@ begin
         if(rst_i = '1') then
             y_q <= (others => '0');
         elsif(rising_edge(clk_i)) then
-            --! Save Y to xor with the next incoming X value
+            --! Save Y to xor with the next incoming X value. Y is cleared once the TAG
+            --! or the J0 of the packet is sampled: the next packet starts from 0 even
+            --! when its first block comes after the start of the packet
             if(y_val = '1') then
                 y_q <= gf_y;
+            elsif(j0_val_q = '1') then
+                y_q <= (others => '0');
             end if;
         end if;
     end process;
@@ -253,8 +305,10 @@ begin
     cnt_sel  <= aad_cnt_q when (ghash_aad_val_i = '1') else ct_cnt_q;
 
     --------------------------------------------------------------------------------
-    --! Bit counter: minimum size increment is 1 byte
-    bit_cnt           <= aad_cnt_q & "000" & ct_cnt_q & "000";
+    --! Bit counter: minimum size increment is 1 byte.
+    --! The IV blocks of a hashed IV are loaded as AAD: the IV length is in the LSbs
+    bit_cnt           <= aad_cnt_q & "000" & ct_cnt_q & "000" when (iv_hash_q = '0') else
+                         ct_cnt_q & "000" & aad_cnt_q & "000";
 
     ghash_data_sel    <= ghash_aad_i when (ghash_aad_val_i = '1') else ghash_ct_i;
 
@@ -275,6 +329,20 @@ begin
     sop     <= ghash_pkt_val_i and not(pkt_val_q);
     eop     <= pkt_val_q and not(ghash_pkt_val_i);
 
+    --------------------------------------------------------------------------------
+    --! IV hash: the packet carries the IV blocks, its GHASH is the J0 of the ICB
+    --------------------------------------------------------------------------------
+    iv_hash_p : process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            iv_hash_q <= '0';
+        elsif(rising_edge(clk_i)) then
+            if(sop = '1') then
+                iv_hash_q <= ghash_iv_hash_i;
+            end if;
+        end if;
+    end process;
+
     --------------------------------------------------------------------------------
     --! Sample the ghash tag
     --------------------------------------------------------------------------------
@@ -283,14 +351,14 @@ begin
         if(rst_i = '1') then
             ghash_tag_q <= (others => '0');
         elsif(rising_edge(clk_i)) then
-            if(j0_val_q = '1') then
+            if((j0_val_q and not(iv_hash_q)) = '1') then
                 ghash_tag_q <= ghash_tag;
             end if;
         end if;
     end process;
 
     --! TAG update result
-    ghash_tag <= y_q xor J0_q;
+    ghash_tag <= y_q xor j0_tag_q;
 
     --------------------------------------------------------------------------------
     --! Sample valid signals
@@ -306,7 +374,7 @@ begin
             pkt_val_q       <= ghash_pkt_val_i;
             cnt_val_q       <= eop;
             j0_val_q        <= cnt_val_q;
-            ghash_tag_val_q <= j0_val_q;
+            ghash_tag_val_q <= j0_val_q and not(iv_hash_q);
         end if;
     end process;
 
@@ -317,13 +385,13 @@ begin
     gen_multi_gfmul: if aes_gcm_split_gfmul > 0 generate
         u_ghash_gfmul_0: ghash_gfmul
             port map(
-                gf_mult_h_i => h_q,
+                gf_mult_h_i => h_sel,
                 gf_mult_x_i => x_part_0,
                 gf_mult_y_o => y_part_0);
 
         u_ghash_gfmul_1: ghash_gfmul
             port map(
-                gf_mult_h_i => h_q,
+                gf_mult_h_i => h_sel,
                 gf_mult_x_i => x_part_1,
                 gf_mult_y_o => y_part_1);
 
@@ -335,7 +403,7 @@ begin
     gen_single_gfmul: if aes_gcm_split_gfmul = 0 generate
         u_ghash_gfmul: ghash_gfmul
             port map(
-                gf_mult_h_i => h_q,
+                gf_mult_h_i => h_sel,
                 gf_mult_x_i => gf_x,
                 gf_mult_y_o => gf_y_whole);
     end generate gen_single_gfmul;
@@ -344,8 +412,10 @@ begin
     gf_y <= gf_y_whole when (aes_gcm_split_gfmul = 0) else y_part;
 
     --------------------------------------------------------------------------------
-    ghash_h_loaded_o    <= h_loaded_q;
+    ghash_h_loaded_o    <= h_loaded_sel;
     ghash_j0_loaded_o   <= j0_loaded_q;
+    ghash_j0_val_o      <= j0_val_q and iv_hash_q;
+    ghash_j0_o          <= y_q;                 --! Sampled by the ICB before y_q is cleared
     ghash_tag_val_o     <= ghash_tag_val_q;
     ghash_tag_o         <= ghash_tag_q;
 
@@ -0,0 +1,105 @@
+--------------------------------------------------------------------------------
+--! @File name:     gcm_ks_fifo
+--! @Date:          18/10/2026
+--! @Description:   the module stores the key stream blocks encrypted ahead of the PT
+--! @Reference:     NIST Special Publication 800-38D, November, 2007
+--! @Source:        https://nvlpubs.nist.gov/nistpubs/Legacy/SP/nistspecialpublication800-38d.pdf
+--------------------------------------------------------------------------------
+library ieee;
+use ieee.std_logic_1164.all;
+use work.aes_pkg.all;
+
+--------------------------------------------------------------------------------
+entity gcm_ks_fifo is
+    generic(
+        ks_fifo_depth_g         : natural range 1 to 32 := 8);
+    port(
+        rst_i                   : in  std_logic;
+        clk_i                   : in  std_logic;
+        ks_flush_i              : in  std_logic;
+        aes_ecb_val_i           : in  std_logic;
+        aes_ecb_data_i          : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+        ks_ack_i                : in  std_logic;
+        aes_ecb_ack_o           : out std_logic;
+        ks_val_o                : out std_logic;
+        ks_data_o               : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0));
+end entity;
+
+--------------------------------------------------------------------------------
+architecture arch_gcm_ks_fifo of gcm_ks_fifo is
+
+    --! Constants
+
+    --! Types
+    type ks_mem_t is array (0 to ks_fifo_depth_g-1) of std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+
+    --! Signals
+    signal ks_mem_q             : ks_mem_t;
+    signal wr_ptr_q             : natural range 0 to ks_fifo_depth_g-1;
+    signal rd_ptr_q             : natural range 0 to ks_fifo_depth_g-1;
+    signal count_q              : natural range 0 to ks_fifo_depth_g;
+    signal empty                : std_logic;
+    signal full                 : std_logic;
+    signal push                 : std_logic;
+    signal pop                  : std_logic;
+    signal ecb_ack              : std_logic;
+
+begin
+
+    empty   <= '1' when (count_q = 0) else '0';
+    full    <= '1' when (count_q = ks_fifo_depth_g) else '0';
+
+    --! The head of the FIFO is read first. When the FIFO is empty the ECB block is
+    --! read directly: an acknowledged block is not stored
+    pop     <= not(empty) and ks_ack_i;
+    ecb_ack <= not(full) or ks_ack_i;
+    push    <= aes_ecb_val_i and ecb_ack and not(empty and ks_ack_i);
+
+    --------------------------------------------------------------------------------
+    --! process: Store the key stream blocks
+    --------------------------------------------------------------------------------
+    ks_mem_p: process(clk_i)
+    begin
+        if(rising_edge(clk_i)) then
+            if(push = '1') then
+                ks_mem_q(wr_ptr_q) <= aes_ecb_data_i;
+            end if;
+        end if;
+    end process;
+
+    --------------------------------------------------------------------------------
+    --! process: Pointers and number of stored blocks. The FIFO is emptied with the AES pipeline
+    --------------------------------------------------------------------------------
+    ks_ptr_p: process(rst_i, clk_i)
+    begin
+        if(rst_i = '1') then
+            wr_ptr_q <= 0;
+            rd_ptr_q <= 0;
+            count_q  <= 0;
+        elsif(rising_edge(clk_i)) then
+            if(ks_flush_i = '1') then
+                wr_ptr_q <= 0;
+                rd_ptr_q <= 0;
+                count_q  <= 0;
+            else
+                if(push = '1') then
+                    wr_ptr_q <= (wr_ptr_q + 1) mod ks_fifo_depth_g;
+                end if;
+                if(pop = '1') then
+                    rd_ptr_q <= (rd_ptr_q + 1) mod ks_fifo_depth_g;
+                end if;
+                if(push = '1' and pop = '0') then
+                    count_q  <= count_q + 1;
+                elsif(push = '0' and pop = '1') then
+                    count_q  <= count_q - 1;
+                end if;
+            end if;
+        end if;
+    end process;
+
+    ---------------------------------------------------------------
+    aes_ecb_ack_o   <= ecb_ack;
+    ks_val_o        <= aes_ecb_val_i when (empty = '1') else '1';
+    ks_data_o       <= aes_ecb_data_i when (empty = '1') else ks_mem_q(rd_ptr_q);
+
+end architecture;
@@ -0,0 +1,171 @@
+#
+# ======================================================================================
+# gcm_bench.py: micro-benchmarks of the Python side of the testbench.
+#               They do not need a simulator.
+#
+#   python gcm_bench.py stimulus
+#   python gcm_bench.py stimulus --sizes 1M 64M 1G
+#   python gcm_bench.py model --sizes 1M
+#   python gcm_bench.py kexp --n-keys 10000
+#
+# ======================================================================================
+import sys
+import time
+import random
+import argparse
+
+import gcm_ref
+import key_exp
+
+from gcm_stimulus import random_blocks, BLOCK_N_BYTES
+
+# The pycryptodome model needs cocotb and pycryptodome
+try:
+    import gcm_model
+except ImportError:
+    gcm_model = None
+
+
+# ======================================================================================
+def legacy_blocks(n_bytes, rnd):
+    '''
+    Stimulus generation used before the block stream: one formatted string
+    and one bytes.fromhex conversion per block '''
+
+    n_trans     = n_bytes >> 4
+    n_rem_bytes = n_bytes & 0xF
+
+    for _ in range(n_trans):
+        yield bytes.fromhex('{:032X}'.format(rnd.randint(0, (2**128)-1)))
+
+    if n_rem_bytes:
+        yield bytes.fromhex('{:0{width}X}'.format(rnd.randint(0, (2**(8*n_rem_bytes))-1), width=2*n_rem_bytes))
+
+
+# ======================================================================================
+def bench_stimulus(n_bytes, seed=0):
+    '''
+    Time the generation and the consumption of n_bytes of stimulus.
+    Return the throughput in MB/s of the legacy generator, of the block stream in
+    1 MB chunks and of the block stream with the whole payload in one chunk '''
+
+    one_chunk = lambda n, rnd : random_blocks(n, rnd, chunk_n_blocks=max(1, -(-n // BLOCK_N_BYTES)))
+
+    res = {}
+    for name, gen in [('legacy', legacy_blocks), ('stream', random_blocks), ('payload', one_chunk)]:
+        rnd   = random.Random(seed)
+        start = time.perf_counter()
+        for block in gen(n_bytes, rnd):
+            pass
+        res[name] = n_bytes / (time.perf_counter() - start) / 2**20
+
+    return res
+
+
+# ======================================================================================
+def bench_model(n_bytes, seed=0):
+    '''
+    Time the encryption of n_bytes in 16-byte blocks with the reference models.
+    Return the throughput in MB/s of each model '''
+
+    rnd    = random.Random(seed)
+    key    = {'data' : '{:032X}'.format(rnd.getrandbits(128)), 'n_bytes' : 16}
+    iv     = {'data' : '{:024X}'.format(rnd.getrandbits(96)),  'n_bytes' : 12}
+    models = [('ref', gcm_ref.gcm)]
+    if gcm_model != None and gcm_model.AES != None:
+        models.append(('crypto', gcm_model.gcm))
+
+    res = {}
+    for name, model in models:
+        gcm   = model(key, iv, 'enc')
+        start = time.perf_counter()
+        for block in random_blocks(n_bytes, random.Random(seed)):
+            gcm.load_plain_text(block)
+            gcm.data_out.clear()
+        res[name] = n_bytes / (time.perf_counter() - start) / 2**20
+
+    return res
+
+
+# ======================================================================================
+def bench_kexp(n_keys, size, seed=0):
+    '''
+    Time the expansion of n_keys keys of size '128', '192' or '256' bits.
+    Return the keys expanded per second by the legacy expansion, by the word-based
+    expansion and by the word-based expansion when the keys are in the cache '''
+
+    n_bytes = key_exp.exp_key.key_size[size]
+    rnd     = random.Random(seed)
+    keys    = [rnd.getrandbits(8 * n_bytes).to_bytes(n_bytes, 'big') for _ in range(n_keys)]
+    res     = {}
+
+    start = time.perf_counter()
+    for key in keys:
+        key_exp.exp_key().aes_expand_key(key.hex(), n_bytes)
+    res['legacy'] = n_keys / (time.perf_counter() - start)
+
+    # The cache is bypassed to time the expansion only
+    start = time.perf_counter()
+    for key in keys:
+        key_exp.expand_key.__wrapped__(key, n_bytes)
+    res['words'] = n_keys / (time.perf_counter() - start)
+
+    # Re-keying with the keys of the cache
+    cached = keys[:key_exp.KEY_CACHE_SIZE]
+    for key in cached:
+        key_exp.expand_key(key, n_bytes)
+    start = time.perf_counter()
+    for i in range(n_keys):
+        key_exp.expand_key(cached[i % len(cached)], n_bytes)
+    res['cached'] = n_keys / (time.perf_counter() - start)
+
+    return res
+
+
+# ======================================================================================
+def parse_size(size):
+    unit = {'K' : 2**10, 'M' : 2**20, 'G' : 2**30}
+    size = size.upper()
+    if size[-1] in unit:
+        return int(size[:-1]) * unit[size[-1]]
+    return int(size)
+
+
+# ======================================================================================
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Testbench micro-benchmarks')
+    parser.add_argument('bench', choices=['stimulus', 'model', 'kexp'],
+                        help='Benchmark to run')
+    parser.add_argument('--sizes', nargs='+', default=['1M', '64M'], metavar='SIZE',
+                        help='Payload sizes, 1M 64M by default. 1G takes tens of minutes with the legacy generator\
+                        and about 2 GB of memory with the payload one')
+    parser.add_argument('--n-keys', type=int, default=10000, metavar='N',
+                        help='Number of keys expanded by the kexp benchmark (default 10000)')
+    args = parser.parse_args()
+
+    if args.bench == 'stimulus':
+        print(' >>\tPayload'.ljust(16) + 'legacy [MB/s]'.rjust(16) + 'stream [MB/s]'.rjust(16) +
+              'payload [MB/s]'.rjust(16) + 'speed-up'.rjust(12))
+        for size in args.sizes:
+            res = bench_stimulus(parse_size(size))
+            print((' >>\t' + size).ljust(16) + f"{res['legacy']:16.1f}{res['stream']:16.1f}{res['payload']:16.1f}" +
+                  f"{res['stream'] / res['legacy']:11.1f}x")
+            sys.stdout.flush()
+
+    if args.bench == 'model':
+        print(' >>\tPayload'.ljust(16) + 'ref [MB/s]'.rjust(16) + 'crypto [MB/s]'.rjust(16))
+        for size in args.sizes:
+            res = bench_model(parse_size(size))
+            print((' >>\t' + size).ljust(16) + f"{res['ref']:16.1f}" +
+                  (f"{res['crypto']:16.1f}" if 'crypto' in res else 'n/a'.rjust(16)))
+            sys.stdout.flush()
+
+    if args.bench == 'kexp':
+        print(' >>\tKey'.ljust(16) + 'legacy [keys/s]'.rjust(18) + 'words [keys/s]'.rjust(18) +
+              'cached [keys/s]'.rjust(18) + 'speed-up'.rjust(12))
+        for size in ['128', '192', '256']:
+            res = bench_kexp(args.n_keys, size)
+            print((' >>\t' + size).ljust(16) + f"{res['legacy']:18.0f}{res['words']:18.0f}{res['cached']:18.0f}" +
+                  f"{res['words'] / res['legacy']:11.1f}x")
+            sys.stdout.flush()
@@ -0,0 +1,134 @@
+import os
+import time
+import random
+import cocotb
+import gcm_gctr as gctr
+
+from cocotb.binary      import BinaryValue as bv
+from cocotb.triggers    import RisingEdge
+from gcm_driver         import pkt_driver, aad_driver, pt_driver
+from gcm_stimulus       import random_blocks
+
+# Number of AAD and PT blocks sent by each driver
+N_BLOCKS = int(os.environ.get('BENCH_N_BLOCKS', 10000))
+
+
+# ======================================================================================
+class aad_driver_legacy(aad_driver):
+    '''
+    AAD driver that builds a BinaryValue from a binary string for each block.
+    Kept as reference for the benchmark.
+    '''
+
+    @cocotb.coroutine
+    def write(self, aad):
+        aad_data = bv(n_bits=128)
+        aad_bval = bv(n_bits=16)
+
+        n_bits = len(aad) * 8
+        aad_data.assign('{:0{width}b}'.format(int.from_bytes(aad, "big"), width=n_bits))
+        aad_bval.assign((n_bits // 8) * '1')
+
+        self.data.value = aad_data.get_value()
+        self.bval.value = aad_bval.get_value()
+        yield RisingEdge(self.clk)
+        self.bval.value = 0
+
+
+# ======================================================================================
+class pt_driver_legacy(pt_driver):
+    '''
+    PT driver that builds a BinaryValue from a binary string for each block.
+    Kept as reference for the benchmark.
+    '''
+
+    @cocotb.coroutine
+    def write(self, pt):
+        pt_data = bv(n_bits=128)
+        pt_dval = bv(n_bits=16)
+
+        n_bits = len(pt) * 8
+        pt_data.assign('{:0{width}b}'.format(int.from_bytes(pt, "big"), width=n_bits))
+        pt_dval.assign((n_bits // 8) * '1')
+
+        self.data.value = pt_data.get_value()
+        self.bval.value = pt_dval.get_value()
+        yield RisingEdge(self.clk)
+        while (self.ready.value != 1):
+            yield RisingEdge(self.clk)
+        self.bval.value = 0
+
+
+# ======================================================================================
+@cocotb.coroutine
+def start_packet(tb):
+    '''
+    Load a new Key and IV and wait for the AES to be ready '''
+
+    tb.config_data()
+    yield tb.load_key_if_needed(tb.data['key'], True)
+    yield tb.start_iv(tb.data['iv'])
+    yield tb.cipher_is_ready()
+
+
+# ======================================================================================
+@cocotb.coroutine
+def send_blocks(drv, n_blocks, rate):
+    '''
+    Send n_blocks with the driver and store the simulated blocks per
+    wall-clock second in the dictionary rate '''
+
+    blocks = random_blocks(16 * n_blocks, random.Random(0))
+
+    start  = time.perf_counter()
+    for block in blocks:
+        yield drv.write(block)
+    rate['wall_time'] = time.perf_counter() - start
+    rate['blocks/s']  = n_blocks / rate['wall_time']
+
+
+# ======================================================================================
+@cocotb.test()
+def test_drivers(dut):
+    #
+    # A/B benchmark of the AAD and PT drivers:
+    #   * Sends N_BLOCKS AAD blocks and N_BLOCKS PT blocks with the legacy drivers
+    #   * Sends the same number of blocks with the current drivers
+    #   * Reports the simulated blocks per wall-clock second of each driver
+
+    tb        = gctr.gcm_gctr(dut)
+    tb.config = gctr.load_config()
+
+    pkt_drv = pkt_driver(dut.clk_i, dut.aes_gcm_ghash_pkt_val_i)
+
+    drivers = {
+        'legacy' : (aad_driver_legacy(dut.clk_i, dut.aes_gcm_ghash_aad_bval_i, dut.aes_gcm_ghash_aad_i),
+                    pt_driver_legacy( dut.clk_i, dut.aes_gcm_data_in_bval_i, dut.aes_gcm_data_in_i, dut.aes_gcm_ready_o)),
+        'fast'   : (aad_driver(dut.clk_i, dut.aes_gcm_ghash_aad_bval_i, dut.aes_gcm_ghash_aad_i),
+                    pt_driver( dut.clk_i, dut.aes_gcm_data_in_bval_i, dut.aes_gcm_data_in_i, dut.aes_gcm_ready_o))}
+
+    yield tb.start_dut()
+    yield tb.set_mode('enc')
+
+    rates = {}
+    for name, (aad_drv, pt_drv) in drivers.items():
+        if len(rates):
+            yield tb.stop_icb()
+            yield tb.pipe_reset()
+
+        yield start_packet(tb)
+
+        rates[name] = {'aad' : {}, 'pt' : {}}
+
+        yield pkt_drv.start_pkt()
+        yield send_blocks(aad_drv, N_BLOCKS, rates[name]['aad'])
+        yield send_blocks(pt_drv, N_BLOCKS, rates[name]['pt'])
+        yield pkt_drv.stop_pkt()
+
+        while dut.aes_gcm_ghash_tag_val_o.value == 0:
+            yield RisingEdge(dut.clk_i)
+
+    for intf in ['aad', 'pt']:
+        dut._log.info(f"{intf.upper()} driver: legacy {rates['legacy'][intf]['blocks/s']:10.1f} blocks/s, " +
+                      f"fast {rates['fast'][intf]['blocks/s']:10.1f} blocks/s, " +
+                      f"speed-up {rates['fast'][intf]['blocks/s'] / rates['legacy'][intf]['blocks/s']:.2f}x")
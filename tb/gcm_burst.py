@@ -0,0 +1,168 @@
+#
+# ======================================================================================
+# gcm_burst.py: run gcm_burst_test on each IP size without and with the key stream FIFO
+#               and report the throughput gained by the FIFO with a bursty PT.
+#
+#   python gcm_burst.py -j 8
+#   python gcm_burst.py -s XS -F 16 -j 4
+#
+# The IP parameters given on the command line are fixed, the size is swept unless given.
+# Each size runs with FIFO depth 0 and with the depth of '-F', 8 by default.
+# The results are saved in tmp/burst.json and tmp/burst.csv.
+#
+# ======================================================================================
+import os
+import sys
+import csv
+import json
+
+sys.path.append('../config/')
+import gcm_utils as gu
+
+from gcm_runner import regression
+
+# Columns of the result table
+BURST_COLUMNS = ['aes_mode', 'aes_size', 'pipes_in_core', 'pattern', 'offered_bits_per_clk',
+                 'bits_per_clk_no_fifo', 'bits_per_clk_fifo', 'gain_pct',
+                 'stall_cycles_no_fifo', 'stall_cycles_fifo', 'ks_fifo_depth']
+
+
+# ======================================================================================
+class burst_conf(gu.aes_conf):
+    '''
+    Configuration of the burst comparison: the arguments of the testbench
+    and the packet length
+    '''
+
+    # ======================================================================================
+    def add_args(self):
+        super().add_args()
+
+        self.parser.add_argument('-B', '--n-bytes',
+                            type=int, default=4096, metavar='N',
+                            help='Number of PT bytes of each packet (4096 by default).')
+
+
+# ======================================================================================
+def burst_report(res):
+    '''
+    Read the burst report of a test. Return None when the test did not write it '''
+
+    burst_file = res['workpath'] + 'tmp/' + str(res['seed']) + '_burst.json'
+    if res['result'] != 'PASS' or os.path.exists(burst_file) == False:
+        return None
+
+    with open(burst_file, 'r') as fp:
+        return json.load(fp)
+
+
+# ======================================================================================
+def gain_rows(runs, depth):
+    '''
+    Pair the reports of each size without and with the FIFO, one row per pattern '''
+
+    rows = []
+    for (mode, size, pipe), reports in runs.items():
+        base = reports.get(0)
+        fifo = reports.get(depth)
+
+        if base == None or fifo == None:
+            print(f" >>\tError: size {size} has no report with and without the FIFO")
+            continue
+
+        for pattern, res in base['patterns'].items():
+            res_fifo = fifo['patterns'][pattern]
+            rows.append({'aes_mode'             : mode,
+                         'aes_size'             : size,
+                         'pipes_in_core'        : pipe,
+                         'pattern'              : pattern,
+                         'offered_bits_per_clk' : res['offered_bits_per_clk'],
+                         'bits_per_clk_no_fifo' : res['bits_per_clk'],
+                         'bits_per_clk_fifo'    : res_fifo['bits_per_clk'],
+                         'gain_pct'             : round(100 * (res_fifo['bits_per_clk'] / res['bits_per_clk'] - 1), 1),
+                         'stall_cycles_no_fifo' : res['stall_cycles'],
+                         'stall_cycles_fifo'    : res_fifo['stall_cycles'],
+                         'ks_fifo_depth'        : depth})
+
+    return rows
+
+
+# ======================================================================================
+def save_table(rows, basepath):
+    with open(basepath + 'tmp/burst.json', 'w') as json_file:
+        json.dump(rows, json_file, indent=4)
+
+    with open(basepath + 'tmp/burst.csv', 'w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=BURST_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f" >>\tOK   : {len(rows)} rows saved in {basepath}tmp/burst.json and {basepath}tmp/burst.csv")
+
+
+# ======================================================================================
+def print_gain(rows):
+    for row in rows:
+        print(f" >>\t\tsize {row['aes_size']:>2}, burst:gap {row['pattern']:>6}: " +
+              f"{row['bits_per_clk_no_fifo']:8.3f} -> {row['bits_per_clk_fifo']:8.3f} bits/clk " +
+              f"({row['gain_pct']:+6.1f} %), offered {row['offered_bits_per_clk']:8.3f}")
+
+
+# ======================================================================================
+if __name__ == "__main__":
+
+    gen_base_path = './'
+
+    conf = burst_conf(gen_base_path, False)
+
+    if conf.args.seed != None:
+        sys.exit(" >>\tError: the comparison creates a seed per configuration: \'-e\' is not allowed")
+
+    depth = conf.args.ks_fifo if conf.args.ks_fifo != None else 8
+    if depth == 0:
+        sys.exit(" >>\tError: the FIFO depth to compare must be greater than 0")
+
+    sizes = conf.ip_size if conf.args.size == None else [conf.args.size]
+
+    # The packet length is read by the test module from the environment of make
+    os.environ['BURST_N_BYTES'] = str(conf.args.n_bytes)
+    conf.args.module = 'gcm_burst_test'
+
+    os.makedirs(gen_base_path + 'tmp', exist_ok=True)
+
+    regr = regression(gen_base_path, max(conf.args.jobs, 1))
+    runs = {}
+    keys = {}
+
+    for conf.args.size in sizes:
+        for conf.args.ks_fifo in [0, depth]:
+
+            conf.conf_param = {}
+
+            # Configure the test and the IP
+            conf.test_config()
+            conf.gcm_ip_config()
+
+            # Generate the files, unless the same configuration has been generated already
+            cachepath = conf.cache_path()
+            conf.generate_cached_file(cachepath)
+
+            keys[conf.conf_param['seed']] = (conf.conf_param['aes_mode'], conf.conf_param['aes_size'],
+                                             conf.conf_param['pipes_in_core'], conf.args.ks_fifo)
+
+            # Save the configuration in the work directory of the test and queue it
+            conf.save_configuration(regr.work_path(conf.conf_param['seed']))
+            regr.submit(conf, cachepath)
+
+    # Wait for the tests and pair the reports of each size
+    summary = regr.summary()
+
+    for res in summary['tests']:
+        mode, size, pipe, fifo = keys[res['seed']]
+        report = burst_report(res)
+        if report != None:
+            runs.setdefault((mode, size, pipe), {})[fifo] = report
+
+    rows = gain_rows(runs, depth)
+    save_table(rows, gen_base_path)
+    print_gain(rows)
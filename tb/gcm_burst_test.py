@@ -0,0 +1,118 @@
+import os
+import json
+import random
+import cocotb
+import gcm_gctr as gctr
+
+from cocotb.result      import TestFailure
+from cocotb.triggers    import ClockCycles
+from gcm_sequencer      import gcm_if_monitor
+from gcm_gctr           import cycle, check_pkt
+
+# PT bytes of each packet
+BURST_N_BYTES  = int(os.environ.get('BURST_N_BYTES', 4096))
+
+# Number of packets sent with each pattern
+BURST_N_PKT    = int(os.environ.get('BURST_N_PKT', 2))
+
+# Patterns of the PT, 'B:G': bursts of B beats followed by G idle cycles
+BURST_PATTERNS = os.environ.get('BURST_PATTERNS', '1:0 1:4 4:8 8:16 16:32').split()
+
+
+# ======================================================================================
+@cocotb.coroutine
+def send_burst(pkt_drv, pt_drv, clk, blocks, n_lanes, burst, gap):
+    '''
+    Send the PT blocks of a packet in bursts of burst beats, with gap idle
+    cycles between two bursts. Return the number of beats '''
+
+    beats = [blocks[i] if n_lanes == 1 else blocks[i : i + n_lanes] for i in range(0, len(blocks), n_lanes)]
+
+    yield pkt_drv.start_pkt()
+    for n, beat in enumerate(beats):
+        if n and n % burst == 0 and gap:
+            yield ClockCycles(clk, gap)
+        yield pt_drv.write(beat)
+    yield pkt_drv.stop_pkt()
+
+    return len(beats)
+
+
+# ======================================================================================
+@cocotb.test()
+def test_burst(dut):
+    #
+    # Throughput of the IP with a bursty PT:
+    #   * Sends BURST_N_PKT packets of BURST_N_BYTES with each pattern of BURST_PATTERNS
+    #   * Measures the cycles from the first PT beat to the last one, and the cycles
+    #     the IP stalls the PT on top of the idle cycles of the pattern
+    #   * Checks the CT and the TAG of each packet against the model
+    #   * Saves the mean figures of each pattern in tmp/<seed>_burst.json
+    # The key stream FIFO of the configuration, '-F', is encrypted ahead during the idle cycles
+
+    tb        = gctr.gcm_gctr(dut)
+    tb.config = gctr.load_config()
+
+    n_lanes = tb.config.get('lanes', 1)
+
+    # The throughput is measured with the 96-bit IV, unless the IV length is given
+    if tb.config.get('iv_n_bytes', 0) == 0:
+        tb.config['iv_n_bytes'] = gctr.IV_96_N_BYTES
+
+    model_pkt          = tb.model_pkt()
+    pkt_drv, _, pt_drv = tb.drivers()
+
+    yield tb.start_dut()
+
+    intf = gcm_if_monitor(dut, n_lanes)
+
+    yield tb.set_mode('enc')
+
+    rnd     = random.Random(cocotb.RANDOM_SEED)
+    results = {}
+    errors  = 0
+    key     = None
+
+    for pattern in BURST_PATTERNS:
+        burst, gap = [int(n) for n in pattern.split(':')]
+        cycles     = []
+        stall      = []
+
+        for n in range(BURST_N_PKT):
+            # The first packet loads the KEY, the next ones keep it
+            pkt = tb.new_pkt(BURST_N_BYTES, key, model_pkt, rnd)
+            yield tb.restart_icb(key == None)
+            key = pkt['key']
+
+            yield tb.cipher_is_ready()
+            t_start = cycle()
+
+            n_beats = yield send_burst(pkt_drv, pt_drv, dut.clk_i, pkt['blocks'], n_lanes, burst, gap)
+            cycles.append(cycle() - t_start)
+
+            # A beat takes a clock: the remaining cycles are the idle ones of the pattern and the stalls
+            stall.append(cycles[-1] - n_beats - gap * ((n_beats - 1) // burst))
+
+            pkt_errors = yield check_pkt(intf, pkt)
+            errors    += pkt_errors
+
+        offered = cycles[-1] - stall[-1]
+        results[pattern] = {
+            'cycles'               : round(sum(cycles) / len(cycles), 1),
+            'stall_cycles'         : round(sum(stall) / len(stall), 1),
+            'bits_per_clk'         : round(8 * BURST_N_BYTES * len(cycles) / sum(cycles), 3),
+            'offered_bits_per_clk' : round(8 * BURST_N_BYTES / offered, 3)}
+
+        dut._log.info(f"burst {burst:3} gap {gap:3}: {results[pattern]['bits_per_clk']} bits/clk " +
+                      f"of {results[pattern]['offered_bits_per_clk']}, {results[pattern]['stall_cycles']} stall cycles")
+
+    yield ClockCycles(dut.clk_i, 20)
+
+    with open(gctr.tmp_dir() + str(cocotb.RANDOM_SEED) + '_burst.json', 'w') as burst_file:
+        json.dump({'n_bytes'       : BURST_N_BYTES,
+                   'n_pkt'         : BURST_N_PKT,
+                   'ks_fifo_depth' : tb.config.get('ks_fifo_depth', 0),
+                   'patterns'      : results}, burst_file, indent=4)
+
+    if errors:
+        raise TestFailure(f"{errors} CT blocks or TAGs mismatch the model")
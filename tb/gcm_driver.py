@@ -1,15 +1,39 @@
 import cocotb
 from cocotb.triggers    import RisingEdge
-from cocotb.binary      import BinaryValue as bv
+from cocotb.result      import TestFailure
+
+
+# Left aligned byte valid masks: BVAL_MASK[n] has the n MSbs set
+BVAL_MASK   = [((1 << n) - 1) << (16 - n) for n in range(17)]
+
+# Number of valid bytes of each accepted byte valid mask
+BVAL_DECODE = {mask : n for n, mask in enumerate(BVAL_MASK)}
+
+
+# ======================================================================================
+def beat_value(blocks, n_lanes):
+    '''
+    Return the data and the byte valid of a beat of up to n_lanes blocks.
+    The first block is lane 0, the most significant block of the data vector '''
+
+    data = 0
+    bval = 0
+    for lane in range(n_lanes):
+        block   = blocks[lane] if lane < len(blocks) else b''
+        n_bytes = len(block)
+        data    = (data << 128) | (int.from_bytes(block, "big") << (8 * (16 - n_bytes)))
+        bval    = (bval << 16) | BVAL_MASK[n_bytes]
+    return data, bval
 
 
 # ======================================================================================
 class aad_driver:
-    def __init__(self, clk, bval, data):
+    def __init__(self, clk, bval, data, n_lanes=1):
 
-        self.clk  = clk
-        self.bval = bval
-        self.data = data
+        self.clk     = clk
+        self.bval    = bval
+        self.data    = data
+        self.n_lanes = n_lanes
 
     # ======================================================================================
     @cocotb.coroutine
@@ -17,18 +41,19 @@ class aad_driver:
         '''
         Load the AAD data.
         The function assert the packet valid and starts loading data in
-        chuncks of 128 bit wide
+        chuncks of 128 bit wide. Data and byte valid are left aligned.
+        With more lanes, aad is the list of the blocks of the beat
         '''
-        aad_data = bv(n_bits=128)
-        aad_bval = bv(n_bits=16)
-
-        # Load the AAD
-        n_bits = len(aad) * 8
-        aad_data.assign('{:0{width}b}'.format(int.from_bytes(aad, "big"), width=n_bits))
-        aad_bval.assign((n_bits // 8) * '1')
-
-        self.data.value = aad_data.get_value()
-        self.bval.value = aad_bval.get_value()
+        if self.n_lanes == 1:
+            n_bytes = len(aad)
+
+            # Load the AAD
+            self.data.value = int.from_bytes(aad, "big") << (8 * (16 - n_bytes))
+            self.bval.value = BVAL_MASK[n_bytes]
+        else:
+            data, bval      = beat_value(aad, self.n_lanes)
+            self.data.value = data
+            self.bval.value = bval
         yield RisingEdge(self.clk)
         self.bval.value = 0
 
@@ -51,12 +76,13 @@ class pkt_driver:
 
 # ======================================================================================
 class pt_driver:
-    def __init__(self, clk, bval, data, ready):
+    def __init__(self, clk, bval, data, ready, n_lanes=1):
 
-        self.clk   = clk
-        self.bval  = bval
-        self.data  = data
-        self.ready = ready
+        self.clk     = clk
+        self.bval    = bval
+        self.data    = data
+        self.ready   = ready
+        self.n_lanes = n_lanes
 
     # ======================================================================================
     @cocotb.coroutine
@@ -67,16 +93,18 @@ class pt_driver:
         A random delay could be inserted between the last loaded AAD data and the loading
         of the first PT block. Another delay could be inserted between the last
         loaded PT block and the falling edge of the packet valid.
+        Data and byte valid are left aligned.
+        With more lanes, pt is the list of the blocks of the beat.
         '''
-        pt_data = bv(n_bits=128)
-        pt_dval = bv(n_bits=16)
-
-        n_bits = len(pt) * 8
-        pt_data.assign('{:0{width}b}'.format(int.from_bytes(pt, "big"), width=n_bits))
-        pt_dval.assign((n_bits // 8) * '1')
-
-        self.data.value = pt_data.get_value()
-        self.bval.value = pt_dval.get_value()
+        if self.n_lanes == 1:
+            n_bytes = len(pt)
+
+            self.data.value = int.from_bytes(pt, "big") << (8 * (16 - n_bytes))
+            self.bval.value = BVAL_MASK[n_bytes]
+        else:
+            data, bval      = beat_value(pt, self.n_lanes)
+            self.data.value = data
+            self.bval.value = bval
         yield RisingEdge(self.clk)
         while (self.ready.value != 1):
             yield RisingEdge(self.clk)
@@ -105,25 +133,55 @@ class data_driver:
 
 
     # ======================================================================================
-    def read(self):
-        val  = self.bval.value.integer
-        data = self.data.value.integer
+    def read(self, val=None):
         '''
         Example:
                 val  = 0xFFC0 <- 10 bits = '1'
                 data = 0x756A9E2C1904DF026D35000000000000
                 -----------------------------------------
                 Only the first 10 bytes from the left are valid
+
+        The byte valid can be passed when it has been read already.
+        The block is a memoryview slice of the data vector bytes.
         '''
-        sel_byte = 0
-        for _ in range(16):
-            if val & 0x8000:
-                sel_byte += 1
-                val <<= 1
-            else:
-                break
+        if val is None:
+            val = self.bval.value.integer
 
-        shift   = 16 - sel_byte
-        data  >>= (shift * 8)
-        block   = data.to_bytes(sel_byte, 'big')
+        sel_byte = BVAL_DECODE.get(val)
+        if sel_byte is None:
+            raise TestFailure(f"Byte valid 0x{val:04X} is not left aligned and contiguous")
+
+        block = memoryview(self.data.value.buff)[:sel_byte]
         return(block)
+
+
+    # ======================================================================================
+    def read_lanes(self, n_lanes, val=None):
+        '''
+        Return the list of the blocks of a beat of n_lanes lanes, lane 0 first.
+        Each lane has its own 16-bit byte valid, lane 0 in the MSbs. The valid lanes
+        are contiguous from lane 0 and only the last one can be partial.
+        '''
+        if val is None:
+            val = self.bval.value.integer
+
+        buff   = memoryview(self.data.value.buff)
+        blocks = []
+
+        for lane in range(n_lanes):
+            lane_val = (val >> (16 * (n_lanes - 1 - lane))) & 0xFFFF
+            if lane_val == 0:
+                break
+
+            sel_byte = BVAL_DECODE.get(lane_val)
+            if sel_byte is None:
+                raise TestFailure(f"Byte valid 0x{lane_val:04X} of lane {lane} is not left aligned and contiguous")
+            if len(blocks) and len(blocks[-1]) != 16:
+                raise TestFailure(f"Lane {lane} follows a partial lane")
+
+            blocks.append(buff[16 * lane : 16 * lane + sel_byte])
+
+        if val & ((1 << (16 * (n_lanes - len(blocks)))) - 1):
+            raise TestFailure(f"Byte valid 0x{val:0{4 * n_lanes}X}: the valid lanes are not contiguous")
+
+        return blocks
@@ -1,12 +1,20 @@
+import os
+import json
 import random
 import re
 import cocotb
+import gcm_ref
+import gcm_model
 
+from cocotb.clock      import Clock
+from cocotb.utils      import get_sim_time
 from cocotb.result     import TestFailure
 from cocotb.binary     import BinaryValue as bv
-from cocotb.triggers   import Timer, RisingEdge
+from cocotb.triggers   import Timer, RisingEdge, FallingEdge, ClockCycles
 
-from key_exp           import aes_expand_key
+from key_exp           import exp_key, expand_key
+from gcm_stimulus      import random_blocks, user_blocks
+from gcm_driver        import BVAL_MASK, pkt_driver, aad_driver, pt_driver
 from progress.bar      import ShadyBar as Bar
 
 
@@ -19,6 +27,63 @@ AES_KEY_TYPES       = [AES_128, AES_192, AES_256]
 RANDOM_PARAM        = 'RANDOM'
 EMPTY_PARAM         = 'EMPTY'
 
+MAX_PENDING_TRAN    = 100
+
+# Clock period in ns and reset window of the tests
+CLK_PERIOD          = 10
+RST_WINDOW          = CLK_PERIOD + (CLK_PERIOD * 3 // 4)
+
+# IV lengths: the 96-bit IV is the fast path, the others are hashed into J0
+IV_96_N_BYTES       = 12
+MAX_IV_N_BYTES      = 64
+
+
+# ======================================================================================
+def tmp_dir():
+    '''
+    Folder of the configuration and of the reports of the test. The regression
+    runner gives each test its own folder '''
+
+    return os.environ.get('GCM_TMP_DIR', './tmp/')
+
+
+# ======================================================================================
+def load_config():
+    '''
+    Return the configuration of the test, saved in <seed>.json by the testbench '''
+
+    with open(tmp_dir() + str(cocotb.RANDOM_SEED) + '.json', 'r') as config_file:
+        return dict(json.load(config_file))
+
+
+# ======================================================================================
+def cycle():
+    '''
+    Return the number of clocks since the start of the simulation '''
+
+    return int(get_sim_time('ns')) // CLK_PERIOD
+
+
+# ======================================================================================
+@cocotb.coroutine
+def check_pkt(intf, pkt):
+    '''
+    Compare the CT and the TAG of the DUT with the model of a packet made by
+    gcm_gctr.new_pkt. Return the number of errors '''
+
+    errors = 0
+    for block in pkt['model'].data_out:
+        ct = yield intf.ct.get()
+        if ct != block:
+            errors += 1
+
+    tag = yield intf.tag.get()
+    pkt['model'].get_tag(tag)
+    if tag != pkt['model'].tag[-1]:
+        errors += 1
+
+    return errors
+
 
 # ======================================================================================
 class gcm_gctr(object):
@@ -28,10 +93,56 @@ class gcm_gctr(object):
         self.pt             = {'data' : [], 'n_bytes' : 0}
         self.iv_loaded      = False
         self.key_loaded     = False
+        self.slot_keys      = {}
         self.data           = {}
         self.config         = {}
 
 
+    # ======================================================================================
+    def model_pkt(self):
+        '''
+        Return the model class of a packet. The pure Python model runs without pycryptodome '''
+
+        if self.config.get('model', 'crypto') == 'ref' or gcm_model.AES == None:
+            return gcm_ref.gcm
+        return gcm_model.gcm
+
+
+    # ======================================================================================
+    def drivers(self):
+        '''
+        Return the packet, AAD and PT drivers, with the lanes of the IP '''
+
+        n_lanes = self.config.get('lanes', 1)
+        pkt_drv = pkt_driver(self.dut.clk_i, self.dut.aes_gcm_ghash_pkt_val_i)
+        aad_drv = aad_driver(self.dut.clk_i, self.dut.aes_gcm_ghash_aad_bval_i, self.dut.aes_gcm_ghash_aad_i, n_lanes)
+        pt_drv  = pt_driver( self.dut.clk_i, self.dut.aes_gcm_data_in_bval_i, self.dut.aes_gcm_data_in_i,
+                             self.dut.aes_gcm_ready_o, n_lanes)
+        return pkt_drv, aad_drv, pt_drv
+
+
+    # ======================================================================================
+    @cocotb.coroutine
+    def start_dut(self, clk_period=CLK_PERIOD, rst_window=RST_WINDOW, n_clk=10):
+        '''
+        Start the clock, release the reset and wait n_clk clocks '''
+
+        cocotb.start_soon(self.release_rst(rst_window))
+        cocotb.start_soon(Clock(self.dut.clk_i, clk_period, 'ns').start())
+        yield FallingEdge(self.dut.rst_i)
+        yield ClockCycles(self.dut.clk_i, n_clk)
+
+
+    # ======================================================================================
+    @cocotb.coroutine
+    def set_mode(self, enc_dec):
+        '''
+        Set the encryption or decryption and the AES mode '''
+
+        yield self.set_enc_dec(enc_dec)
+        yield self.aes_set_mode()
+
+
     # ======================================================================================
     @cocotb.coroutine
     def release_rst(self, duration=10000):
@@ -46,9 +157,14 @@ class gcm_gctr(object):
         self.dut.aes_gcm_icb_stop_cnt_i.value     = 0
         self.dut.aes_gcm_iv_val_i.value           = 0
         self.dut.aes_gcm_iv_i.value               = 0
+        if self.config.get('lanes', 1) == 1:
+            self.dut.aes_gcm_icb_n_blocks_i.value = 0
+            self.dut.aes_gcm_iv_hash_i.value      = 0
         self.dut.aes_gcm_icb_start_cnt_i.value    = 0
         self.dut.aes_gcm_key_word_i.value         = 0
         self.dut.aes_gcm_key_word_val_i.value     = 0
+        if self.config.get('key_slots', 1) > 1:
+            self.dut.aes_gcm_key_slot_i.value     = 0
         self.dut.aes_gcm_ghash_pkt_val_i.value    = 0
         self.dut.aes_gcm_data_in_i.value          = 0
         self.dut.aes_gcm_data_in_bval_i.value     = 0
@@ -77,9 +193,10 @@ class gcm_gctr(object):
 
     # ======================================================================================
     @cocotb.coroutine
-    def load_iv(self, iv):
+    def load_iv(self, iv, n_blocks=0):
         '''
-        Load the IV vector.
+        Load the IV vector and the number of ICB blocks of the packet (0: the counter
+        runs until it is stopped). While the ICB runs, the IV is kept for the next start.
         After the 96 bit IV is loaded, a flag is set '''
 
         iv_bv = bv(n_bits=iv['n_bytes'] * 8)
@@ -89,6 +206,8 @@ class gcm_gctr(object):
 
         self.dut.aes_gcm_iv_val_i.value   = 1
         self.dut.aes_gcm_iv_i.value       = iv_bv.get_value()
+        if self.config.get('lanes', 1) == 1:
+            self.dut.aes_gcm_icb_n_blocks_i.value = n_blocks
         yield RisingEdge(self.dut.clk_i)
         self.dut.aes_gcm_iv_val_i.value   = 0
         self.dut.aes_gcm_iv_i.value       = 0
@@ -97,6 +216,56 @@ class gcm_gctr(object):
         self.iv_loaded = True
 
 
+    # ======================================================================================
+    @cocotb.coroutine
+    def hash_iv(self, iv):
+        '''
+        Start the ICB with an IV that is not 96 bit long. The start with the IV hash
+        set creates H, then the IV blocks are loaded as AAD in a packet: the GHASH
+        computes J0 = GHASH(IV || pad || len(IV)) and the ICB starts from it.
+        The ready is set again when the J0 block is encrypted '''
+
+        self.iv_loaded = True
+        self.dut.aes_gcm_iv_hash_i.value = 1
+        yield self.start_icb()
+
+        # H is loaded: the IP is ready for the IV blocks
+        yield self.cipher_is_ready()
+
+        iv_bytes = bytes.fromhex(iv['data'])
+
+        self.dut.aes_gcm_ghash_pkt_val_i.value = 1
+        for i in range(0, len(iv_bytes), 16):
+            block = iv_bytes[i : i + 16]
+            self.dut.aes_gcm_ghash_aad_i.value      = int.from_bytes(block, "big") << (8 * (16 - len(block)))
+            self.dut.aes_gcm_ghash_aad_bval_i.value = BVAL_MASK[len(block)]
+            yield RisingEdge(self.dut.clk_i)
+
+        self.dut.aes_gcm_ghash_aad_bval_i.value = 0
+        self.dut.aes_gcm_ghash_pkt_val_i.value  = 0
+        yield RisingEdge(self.dut.clk_i)
+
+        # The ready of the IV blocks is cleared with the IV hash
+        self.dut.aes_gcm_iv_hash_i.value = 0
+        yield RisingEdge(self.dut.clk_i)
+
+        self.dut._log.info(f"IV  = 0x{iv['data']}, {iv['n_bytes']} bytes: J0 is hashed")
+
+
+    # ======================================================================================
+    @cocotb.coroutine
+    def start_iv(self, iv, n_blocks=0):
+        '''
+        Load the IV and start the ICB: a 96 bit IV is loaded in a clock, the other
+        lengths are hashed by the GHASH of the IP '''
+
+        if iv['n_bytes'] == IV_96_N_BYTES:
+            yield self.load_iv(iv, n_blocks)
+            yield self.start_icb()
+        else:
+            yield self.hash_iv(iv)
+
+
     # ======================================================================================
     @cocotb.coroutine
     def start_icb(self):
@@ -129,6 +298,17 @@ class gcm_gctr(object):
         self.dut._log.info("Start ICB counter")
 
 
+    # ======================================================================================
+    @cocotb.coroutine
+    def pipe_reset(self):
+        '''
+        Flush the AES pipeline from the data of the previous packet '''
+
+        self.dut.aes_gcm_pipe_reset_i.value = 1
+        yield RisingEdge(self.dut.clk_i)
+        self.dut.aes_gcm_pipe_reset_i.value = 0
+
+
     # ======================================================================================
     @cocotb.coroutine
     def aes_set_mode(self):
@@ -193,17 +373,13 @@ class gcm_gctr(object):
         else: # "256"
             exp_rnd = 15
 
-        exp_key = aes_expand_key(key['data'], self.config['aes_mode'])
-        key_bv  = bv(n_bits=AES_KEY_256_WIDTH)
+        # The schedule is cached: re-keying with the same key does not expand it again
+        key_sch = expand_key(bytes.fromhex(key['data']), exp_key.key_size[self.config['aes_mode']])
 
         for i in range (exp_rnd):
-            # Key extended with trailing zeros
-            key_ext = ''.join(str('{:0>2X}'.format(x)) for x in exp_key[:16]) + str(32 * '0')
-            key_bv.assign('{:>0{width}b}'.format(int(key_ext, 16), width=AES_KEY_256_WIDTH))
-            exp_key = exp_key[16:]
-            # The Key is loaded left aligned
+            # The Key is loaded left aligned, extended with trailing zeros
             self.dut.aes_gcm_key_word_val_i.value = (i + 1)
-            self.dut.aes_gcm_key_word_i.value     = key_bv.get_value()
+            self.dut.aes_gcm_key_word_i.value     = int.from_bytes(key_sch[16 * i : 16 * (i + 1)], 'big') << 128
             yield RisingEdge(self.dut.clk_i)
 
         self.dut.aes_gcm_key_word_val_i.value = 0
@@ -214,6 +390,130 @@ class gcm_gctr(object):
         self.key_loaded = True
 
 
+    # ======================================================================================
+    def select_key_slot(self):
+        '''
+        Select the key slot of the packet. The packets are interleaved
+        on random slots: the key of a slot is created and loaded on the first packet of the
+        slot, the next packets reuse it as the IP keeps the key and its H. Without key slots
+        the key is loaded when it changes: a packet with the key of the previous packet
+        skips the key load and the H computation. Return True when the key must be loaded '''
+
+        n_slots = self.config.get('key_slots', 1)
+        if n_slots == 1:
+            self.data['key_slot'] = 0
+            if self.slot_keys.get(0) == self.data['key']:
+                self.dut._log.info("KEY unchanged: H is not computed again")
+                return False
+            self.slot_keys[0] = self.data['key']
+            return True
+
+        slot = random.randrange(n_slots)
+        self.data['key_slot'] = slot
+
+        if slot in self.slot_keys:
+            self.data['key'] = self.slot_keys[slot]
+            self.dut._log.info(f"KEY slot {slot}: cached KEY = 0x{self.data['key']['data']}")
+            return False
+
+        self.slot_keys[slot] = self.data['key']
+        self.dut._log.info(f"KEY slot {slot}: new KEY")
+        return True
+
+
+    # ======================================================================================
+    def set_key_slot(self):
+        '''
+        Drive the key slot of the packet: the slot must not change while a packet is
+        processed, it is set once the previous packet is stopped and flushed '''
+
+        if self.config.get('key_slots', 1) > 1:
+            self.dut.aes_gcm_key_slot_i.value = self.data['key_slot']
+
+
+    # ======================================================================================
+    @cocotb.coroutine
+    def load_key_if_needed(self, key, key_load):
+        '''
+        Load the KEY, or its expanded stages when the IP has no key expansion logic.
+        Nothing is loaded when key_load is False: the IP holds the KEY already '''
+
+        if key_load:
+            if self.config['key_pre_exp'] == True:
+                yield self.load_pre_exp_key(key)
+            else:
+                yield self.load_key(key)
+
+
+    # ======================================================================================
+    @cocotb.coroutine
+    def restart_icb(self, key_load):
+        '''
+        Stop and flush the previous packet, load the KEY if needed and the IV of
+        self.data, then start the ICB. An IV that is not 96 bit long is hashed '''
+
+        yield self.stop_icb()
+        yield self.pipe_reset()
+        yield self.load_key_if_needed(self.data['key'], key_load)
+        yield self.start_iv(self.data['iv'])
+
+
+    # ======================================================================================
+    def new_pkt(self, n_bytes, key, model_pkt, rnd):
+        '''
+        Create the KEY, IV and n_bytes of random PT of a packet and its expected CT.
+        The KEY of the previous packet is kept when key is given '''
+
+        self.config_data()
+        if key != None:
+            self.data['key'] = key
+
+        pkt = {'key'    : self.data['key'],
+               'iv'     : self.data['iv'],
+               'blocks' : [bytes(block) for block in random_blocks(n_bytes, rnd)]}
+
+        pkt['model'] = model_pkt(pkt['key'], pkt['iv'], 'enc')
+        for block in pkt['blocks']:
+            pkt['model'].load_plain_text(block)
+
+        return pkt
+
+
+    # ======================================================================================
+    def icb_n_blocks(self, data=None):
+        '''
+        Return the number of ICB blocks of a packet, J0 and a block per PT block, when
+        the packets are queued. Return 0, the counter runs until it is stopped, when they
+        are not, when the packet has no PT (the ready is set by the keystream blocks)
+        or when the IV is hashed '''
+
+        data = self.data if data == None else data
+
+        if self.config.get('queue_pkt', False) == False or data['pt_n_bytes'] == 0:
+            return 0
+
+        # A hashed J0 starts the counter from any value: the packet runs until it is stopped
+        if data['iv']['n_bytes'] != IV_96_N_BYTES:
+            return 0
+
+        return 1 + ((data['pt_n_bytes'] + 0xF) >> 4)
+
+
+    # ======================================================================================
+    def config_next_data(self):
+        '''
+        Produce the data of the next packet and return them. The next packet keeps
+        the Key of the current one, whose data are left untouched '''
+
+        data      = self.data
+        self.data = {}
+        self.config_data()
+        self.data['key'] = data['key']
+
+        data, self.data = self.data, data
+        return data
+
+
     # ======================================================================================
     @cocotb.coroutine
     def cipher_is_ready(self):
@@ -247,28 +547,37 @@ class gcm_gctr(object):
         else:
             key['n_bytes'] = 32
 
-        # Load the IV
-        iv['n_bytes'] = 12
+        # IV length: 0 draws the length of each packet, the 96-bit IV for half of them.
+        # A user IV is 96 bit long, unless the length is given
+        iv_data = self.config['iv']
+        iv['n_bytes'] = self.config.get('iv_n_bytes', IV_96_N_BYTES)
+        if iv['n_bytes'] == 0 and iv_data != RANDOM_PARAM:
+            iv['n_bytes'] = IV_96_N_BYTES
+        elif iv['n_bytes'] == 0:
+            iv['n_bytes'] = IV_96_N_BYTES if random.getrandbits(1) else random.randint(1, MAX_IV_N_BYTES)
 
-        # Generate a random IV if not provided from the user
-        if self.config['iv'] == RANDOM_PARAM:
-            self.config['iv'] = ''.join(['{:X}'.format(random.randint(0, 16)) for _ in range(24)])
+        # Generate a random IV if not provided from the user.
+        # The configuration is left untouched: each packet gets a new IV
+        if iv_data == RANDOM_PARAM:
+            iv['data'] = '{:0{width}X}'.format(random.getrandbits(8*iv['n_bytes']), width=2*iv['n_bytes'])
 
         # Load the IV
-        if re.fullmatch(r"^[0-9A-F]+$", self.config['iv']) is not None:
+        elif re.fullmatch(r"^[0-9A-F]+$", iv_data) is not None:
             # Right align, pad width 0s, {width}.{precision (max)}
-            iv['data'] = '{:0>{width}.{max}}'.format(self.config['iv'], width=2*iv['n_bytes'], max=2*iv['n_bytes'])
+            iv['data'] = '{:0>{width}.{max}}'.format(iv_data, width=2*iv['n_bytes'], max=2*iv['n_bytes'])
         else:
             raise TestFailure("IV is not an hexadecimal number")
 
-        # Generate a random Key if not provided from the user
-        if self.config['key'] == RANDOM_PARAM:
-            self.config['key'] = ''.join(['{:X}'.format(random.randint(0, 16)) for _ in range(64)])
+        # Generate a random Key if not provided from the user.
+        # The configuration is left untouched: each packet gets a new Key
+        key_data = self.config['key']
+        if key_data == RANDOM_PARAM:
+            key['data'] = '{:0{width}X}'.format(random.getrandbits(8*key['n_bytes']), width=2*key['n_bytes'])
 
         # Load the Key
-        if re.fullmatch(r"^[0-9A-F]+$", self.config['key']) is not None:
+        elif re.fullmatch(r"^[0-9A-F]+$", key_data) is not None:
             # Right align, pad width 0s, {width}.{precision (max)}
-            key['data'] = '{:0>{width}.{max}}'.format(self.config['key'], width=2*key['n_bytes'], max=2*key['n_bytes'])
+            key['data'] = '{:0>{width}.{max}}'.format(key_data, width=2*key['n_bytes'], max=2*key['n_bytes'])
         else:
             raise TestFailure("Key is not an hexadecimal number")
 
@@ -323,7 +632,8 @@ class gcm_gctr(object):
         #   bit-2 : inserts a delay between the last AAD data and the first PT data
         #   bit-3 : inserts a delay between a Data in and the next one
         #   bit-4 : inserts a delay between the last Data in and the end of the packet
-        self.data['delays'] = random.randint(0, 31)
+        # The bits given with '-W' are set in every packet
+        self.data['delays'] = random.randint(0, 31) | self.config.get('delays_on', 0)
 
         # N.B. When decrypting, there cannot be an overlap of the AAD and the CT.
         #      AAD+CT is the stream of data that enters the GHASH.
@@ -331,6 +641,25 @@ class gcm_gctr(object):
         if self.config['enc_dec'] == 'dec':
             self.data['delays'] &= ~(1 << 2)
 
+        # The performance check measures the DUT under back-to-back stimulus
+        if self.config.get('perf_tol') != None:
+            self.data['delays'] = 0
+
+
+    # ======================================================================================
+    @cocotb.coroutine
+    def load_blocks(self, blocks, n_blocks, tran, model_tran, bar_txt):
+        '''
+        Queue the blocks for the sequencer and for the scoreboard.
+        Both the queues refer to the same block object. The blocks are pulled from
+        the stream only when the sequencer queue has room for them '''
+
+        with Bar(bar_txt, max=n_blocks) as bar:
+            for block in blocks:
+                yield tran.put(block)
+                model_tran.append(block)
+                bar.next()
+
 
     # ======================================================================================
     @cocotb.coroutine
@@ -339,99 +668,36 @@ class gcm_gctr(object):
         Send AAD and PT data through the pipeline '''
 
         # Create 128-bit AAD words
-        aad_n_trans     = aad_n_bytes >> 4
-        aad_last_trans  = 1 if aad_n_bytes & 0xF else 0
-        aad_tot_trans   = aad_n_trans + aad_last_trans
+        aad_tot_trans   = (aad_n_bytes + 0xF) >> 4
 
         # Create 128-bit PT words
-        pt_n_trans      = pt_n_bytes >> 4
-        pt_last_trans   = 1 if pt_n_bytes & 0xF else 0
-        pt_tot_trans    = pt_n_trans + pt_last_trans
+        pt_tot_trans    = (pt_n_bytes + 0xF) >> 4
 
         str_align       = 18 + max(len(str(aad_tot_trans)), len(str(pt_tot_trans)))
 
+        # Random data generator of the packet, seeded from the test seed
+        rnd = random.Random(random.getrandbits(64))
+
         # Load the AAD data
         if aad_tot_trans:
             bar_txt = ('AAD: generating ' + str(aad_tot_trans)).ljust(str_align) + ' block'
             bar_txt = (bar_txt + 's') if aad_tot_trans != 1 else (bar_txt + ' ')
             if self.config['aad'] == RANDOM_PARAM:
-                with Bar(bar_txt, max=aad_tot_trans) as bar:
-                    while aad_n_trans:
-                        if len(aad_tran) < 100:
-                            transaction = bytes.fromhex('{:032X}'.format(random.randint(0, (2**128)-1)))
-                            aad_tran.append(transaction)
-                            aad_model_tran.append(transaction)
-                            aad_n_trans -= 1
-                            bar.next()
-                        else:
-                            yield RisingEdge(self.dut.clk_i)
-
-                    # Create the last chunck of AAD shorter than a word
-                    if aad_last_trans:
-                        n_rem_bytes = aad_n_bytes & 0xF
-                        transaction = bytes.fromhex('{:0{width}X}'.format(random.randint(0, (2**(8*n_rem_bytes))-1), width=2*n_rem_bytes))
-                        aad_tran.append(transaction)
-                        aad_model_tran.append(transaction)
-                        bar.next()
+                aad_blocks = random_blocks(aad_n_bytes, rnd)
             else:
                 self.dut._log.info(f"Load User AAD: 0x{self.config['aad']}\n")
-                aad_data = []
-                with Bar(bar_txt, max=aad_tot_trans) as bar:
-                    step = 32
-                    for i in range(0, len(self.config['aad']), step):
-                        chunck = self.config['aad'][i : i + step]
-                        if len(chunck) & 0x1:
-                            chunck = chunck + '0'
-                        aad_data.append(chunck)
-
-                    for item in aad_data:
-                        transaction = bytes.fromhex(item)
-                        aad_tran.append(transaction)
-                        aad_model_tran.append(transaction)
-                        bar.next()
-                        yield RisingEdge(self.dut.clk_i)
-
-                bar.finish()
+                aad_blocks = user_blocks(self.config['aad'])
+
+            yield self.load_blocks(aad_blocks, aad_tot_trans, aad_tran, aad_model_tran, bar_txt)
 
         # Load the PT data
         if pt_tot_trans:
             bar_txt = ('PT:  generating ' + str(pt_tot_trans)).ljust(str_align) + ' block'
             bar_txt = (bar_txt + 's') if pt_tot_trans != 1 else (bar_txt + ' ')
             if self.config['data'] == RANDOM_PARAM:
-                with Bar(bar_txt, max=pt_tot_trans) as bar:
-                    while pt_n_trans:
-                        if len(pt_tran) < 100:
-                            transaction = bytes.fromhex('{:032X}'.format(random.randint(0, (2**128)-1)))
-                            pt_tran.append(transaction)
-                            pt_model_tran.append(transaction)
-                            pt_n_trans -= 1
-                            bar.next()
-                        else:
-                            yield RisingEdge(self.dut.clk_i)
-
-                    # Create the last chunck of PT shorter than a word
-                    if pt_last_trans:
-                        n_rem_bytes = pt_n_bytes & 0xF
-                        transaction = bytes.fromhex('{:0{width}X}'.format(random.randint(0, (2**(8*n_rem_bytes))-1), width=2*n_rem_bytes))
-                        pt_tran.append(transaction)
-                        pt_model_tran.append(transaction)
-                        bar.next()
+                pt_blocks = random_blocks(pt_n_bytes, rnd)
             else:
                 self.dut._log.info(f"Load User Data: 0x{self.config['data']}\n")
-                pt_data = []
-                with Bar(bar_txt, max=pt_tot_trans) as bar:
-                    step = 32
-                    for i in range(0, len(self.config['data']), step):
-                        chunck = self.config['data'][i : i + step]
-                        if len(chunck) & 0x1:
-                            chunck = chunck + '0'
-                        pt_data.append(chunck)
-
-                    for item in pt_data:
-                        transaction = bytes.fromhex(item)
-                        pt_tran.append(transaction)
-                        pt_model_tran.append(transaction)
-                        bar.next()
-                        yield RisingEdge(self.dut.clk_i)
-
-                bar.finish()
+                pt_blocks = user_blocks(self.config['data'])
+
+            yield self.load_blocks(pt_blocks, pt_tot_trans, pt_tran, pt_model_tran, bar_txt)
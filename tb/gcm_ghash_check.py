@@ -0,0 +1,138 @@
+import cocotb
+
+from collections     import deque
+from cocotb.triggers import RisingEdge, ReadOnly
+from gcm_ref         import aes_round_keys, aes_encrypt, ghash_table
+
+
+# ======================================================================================
+class ghash_check(object):
+    '''
+    Follow the GHASH accumulator y_q of the DUT one block at a time.
+    The DUT value is sampled through the hierarchy after each clock with y_val set,
+    i.e. after each AAD, CT or length block is absorbed. The model value is computed
+    from the blocks received by the monitors. The two streams are compared in order:
+    the first diverging block of each packet is reported.
+    With more lanes the DUT absorbs a beat of blocks per clock: the check is disabled.
+    '''
+
+    # ======================================================================================
+    def __init__(self, dut, n_lanes=1):
+        self.dut      = dut
+        self.clk      = dut.clk_i
+        self.dut_y    = deque()
+        self.model_y  = deque()
+        self.errors   = []
+        self.pkt      = 0
+        self.diverged = set()
+
+        if n_lanes > 1:
+            dut._log.info(f"GHASH check disabled: the DUT absorbs up to {n_lanes} blocks per clock")
+            self.y_q   = None
+            return
+
+        try:
+            ghash      = dut.u_aes_gcm.u_gcm_ghash
+            self.y_q   = ghash.y_q
+            self.y_val = ghash.y_val
+        except AttributeError:
+            dut._log.warning("GHASH check disabled: the simulator does not give access to gcm_ghash")
+            self.y_q   = None
+            return
+
+        cocotb.start_soon(self._sample())
+
+    # ======================================================================================
+    @cocotb.coroutine
+    def _sample(self):
+
+        while True:
+            # Sleep while no block is absorbed. y_val is combinatorial: check its final value
+            if self.y_val.value != 1:
+                yield RisingEdge(self.y_val)
+                yield ReadOnly()
+                if self.y_val.value != 1:
+                    continue
+
+            # y_q is loaded on the next rising edge
+            yield RisingEdge(self.clk)
+            yield ReadOnly()
+            self.dut_y.append(self.y_q.value.integer)
+            self.compare()
+
+    # ======================================================================================
+    def bind(self, mon_aad, mon_ct, mon_tag):
+        '''
+        Add the check callbacks to the monitors. mon_ct is the monitor of the
+        CT: the data out monitor in encryption, the data in monitor in decryption '''
+
+        if self.y_q == None:
+            return
+
+        mon_aad.add_callback(self.aad)
+        mon_ct.add_callback(self.ct)
+        mon_tag.add_callback(self.tag)
+
+    # ======================================================================================
+    def start_pkt(self, key):
+        '''
+        Compute H from the Key of the new packet and clear the accumulator '''
+
+        rk             = aes_round_keys(key['data'], str(8 * key['n_bytes']))
+        self.gf        = ghash_table(aes_encrypt(rk, 0))
+        self.y         = 0
+        self.aad_len   = 0
+        self.ct_len    = 0
+        self.n_block   = 0
+        self.pkt      += 1
+
+    # ======================================================================================
+    def iv(self, iv):
+        '''
+        Follow the J0 of an IV that is not 96 bit long: the DUT absorbs the IV blocks
+        and the IV length, then the packet starts from a clear accumulator '''
+
+        if self.y_q == None or iv['n_bytes'] == 12:
+            return
+
+        iv_bytes = bytes.fromhex(iv['data'])
+        for i in range(0, len(iv_bytes), 16):
+            block = iv_bytes[i : i + 16]
+            self.absorb(int.from_bytes(block, 'big') << (8 * (16 - len(block))), 'IV')
+        self.absorb(8 * len(iv_bytes), 'IV length')
+
+        self.y = 0
+
+    # ======================================================================================
+    def absorb(self, x, kind):
+        self.y = self.gf.mul(self.y ^ x)
+        self.model_y.append((self.pkt, self.n_block, kind, self.y))
+        self.n_block += 1
+        self.compare()
+
+    # ======================================================================================
+    def aad(self, block):
+        self.aad_len += len(block)
+        self.absorb(int.from_bytes(block, 'big') << (8 * (16 - len(block))), 'AAD')
+
+    # ======================================================================================
+    def ct(self, block):
+        self.ct_len += len(block)
+        self.absorb(int.from_bytes(block, 'big') << (8 * (16 - len(block))), 'CT')
+
+    # ======================================================================================
+    def tag(self, tag):
+        self.absorb(((8 * self.aad_len) << 64) | (8 * self.ct_len), 'length')
+
+    # ======================================================================================
+    def compare(self):
+        while len(self.dut_y) and len(self.model_y):
+            dut_y              = self.dut_y.popleft()
+            pkt, n, kind, y    = self.model_y.popleft()
+
+            if dut_y != y and pkt not in self.diverged:
+                self.diverged.add(pkt)
+                error = (f"Packet {pkt}: GHASH diverges at block {n} ({kind}): " +
+                         f"DUT Y = {dut_y:032X}, model Y = {y:032X}")
+                self.errors.append(error)
+                self.dut._log.error(error)
@@ -1,17 +1,23 @@
-from Crypto.Cipher import AES
 from cocotb import log
 
+# pycryptodome is optional: gcm_ref.gcm is used when it is not installed
+try:
+    from Crypto.Cipher import AES
+except ImportError:
+    AES = None
+
 # ======================================================================================
 class gcm:
 
     # ======================================================================================
-    def __init__(self, key, icb, ed):
+    def __init__(self, key, icb, ed, data_out=None, tag=None):
 
         # encryption/decryption
         self.ed = ed
 
-        self.data_out = []
-        self.tag = []
+        # The expected data can be shared amongst the models of consecutive packets
+        self.data_out = [] if data_out is None else data_out
+        self.tag      = [] if tag is None else tag
 
         _key = int(key['data'], 16).to_bytes(key['n_bytes'], byteorder='big')
         _icb = int(icb['data'], 16).to_bytes(icb['n_bytes'], byteorder='big')
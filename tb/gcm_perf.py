@@ -0,0 +1,243 @@
+import time
+import json
+
+from cocotb.utils import get_sim_time
+
+# Number of AES rounds of each key size
+AES_N_ROUNDS    = {'128' : 10, '192' : 12, '256' : 14}
+
+# Minimum number of data in blocks of a packet to check the steady-state throughput
+PERF_MIN_BLOCKS = 64
+
+
+# ======================================================================================
+def expected_perf(config):
+    '''
+    Return the DUT figures expected from the IP configuration with the delays disabled:
+      * data_bits_per_clk : a 128-bit block per lane every N/k clocks, with N the rounds of
+                            the key size and k the aes_round instances (n_rounds)
+      * data_latency      : the CT follows the PT by one clock
+      * tag_latency       : the TAG is valid 3 clocks after the packet valid falling edge,
+                            which is driven on the clock after the last data in block
+    The keystream is computed ahead of the data and the gfmul is combinatorial: the pipe
+    stages and the number of gfmul IPs only change the time to the first keystream block '''
+
+    n_rounds = AES_N_ROUNDS[config['aes_mode']]
+    n_lanes  = config.get('lanes', 1)
+
+    return {'data_bits_per_clk' : round(128 * n_lanes * min(config['n_rounds'], n_rounds) / n_rounds, 3),
+            'data_latency'      : 1,
+            'tag_latency'       : 4}
+
+
+# ======================================================================================
+class gcm_perf(object):
+    '''
+    Collect the simulation speed and the DUT throughput of a test.
+    The monitors report the clock cycle each block is received on: the DUT
+    figures are in clock cycles, the simulator figures in wall-clock seconds.
+    In decryption the data in are the CT and the data out are the PT.
+    '''
+
+    # ======================================================================================
+    def __init__(self, clk_period):
+        self.clk_period = clk_period
+        self.pkts       = []
+        self.pkt        = None
+        self.start      = time.perf_counter()
+        self.start_clk  = self.cycle()
+
+
+    # ======================================================================================
+    def cycle(self):
+        return int(get_sim_time('ns')) // self.clk_period
+
+
+    # ======================================================================================
+    def bind(self, mon_aad, mon_data_in, mon_data_out, mon_tag):
+        '''
+        Add the perf callbacks to the monitors '''
+
+        mon_aad.add_callback(self.aad)
+        mon_data_in.add_callback(self.data_in)
+        mon_data_out.add_callback(self.data_out)
+        mon_tag.add_callback(self.tag)
+
+
+    # ======================================================================================
+    def start_pkt(self, key_load=True):
+        self.pkt = {'key_load'        : key_load,
+                    'start'           : self.cycle(),
+                    'ready'           : None,
+                    'aad_blocks'      : 0,
+                    'data_in_blocks'  : 0,
+                    'data_in_bits'    : 0,
+                    'data_out_blocks' : 0,
+                    'first_data_in'   : None,
+                    'last_data_in'    : None,
+                    'first_data_out'  : None,
+                    'last_beat'       : None,
+                    'tag'             : None}
+        self.pkts.append(self.pkt)
+
+
+    # ======================================================================================
+    def ready(self):
+        '''
+        The keystream of the packet is ready: end of the KEY, IV, H and J0 setup '''
+
+        self.pkt['ready'] = self.cycle()
+
+
+    # ======================================================================================
+    def aad(self, block):
+        self.pkt['aad_blocks'] += 1
+        self.pkt['last_beat']   = self.cycle()
+
+
+    # ======================================================================================
+    def data_in(self, block):
+        clk = self.cycle()
+        if self.pkt['first_data_in'] == None:
+            self.pkt['first_data_in'] = clk
+        self.pkt['data_in_blocks'] += 1
+        self.pkt['data_in_bits']   += 8 * len(block)
+        self.pkt['last_data_in']    = clk
+        self.pkt['last_beat']       = clk
+
+
+    # ======================================================================================
+    def data_out(self, block):
+        if self.pkt['first_data_out'] == None:
+            self.pkt['first_data_out'] = self.cycle()
+        self.pkt['data_out_blocks'] += 1
+
+
+    # ======================================================================================
+    def tag(self, tag):
+        self.pkt['tag'] = self.cycle()
+
+
+    # ======================================================================================
+    def pkt_report(self, pkt):
+        '''
+        Return the throughput and the latencies of a packet:
+          * data_bits_per_clk : data in bits accepted per clock, from the first to the last data in block
+          * data_latency      : cycles from the first data in block to the first data out block
+          * tag_latency       : cycles from the last AAD or data in block to the TAG
+          * setup_cycles      : cycles from the end of the previous packet to the keystream
+                                ready: flush, KEY load unless key_load is False, IV, H and J0
+          * gap_cycles        : idle clocks between the last data in block of the previous
+                                packet and the first one of the packet, set by report() '''
+
+        report = {'key_load'          : pkt['key_load'],
+                  'setup_cycles'      : None,
+                  'gap_cycles'        : None,
+                  'aad_blocks'        : pkt['aad_blocks'],
+                  'data_in_blocks'    : pkt['data_in_blocks'],
+                  'data_out_blocks'   : pkt['data_out_blocks'],
+                  'data_bits_per_clk' : None,
+                  'data_latency'      : None,
+                  'tag_latency'       : None}
+
+        if pkt['ready'] != None:
+            report['setup_cycles'] = pkt['ready'] - pkt['start']
+
+        if pkt['data_in_blocks']:
+            n_clk = pkt['last_data_in'] - pkt['first_data_in'] + 1
+            report['data_bits_per_clk'] = round(pkt['data_in_bits'] / n_clk, 3)
+
+        if pkt['first_data_in'] != None and pkt['first_data_out'] != None:
+            report['data_latency'] = pkt['first_data_out'] - pkt['first_data_in']
+
+        if pkt['last_beat'] != None and pkt['tag'] != None:
+            report['tag_latency'] = pkt['tag'] - pkt['last_beat']
+
+        return report
+
+
+    # ======================================================================================
+    def setup_report(self, pkts):
+        '''
+        Return the mean setup cycles of the packets that load their KEY and of the
+        packets that reuse the KEY of a key slot, and the mean gap between the data of
+        consecutive packets, None without such packets '''
+
+        setup = {'key_load' : [], 'key_cached' : [], 'data_gap' : []}
+        for pkt in pkts:
+            if pkt['setup_cycles'] != None:
+                setup['key_load' if pkt['key_load'] else 'key_cached'].append(pkt['setup_cycles'])
+            if pkt['gap_cycles'] != None:
+                setup['data_gap'].append(pkt['gap_cycles'])
+
+        return {k : round(sum(v) / len(v), 1) if len(v) else None for k, v in setup.items()}
+
+
+    # ======================================================================================
+    def report(self):
+        '''
+        Return the figures of the whole test and of each packet '''
+
+        wall_time = time.perf_counter() - self.start
+        sim_clk   = self.cycle() - self.start_clk
+        n_blocks  = sum(pkt['aad_blocks'] + pkt['data_in_blocks'] for pkt in self.pkts)
+        pkts      = [self.pkt_report(pkt) for pkt in self.pkts]
+
+        for prev, pkt, report in zip(self.pkts, self.pkts[1:], pkts[1:]):
+            if prev['last_data_in'] != None and pkt['first_data_in'] != None:
+                report['gap_cycles'] = pkt['first_data_in'] - prev['last_data_in'] - 1
+
+        return {'sim_cycles'   : sim_clk,
+                'wall_time'    : round(wall_time, 3),
+                'cycles/s'     : round(sim_clk / wall_time, 1),
+                'blocks'       : n_blocks,
+                'blocks/s'     : round(n_blocks / wall_time, 1),
+                'setup'        : self.setup_report(pkts),
+                'pkts'         : pkts}
+
+
+    # ======================================================================================
+    def save(self, filename, param):
+        '''
+        Write the report in a JSON file, after the test parameters in param '''
+
+        report = dict(param)
+        report.update(self.report())
+
+        with open(filename, 'w') as perf_file:
+            json.dump(report, perf_file, indent=4)
+
+        return report
+
+
+    # ======================================================================================
+    def check(self, expected, tol):
+        '''
+        Compare the figures of each packet with the expected ones. The throughput must not
+        be lower and the latencies not higher than expected by more than tol percent.
+        The throughput is checked on packets of at least PERF_MIN_BLOCKS data in blocks, the
+        TAG latency on packets with data in blocks: after an AAD block the sequencer can add
+        a random delay before closing the packet. Return the list of the misses '''
+
+        errors = []
+
+        for n, pkt in enumerate(self.pkts):
+            report = self.pkt_report(pkt)
+            name   = f"Packet {n + 1}"
+
+            if report['data_in_blocks'] >= PERF_MIN_BLOCKS:
+                if report['data_bits_per_clk'] < expected['data_bits_per_clk'] * (1 - tol / 100):
+                    errors.append(f"{name}: {report['data_bits_per_clk']} bits/clk, " +
+                                  f"expected {expected['data_bits_per_clk']} bits/clk")
+
+            if report['data_latency'] != None:
+                if report['data_latency'] > expected['data_latency'] * (1 + tol / 100):
+                    errors.append(f"{name}: CT {report['data_latency']} clocks after the PT, " +
+                                  f"expected {expected['data_latency']}")
+
+            if report['tag_latency'] != None and report['data_in_blocks']:
+                if report['tag_latency'] > expected['tag_latency'] * (1 + tol / 100):
+                    errors.append(f"{name}: TAG {report['tag_latency']} clocks after the last block, " +
+                                  f"expected {expected['tag_latency']}")
+
+        return errors
@@ -0,0 +1,300 @@
+#
+# ======================================================================================
+# gcm_ref.py: AES-GCM reference model in pure Python.
+#
+#   It has the same interface of gcm_model.gcm and does not need pycryptodome.
+#   The data are processed one DUT block at a time: H, J0, the GHASH accumulator
+#   Y_i and the keystream block of each data block can be traced.
+#   The blocks are not batched: the model runs at about 0.5 MB/s ('python gcm_bench.py
+#   model'), a debug and fallback model, not a replacement of pycryptodome for long payloads.
+#
+# Reference: https://nvlpubs.nist.gov/nistpubs/Legacy/SP/nistspecialpublication800-38d.pdf
+# ======================================================================================
+import logging
+
+from key_exp import exp_key, expand_key_words
+
+# Same logger of cocotb.log: the model does not need the simulator to run
+log = logging.getLogger('cocotb')
+
+# GCM reduction polynomial: x^128 + x^7 + x^2 + x + 1, bit-reflected
+GF_R      = 0xE1 << 120
+MASK_128  = (1 << 128) - 1
+MASK_32   = (1 << 32) - 1
+
+
+# ======================================================================================
+def xtime(a):
+    return ((a << 1) ^ 0x11B) if (a & 0x80) else (a << 1)
+
+
+# AES encryption T-tables: SubBytes, ShiftRows and MixColumns of one byte in one lookup
+SBOX = exp_key.sbox
+TE0  = [(xtime(s) << 24) | (s << 16) | (s << 8) | (xtime(s) ^ s) for s in SBOX]
+TE1  = [((t >>  8) | (t << 24)) & MASK_32 for t in TE0]
+TE2  = [((t >> 16) | (t << 16)) & MASK_32 for t in TE0]
+TE3  = [((t >> 24) | (t <<  8)) & MASK_32 for t in TE0]
+
+
+# ======================================================================================
+def aes_round_keys(key, size):
+    '''
+    Expand the key (hex string) and return the round keys as 32-bit words '''
+
+    return expand_key_words(bytes.fromhex(key), exp_key.key_size[size]).tolist()
+
+
+# ======================================================================================
+def aes_encrypt(rk, block):
+    '''
+    Encrypt the 128-bit integer block with the round keys rk '''
+
+    s0 = ((block >> 96) & MASK_32) ^ rk[0]
+    s1 = ((block >> 64) & MASK_32) ^ rk[1]
+    s2 = ((block >> 32) & MASK_32) ^ rk[2]
+    s3 = ( block        & MASK_32) ^ rk[3]
+
+    n_rounds = len(rk) // 4 - 1
+
+    for r in range(4, 4 * n_rounds, 4):
+        t0 = TE0[s0 >> 24] ^ TE1[(s1 >> 16) & 0xFF] ^ TE2[(s2 >> 8) & 0xFF] ^ TE3[s3 & 0xFF] ^ rk[r]
+        t1 = TE0[s1 >> 24] ^ TE1[(s2 >> 16) & 0xFF] ^ TE2[(s3 >> 8) & 0xFF] ^ TE3[s0 & 0xFF] ^ rk[r + 1]
+        t2 = TE0[s2 >> 24] ^ TE1[(s3 >> 16) & 0xFF] ^ TE2[(s0 >> 8) & 0xFF] ^ TE3[s1 & 0xFF] ^ rk[r + 2]
+        t3 = TE0[s3 >> 24] ^ TE1[(s0 >> 16) & 0xFF] ^ TE2[(s1 >> 8) & 0xFF] ^ TE3[s2 & 0xFF] ^ rk[r + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+
+    # Last round: no MixColumns
+    r  = 4 * n_rounds
+    o0 = ((SBOX[s0 >> 24] << 24) | (SBOX[(s1 >> 16) & 0xFF] << 16) | (SBOX[(s2 >> 8) & 0xFF] << 8) | SBOX[s3 & 0xFF]) ^ rk[r]
+    o1 = ((SBOX[s1 >> 24] << 24) | (SBOX[(s2 >> 16) & 0xFF] << 16) | (SBOX[(s3 >> 8) & 0xFF] << 8) | SBOX[s0 & 0xFF]) ^ rk[r + 1]
+    o2 = ((SBOX[s2 >> 24] << 24) | (SBOX[(s3 >> 16) & 0xFF] << 16) | (SBOX[(s0 >> 8) & 0xFF] << 8) | SBOX[s1 & 0xFF]) ^ rk[r + 2]
+    o3 = ((SBOX[s3 >> 24] << 24) | (SBOX[(s0 >> 16) & 0xFF] << 16) | (SBOX[(s1 >> 8) & 0xFF] << 8) | SBOX[s2 & 0xFF]) ^ rk[r + 3]
+
+    return (o0 << 96) | (o1 << 64) | (o2 << 32) | o3
+
+
+# ======================================================================================
+def aes_round(block, key, mix=True):
+    '''
+    One round of the aes_round core: AddRoundKey, SubBytes, ShiftRows and,
+    unless mix is False, MixColumns '''
+
+    s0 = ((block >> 96) & MASK_32) ^ ((key >> 96) & MASK_32)
+    s1 = ((block >> 64) & MASK_32) ^ ((key >> 64) & MASK_32)
+    s2 = ((block >> 32) & MASK_32) ^ ((key >> 32) & MASK_32)
+    s3 = ( block        & MASK_32) ^ ( key        & MASK_32)
+
+    if mix:
+        o0 = TE0[s0 >> 24] ^ TE1[(s1 >> 16) & 0xFF] ^ TE2[(s2 >> 8) & 0xFF] ^ TE3[s3 & 0xFF]
+        o1 = TE0[s1 >> 24] ^ TE1[(s2 >> 16) & 0xFF] ^ TE2[(s3 >> 8) & 0xFF] ^ TE3[s0 & 0xFF]
+        o2 = TE0[s2 >> 24] ^ TE1[(s3 >> 16) & 0xFF] ^ TE2[(s0 >> 8) & 0xFF] ^ TE3[s1 & 0xFF]
+        o3 = TE0[s3 >> 24] ^ TE1[(s0 >> 16) & 0xFF] ^ TE2[(s1 >> 8) & 0xFF] ^ TE3[s2 & 0xFF]
+    else:
+        o0 = (SBOX[s0 >> 24] << 24) | (SBOX[(s1 >> 16) & 0xFF] << 16) | (SBOX[(s2 >> 8) & 0xFF] << 8) | SBOX[s3 & 0xFF]
+        o1 = (SBOX[s1 >> 24] << 24) | (SBOX[(s2 >> 16) & 0xFF] << 16) | (SBOX[(s3 >> 8) & 0xFF] << 8) | SBOX[s0 & 0xFF]
+        o2 = (SBOX[s2 >> 24] << 24) | (SBOX[(s3 >> 16) & 0xFF] << 16) | (SBOX[(s0 >> 8) & 0xFF] << 8) | SBOX[s1 & 0xFF]
+        o3 = (SBOX[s3 >> 24] << 24) | (SBOX[(s0 >> 16) & 0xFF] << 16) | (SBOX[(s1 >> 8) & 0xFF] << 8) | SBOX[s2 & 0xFF]
+
+    return (o0 << 96) | (o1 << 64) | (o2 << 32) | o3
+
+
+# ======================================================================================
+def gf_mul_x(v):
+    '''
+    Multiply v by x in GF(2^128), GCM bit order '''
+
+    return (v >> 1) ^ GF_R if (v & 1) else (v >> 1)
+
+
+# ======================================================================================
+def gf_mul(x, y):
+    '''
+    Bit-serial multiplication in GF(2^128), GCM bit order '''
+
+    z = 0
+    v = y
+    for i in range(127, -1, -1):
+        if (x >> i) & 1:
+            z ^= v
+        v = gf_mul_x(v)
+    return z
+
+
+# ======================================================================================
+class ghash_table(object):
+    '''
+    Multiplication by H with Shoup tables.
+    The 128-bit operand is split in 128/bits digits: table[j][d] holds the product of
+    H and the digit d at position j, so a multiplication takes 128/bits lookups.
+    bits = 8 (default) uses 16 tables of 256 entries, bits = 4 32 tables of 16 entries.
+    '''
+
+    # ======================================================================================
+    def __init__(self, h, bits=8):
+        if bits not in [4, 8]:
+            raise ValueError("GHASH table digits must be 4 or 8 bits wide")
+
+        self.h     = h
+        self.bits  = bits
+        self.mask  = (1 << bits) - 1
+        self.shift = list(range(128 - bits, -1, -bits))
+
+        # The product is linear in the digit: combine the products of the single bits.
+        # The most significant digit bit is the coefficient of x^0
+        basis = [h]
+        for _ in range(bits - 1):
+            basis.append(gf_mul_x(basis[-1]))
+        basis.reverse()
+
+        first = [0] * (1 << bits)
+        for d in range(1, 1 << bits):
+            low      = d & -d
+            first[d] = first[d ^ low] ^ basis[low.bit_length() - 1]
+
+        # Each digit position is the previous one multiplied by x^bits
+        self.table = [first]
+        for _ in range(128 // bits - 1):
+            prev = self.table[-1]
+            next = []
+            for v in prev:
+                for _ in range(bits):
+                    v = gf_mul_x(v)
+                next.append(v)
+            self.table.append(next)
+
+    # ======================================================================================
+    def mul(self, x):
+        '''
+        Return x * H '''
+
+        z    = 0
+        mask = self.mask
+        for t, s in zip(self.table, self.shift):
+            z ^= t[(x >> s) & mask]
+        return z
+
+
+# ======================================================================================
+class gcm:
+    '''
+    AES-GCM model with the interface of gcm_model.gcm.
+    Each call loads one DUT block: a block shorter than 16 bytes is zero padded
+    in the GHASH, as the DUT does with its byte valid mask.
+    After each block, y holds the GHASH accumulator and ks the keystream block.
+    With trace set, every Y_i and keystream block is stored in the lists
+    y_trace and ks_trace.
+    '''
+
+    # ======================================================================================
+    def __init__(self, key, icb, ed, data_out=None, tag=None, trace=False, table_bits=8):
+
+        # encryption/decryption
+        self.ed = ed
+
+        # The expected data can be shared amongst the models of consecutive packets
+        self.data_out = [] if data_out is None else data_out
+        self.tag      = [] if tag is None else tag
+
+        self.rk       = aes_round_keys(key['data'], str(8 * key['n_bytes']))
+        self.H        = aes_encrypt(self.rk, 0)
+        self.gf       = ghash_table(self.H, table_bits)
+
+        # 96-bit IV: J0 = IV || 0^31 || 1, any other length: J0 = GHASH(IV || pad || len(IV))
+        if icb['n_bytes'] == 12:
+            self.J0   = (int(icb['data'], 16) << 32) | 1
+        else:
+            self.J0   = self.hash_iv(bytes.fromhex(icb['data']))
+        self.ek_j0    = aes_encrypt(self.rk, self.J0)
+        self.cnt      = self.J0
+
+        self.y        = 0
+        self.ks       = None
+        self.aad_len  = 0
+        self.ct_len   = 0
+
+        self.trace    = trace
+        self.y_trace  = []
+        self.ks_trace = []
+
+    # ======================================================================================
+    def hash_iv(self, iv):
+        '''
+        Return the J0 of an IV that is not 96 bit long '''
+
+        y = 0
+        for i in range(0, len(iv), 16):
+            block = iv[i : i + 16]
+            y     = self.gf.mul(y ^ (int.from_bytes(block, 'big') << (8 * (16 - len(block)))))
+        return self.gf.mul(y ^ (8 * len(iv)))
+
+    # ======================================================================================
+    def ghash(self, block):
+        n_bytes = len(block)
+        x       = int.from_bytes(block, 'big') << (8 * (16 - n_bytes))
+        self.y  = self.gf.mul(self.y ^ x)
+        if self.trace:
+            self.y_trace.append(self.y)
+
+    # ======================================================================================
+    def gctr(self, block):
+        '''
+        XOR the block with the next keystream block '''
+
+        # inc32: only the 32 LSbs of the counter are incremented
+        self.cnt = (self.cnt & ~MASK_32) | ((self.cnt + 1) & MASK_32)
+        self.ks  = aes_encrypt(self.rk, self.cnt)
+        if self.trace:
+            self.ks_trace.append(self.ks)
+
+        n_bytes = len(block)
+        ks      = self.ks >> (8 * (16 - n_bytes))
+        return (int.from_bytes(block, 'big') ^ ks).to_bytes(n_bytes, 'big')
+
+    # ======================================================================================
+    def load_aad(self, aad):
+        self.aad_len += len(aad)
+        self.ghash(aad)
+
+    # ======================================================================================
+    def load_plain_text(self, pt):
+        ct = self.gctr(pt)
+        self.ct_len += len(ct)
+        self.ghash(ct)
+        self.data_out.append(ct)
+
+    # ======================================================================================
+    def load_cipher_text(self, ct):
+        self.ct_len += len(ct)
+        self.ghash(ct)
+        self.data_out.append(self.gctr(ct))
+
+    # ======================================================================================
+    def digest(self):
+        '''
+        Absorb the length block and return the TAG '''
+
+        len_block = ((8 * self.aad_len) << 64) | (8 * self.ct_len)
+        y         = self.gf.mul(self.y ^ len_block)
+        if self.trace:
+            self.y_trace.append(y)
+        return (y ^ self.ek_j0).to_bytes(16, 'big')
+
+    # ======================================================================================
+    def get_tag(self, tag):
+        model_tag = self.digest()
+        if self.ed == 'enc':
+            self.tag.append(model_tag)
+            log.info('Model\tTAG '  + model_tag.hex().upper())
+            if tag == model_tag:
+                log.info('\33[92m' + "OK:\tTAGs match. " + '\33[00m')
+            else:
+                log.error('ERROR: TAGs mismatch')
+        else:
+            if tag == model_tag:
+                self.tag.append(tag)
+                log.info('\33[92m' + "OK:\tTAGs match. " + '\33[00m' + "the message is authentic!")
+            else:
+                log.error("ERROR:\tKEY or IV incorrect, or message corrupted")
+                # Force TAG error: invert received TAG
+                not_tag = ~(int.from_bytes(tag, 'big'))
+                self.tag.append((not_tag & MASK_128).to_bytes(16, 'big'))
@@ -0,0 +1,85 @@
+import os
+import time
+import random
+import cocotb
+import gcm_ref
+import gcm_gctr as gctr
+
+from collections        import deque
+from cocotb.clock       import Clock
+from cocotb.result      import TestFailure
+from cocotb.triggers    import FallingEdge, ClockCycles
+
+CLK_PERIOD = 10
+
+# Number of random vectors sent to the round
+N_VECTORS  = int(os.environ.get('UNIT_N_VECTORS', 10000))
+
+# AES mode: value of aes_mode_i and number of rounds
+AES_MODES  = {'128' : (0, 10), '192' : (1, 12), '256' : (2, 14)}
+
+
+# ======================================================================================
+@cocotb.test()
+def test_round(dut):
+    #
+    # Unit test of a single generated aes_round:
+    #   * Sends N_VECTORS random blocks, keys and round counters, one per clock
+    #   * Checks each output block against the Python single-round AES model
+    #   * The blocks leave the round in order: the pipe stages set the latency only
+
+    config = gctr.load_config()
+
+    # The mode is not registered with the data in the pipe stages: it is fixed in a test
+    mode, n_rounds = AES_MODES[config.get('aes_mode', '128')]
+    dut._log.info(f"AES mode: {config.get('aes_mode', '128')}, pipes in core: {config.get('pipes_in_core', 0)}")
+
+    rnd      = random.Random(cocotb.RANDOM_SEED)
+    expected = deque()
+    errors   = 0
+
+    dut.rst_i.value      = 1
+    dut.rnd_val_i.value  = 0
+    dut.aes_mode_i.value = mode
+    cocotb.start_soon(Clock(dut.clk_i, CLK_PERIOD, 'ns').start())
+    yield ClockCycles(dut.clk_i, 2)
+    dut.rst_i.value      = 0
+
+    start = time.perf_counter()
+    n_clk = 0
+    while len(expected) or n_clk < N_VECTORS:
+        yield FallingEdge(dut.clk_i)
+
+        if dut.rnd_val_o.value == 1:
+            if len(expected) == 0:
+                raise TestFailure("The round produced a block that has not been sent")
+            data, key, cnt, y = expected.popleft()
+            if dut.rnd_data_o.value.integer != y:
+                errors += 1
+                dut._log.error(f"Block {data:032X}, key {key:032X}, round {cnt}: " +
+                               f"DUT {dut.rnd_data_o.value.integer:032X}, model {y:032X}")
+
+        if n_clk < N_VECTORS:
+            # The round counter is incremented inside the round: MixColumns is
+            # skipped when it reaches the number of rounds of the mode
+            cnt  = rnd.randrange(n_rounds)
+            data = rnd.getrandbits(128)
+            key  = rnd.getrandbits(128)
+
+            dut.rnd_cnt_i.value  = cnt
+            dut.rnd_data_i.value = data
+            dut.rnd_key_i.value  = key
+            dut.rnd_val_i.value  = 1
+            expected.append((data, key, cnt, gcm_ref.aes_round(data, key, cnt + 1 != n_rounds)))
+        else:
+            dut.rnd_val_i.value  = 0
+            if n_clk > N_VECTORS + 16:
+                raise TestFailure(f"{len(expected)} blocks have not left the round")
+
+        n_clk += 1
+
+    wall_time = time.perf_counter() - start
+    dut._log.info(f"{N_VECTORS} vectors in {wall_time:.2f} s, {N_VECTORS / wall_time:.1f} vectors/s")
+
+    if errors:
+        raise TestFailure(f"The round mismatches the model on {errors} vectors")
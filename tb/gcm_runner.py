@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import shutil
+import subprocess
+import xml.etree.ElementTree as et
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+# ======================================================================================
+def run_test(seed, params, workpath, cachepath):
+    '''
+    Run a single cocotb test in its own work directory.
+    The simulator output is redirected to the file sim.log of the work directory.
+    The compiled libraries are copied from the cache when available, otherwise
+    the libraries built by the test are stored in the cache '''
+
+    start     = time.time()
+    cache_hit = restore_build(cachepath + 'sim_build/', workpath + 'sim_build/')
+
+    with open(workpath + 'sim.log', 'w') as log_file:
+        ret = subprocess.call('make' + params, shell=True, stdout=log_file, stderr=subprocess.STDOUT)
+
+    result = get_result(workpath + 'results.xml', ret)
+
+    if cache_hit == False and result != 'ERROR':
+        store_build(workpath + 'sim_build/', cachepath + 'sim_build/')
+
+    wall_time = time.time() - start
+
+    return {'seed'      : seed,
+            'result'    : result,
+            'wall_time' : round(wall_time, 3),
+            'cache_hit' : cache_hit,
+            'workpath'  : workpath}
+
+
+# ======================================================================================
+def restore_build(src, dst):
+    '''
+    Copy the compiled libraries of the cache in the sim_build of a test. The
+    libraries of a previous configuration are removed first. Return True when
+    the cache has the libraries '''
+
+    shutil.rmtree(dst, ignore_errors=True)
+
+    if os.path.exists(src) == False:
+        return False
+
+    # Copy keeps the timestamps: the simulator does not analyse the files again
+    shutil.copytree(src, dst)
+    return True
+
+
+# ======================================================================================
+def store_build(src, dst):
+    '''
+    Store the compiled libraries in the cache. The libraries are copied in a
+    temporary folder and then renamed: if another test stored them first,
+    the copy is discarded '''
+
+    tmp = dst.rstrip('/') + '.' + str(os.getpid())
+    shutil.copytree(src, tmp)
+    try:
+        os.rename(tmp, dst)
+    except OSError:
+        shutil.rmtree(tmp)
+
+
+# ======================================================================================
+def get_result(results_file, ret):
+    '''
+    Read the cocotb results file. A test that did not produce the file
+    or that returned an error code is reported as an error '''
+
+    if ret != 0 or os.path.exists(results_file) == False:
+        return 'ERROR'
+
+    try:
+        tree = et.parse(results_file)
+    except et.ParseError:
+        return 'ERROR'
+
+    for testcase in tree.iter('testcase'):
+        if testcase.find('failure') is not None or testcase.find('error') is not None:
+            return 'FAIL'
+
+    return 'PASS'
+
+
+# ======================================================================================
+class regression(object):
+    '''
+    Run the tests on a pool of processes. Each test gets a work directory
+    named after its seed, with its own sim_build and tmp folders. The generated
+    files are shared from the build cache of the test configuration.
+    '''
+
+    # ======================================================================================
+    def __init__(self, basepath='./', jobs=1):
+        self.basepath = basepath
+        self.jobs     = jobs
+        self.pool     = ProcessPoolExecutor(max_workers=jobs)
+        self.tests    = []
+        self.start    = time.time()
+
+
+    # ======================================================================================
+    def work_path(self, seed):
+        return self.basepath + 'work/' + str(seed) + '/'
+
+
+    # ======================================================================================
+    def submit(self, conf, cachepath):
+        seed     = conf.conf_param['seed']
+        workpath = self.work_path(seed)
+
+        # Keep the IP parameters to report them in the summary
+        ip_param = {k : conf.conf_param[k] for k in ['aes_mode', 'aes_size', 'pipes_in_core',
+                                                     'key_pre_exp', 'n_gfmul_ip', 'enc_dec',
+                                                     'test_size']}
+
+        params = conf.cocotb_params(workpath, cachepath)
+        future = self.pool.submit(run_test, seed, params, workpath, cachepath)
+        self.tests.append((ip_param, future))
+        print(f' >>\tOK   : Test {seed} submitted')
+
+
+    # ======================================================================================
+    def summary(self):
+        '''
+        Wait for all the tests to finish and write the merged results
+        in the file tmp/regression.json '''
+
+        results = []
+
+        for ip_param, future in self.tests:
+            res = future.result()
+            res.update(ip_param)
+            results.append(res)
+            print((' >>\t' + res['result'] + ' : Test ' + str(res['seed'])).ljust(30) +
+                  f"{res['wall_time']:10.3f} s\t{res['workpath']}")
+
+        self.pool.shutdown()
+
+        n_pass  = sum(1 for res in results if res['result'] == 'PASS')
+        n_hit   = sum(1 for res in results if res['cache_hit'])
+        summary = { 'jobs'        : self.jobs,
+                    'n_test'      : len(results),
+                    'n_pass'      : n_pass,
+                    'n_fail'      : len(results) - n_pass,
+                    'n_cache_hit' : n_hit,
+                    'wall_time'   : round(time.time() - self.start, 3),
+                    'tests'       : results}
+
+        with open(self.basepath + 'tmp/regression.json', 'w') as summary_file:
+            json.dump(summary, summary_file, indent=4)
+
+        print(f" >>\tOK   : {n_pass}/{len(results)} tests passed. Summary saved in {self.basepath}tmp/regression.json")
+
+        return summary
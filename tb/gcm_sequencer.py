@@ -1,7 +1,9 @@
 import cocotb
 import random
+import logging
 
-from cocotb.triggers        import RisingEdge, Event
+from cocotb.queue           import Queue
+from cocotb.triggers        import RisingEdge, Edge, First, Event
 from cocotb_bus.monitors    import Monitor
 from gcm_driver             import data_driver
 
@@ -9,7 +11,7 @@ from gcm_driver             import data_driver
 # ======================================================================================
 class sequencer:
 
-    def __init__(self, pkt_drv, aad_drv, pt_drv, delay, config, aad_tran, pt_tran):
+    def __init__(self, pkt_drv, aad_drv, pt_drv, delay, config, aad_tran, pt_tran, n_lanes=1):
 
         self.pkt_drv    = pkt_drv
         self.aad_drv    = aad_drv
@@ -21,6 +23,25 @@ class sequencer:
         self.rnd        = lambda x : x * random.randint(0, 5)
         self.aad_tran   = aad_tran
         self.pt_tran    = pt_tran
+        self.n_lanes    = n_lanes
+
+
+    # ======================================================================================
+    @cocotb.coroutine
+    def get_beat(self, tran, n_blocks):
+        '''
+        Get the data of the next beat: a block, or a list of n_blocks
+        blocks when the DUT has more lanes '''
+
+        if self.n_lanes == 1:
+            data = yield tran.get()
+            return data
+
+        beat = []
+        for _ in range(n_blocks):
+            block = yield tran.get()
+            beat.append(block)
+        return beat
 
 
     # ======================================================================================
@@ -34,33 +55,35 @@ class sequencer:
         aad_n_blocks    = self.config['aad_n_bytes'] >> 4
         aad_last_block  = 1 if (self.config['aad_n_bytes'] & 0xF) else 0
 
+        # The last block is sent with the full blocks of its beat
+        aad_last_beat   = (aad_n_blocks % self.n_lanes) + 1 if aad_last_block else 0
+        aad_n_blocks   -= max(aad_last_beat - 1, 0)
+
         # Start valid packet
         yield self.pkt_drv.start_pkt()
         yield self.delay(self.rnd(delay_in))
 
         # Start AAD data
         while aad_n_blocks:
-            if len(self.aad_tran):
-                yield self.delay(self.rnd(aad_toggle))
-                data = self.aad_tran.pop(0)
-                aad_n_blocks -= 1
-                yield self.aad_drv.write(data)
+            n_blocks = min(aad_n_blocks, self.n_lanes)
+            data = yield self.get_beat(self.aad_tran, n_blocks)
+            yield self.delay(self.rnd(aad_toggle))
+            aad_n_blocks -= n_blocks
+            yield self.aad_drv.write(data)
 
         # Send the last AAD block
-        while aad_last_block:
-            if len(self.aad_tran):
-                yield self.delay(self.rnd(aad_toggle))
-                data = self.aad_tran.pop(0)
-                aad_last_block -= 1
-                if overlap == 1:
-                    # Trigger the Plain Text to start
-                    self.end_aad.set("AAD End of data")
-                    yield self.aad_drv.write(data)
-                else:
-                    yield self.aad_drv.write(data)
-                    yield self.delay(self.rnd(1))
-                    # Trigger the Plain Text to start
-                    self.end_aad.set("AAD End of data")
+        if aad_last_block:
+            data = yield self.get_beat(self.aad_tran, aad_last_beat)
+            yield self.delay(self.rnd(aad_toggle))
+            if overlap == 1:
+                # Trigger the Plain Text to start
+                self.end_aad.set("AAD End of data")
+                yield self.aad_drv.write(data)
+            else:
+                yield self.aad_drv.write(data)
+                yield self.delay(self.rnd(1))
+                # Trigger the Plain Text to start
+                self.end_aad.set("AAD End of data")
         else:
             self.end_aad.set("AAD End of data")
 
@@ -85,11 +108,11 @@ class sequencer:
         ## Start PT data
         cnt = pt_n_blocks
         while cnt:
-            if len(self.pt_tran):
-                yield self.delay(self.rnd(pt_toggle))
-                data = self.pt_tran.pop(0)
-                cnt -= 1
-                yield self.pt_drv.write(data)
+            n_blocks = min(cnt, self.n_lanes)
+            data = yield self.get_beat(self.pt_tran, n_blocks)
+            yield self.delay(self.rnd(pt_toggle))
+            cnt -= n_blocks
+            yield self.pt_drv.write(data)
 
         # Close Packet valid
         yield self.delay(self.rnd(delay_out))
@@ -109,125 +132,164 @@ class sequencer:
 
 
 # ======================================================================================
-class gcm_AAD_monitor(Monitor):
+class gcm_if_monitor(object):
     '''
-    Receive the AAD data.
-    Each 'bval' bit signals a valid cipher text byte from the
-    AAD data vector.
+    Sample the AAD, PT, CT and TAG interfaces of the DUT.
+    All the valid strobes are read once per clock while any of the interfaces
+    is active. When all of them are idle, the monitor sleeps until one of the
+    strobes changes. Each received block is put in the queue of its interface:
+    with more lanes, the blocks of a beat are put in the queue in lane order.
     '''
 
     # ======================================================================================
-    def __init__(self, name, dut, callback=None, event=None):
-        self.name     = name
+    def __init__(self, dut, n_lanes=1):
+        self.n_lanes  = n_lanes
         self.clk      = dut.clk_i
         self.aad_bval = dut.aes_gcm_ghash_aad_bval_i
         self.aad_data = dut.aes_gcm_ghash_aad_i
-        Monitor.__init__(self, callback, event)
+        self.pt_bval  = dut.aes_gcm_data_in_bval_i
+        self.pt_data  = dut.aes_gcm_data_in_i
+        self.rdy      = dut.aes_gcm_ready_o
+        self.ct_bval  = dut.aes_gcm_data_out_bval_o
+        self.ct_data  = dut.aes_gcm_data_out_o
+        self.tag_val  = dut.aes_gcm_ghash_tag_val_o
+        self.tag_data = dut.aes_gcm_ghash_tag_o
+
+        # The IV blocks of a hashed IV are loaded on the AAD bus
+        self.iv_hash  = dut.aes_gcm_iv_hash_i if n_lanes == 1 else None
+
+        self.aad      = Queue()
+        self.pt       = Queue()
+        self.ct       = Queue()
+        self.tag      = Queue()
+
+        self._thread  = cocotb.start_soon(self._sample())
+
+    # ======================================================================================
+    def read(self, tran, bval):
+        if self.n_lanes == 1:
+            return (tran.read(bval),)
+        return tran.read_lanes(self.n_lanes, bval)
 
     # ======================================================================================
     @cocotb.coroutine
-    def _monitor_recv(self):
+    def _sample(self):
+
+        aad_tran = data_driver(self.clk, self.aad_bval, self.aad_data)
+        pt_tran  = data_driver(self.clk, self.pt_bval, self.pt_data)
+        ct_tran  = data_driver(self.clk, self.ct_bval, self.ct_data)
+        debug    = cocotb.log.isEnabledFor(logging.DEBUG)
 
-        transaction = data_driver(self.clk, self.aad_bval, self.aad_data)
         while True:
-            if self.aad_bval.value.integer != 0:
+            yield RisingEdge(self.clk)
 
-                cocotb.log.debug(f"\tAAD {self.aad_bval.value.integer:04X} " + \
-                                    f"{self.aad_data.value.integer:032X}")
-                aad_block = transaction.read()
-                self._recv(aad_block)
+            aad_bval = self.aad_bval.value.integer
+            pt_bval  = self.pt_bval.value.integer
+            ct_bval  = self.ct_bval.value.integer
+            tag_val  = self.tag_val.value.integer
 
-            yield RisingEdge(self.clk)
+            if aad_bval != 0 and (self.iv_hash == None or self.iv_hash.value.integer == 0):
+                for aad_block in self.read(aad_tran, aad_bval):
+                    if debug:
+                        cocotb.log.debug(f"\tAAD {aad_bval:04X} {aad_block.hex().upper()}")
+                    self.aad.put_nowait(aad_block)
+
+            if pt_bval != 0 and self.rdy.value.integer == 1:
+                for pt_block in self.read(pt_tran, pt_bval):
+                    if debug:
+                        cocotb.log.debug(f"\tPT {pt_bval:04X} {pt_block.hex().upper()}")
+                    self.pt.put_nowait(pt_block)
+
+            if ct_bval != 0:
+                for ct_block in self.read(ct_tran, ct_bval):
+                    if debug:
+                        cocotb.log.debug(f"\tCT {ct_bval:04X} {ct_block.hex().upper()}")
+                    self.ct.put_nowait(ct_block)
+
+            if tag_val == 1:
+                self.tag.put_nowait(self.tag_data.value.integer.to_bytes(16, 'big'))
+
+            # Bus idle: sleep until one of the strobes changes, then
+            # sample it on the next rising edge
+            if (aad_bval | pt_bval | ct_bval | tag_val) == 0:
+                yield First(Edge(self.aad_bval), Edge(self.pt_bval), Edge(self.ct_bval), Edge(self.tag_val))
 
 
 # ======================================================================================
-class gcm_PT_monitor(Monitor):
+class gcm_if_queue_monitor(Monitor):
     '''
-    Receive the plain text data.
-    Each 'bval' bit signals a valid cipher text byte from the
-    plain text data vector.
+    Receive the blocks of one interface from the queue filled by gcm_if_monitor.
     '''
 
     # ======================================================================================
-    def __init__(self, name, dut, callback=None, event=None):
-        self.name    = name
-        self.clk     = dut.clk_i
-        self.pt_bval = dut.aes_gcm_data_in_bval_i
-        self.pt_data = dut.aes_gcm_data_in_i
-        self.rdy     = dut.aes_gcm_ready_o
+    def __init__(self, name, queue, callback=None, event=None):
+        self.name  = name
+        self.queue = queue
         Monitor.__init__(self, callback, event)
 
     # ======================================================================================
     @cocotb.coroutine
     def _monitor_recv(self):
 
-        transaction = data_driver(self.clk, self.pt_bval, self.pt_data)
         while True:
-            if self.pt_bval.value.integer != 0 and self.rdy.value.integer == 1:
-
-                cocotb.log.debug(f"\tPT {self.pt_bval.value.integer:04X} " + \
-                                    f"{self.pt_data.value.integer:032X}")
-                pt_block = transaction.read()
-                self._recv(pt_block)
-
-            yield RisingEdge(self.clk)
+            block = yield self.queue.get()
+            self._recv(block)
 
 
 # ======================================================================================
-class gcm_CT_monitor(Monitor):
+class gcm_AAD_monitor(gcm_if_queue_monitor):
     '''
-    Receive the cipher data.
+    Receive the AAD data.
     Each 'bval' bit signals a valid cipher text byte from the
-    cipher data vector.
+    AAD data vector.
     '''
 
     # ======================================================================================
-    def __init__(self, name, dut, callback=None, event=None):
-        self.name    = name
-        self.clk     = dut.clk_i
-        self.ct_bval = dut.aes_gcm_data_out_bval_o
-        self.ct_data = dut.aes_gcm_data_out_o
-        Monitor.__init__(self, callback, event)
+    def __init__(self, name, intf, callback=None, event=None):
+        gcm_if_queue_monitor.__init__(self, name, intf.aad, callback, event)
+
+
+# ======================================================================================
+class gcm_PT_monitor(gcm_if_queue_monitor):
+    '''
+    Receive the plain text data.
+    Each 'bval' bit signals a valid cipher text byte from the
+    plain text data vector.
+    '''
 
     # ======================================================================================
-    @cocotb.coroutine
-    def _monitor_recv(self):
+    def __init__(self, name, intf, callback=None, event=None):
+        gcm_if_queue_monitor.__init__(self, name, intf.pt, callback, event)
 
-        transaction = data_driver(self.clk, self.ct_bval, self.ct_data)
-        while True:
-            if self.ct_bval.value.integer != 0:
 
-                cocotb.log.debug(f"\tCT {self.ct_bval.value.integer:04X} " + \
-                                    f"{self.ct_data.value.integer:032X}")
-                ct_block = transaction.read()
-                self._recv(ct_block)
+# ======================================================================================
+class gcm_CT_monitor(gcm_if_queue_monitor):
+    '''
+    Receive the cipher data.
+    Each 'bval' bit signals a valid cipher text byte from the
+    cipher data vector.
+    '''
 
-            yield RisingEdge(self.clk)
+    # ======================================================================================
+    def __init__(self, name, intf, callback=None, event=None):
+        gcm_if_queue_monitor.__init__(self, name, intf.ct, callback, event)
 
 
 # ======================================================================================
-class gcm_TAG_monitor(Monitor):
+class gcm_TAG_monitor(gcm_if_queue_monitor):
     '''
     Receive the TAG data.
     '''
 
     # ======================================================================================
-    def __init__(self, name, dut, callback=None, event=None):
-        self.name       = name
-        self.clk        = dut.clk_i
-        self.tag_val    = dut.aes_gcm_ghash_tag_val_o
-        self.tag_data   = dut.aes_gcm_ghash_tag_o
-        Monitor.__init__(self, callback, event)
+    def __init__(self, name, intf, callback=None, event=None):
+        gcm_if_queue_monitor.__init__(self, name, intf.tag, callback, event)
 
     # ======================================================================================
     @cocotb.coroutine
     def _monitor_recv(self):
 
         while True:
-            if self.tag_val.value.integer == 1:
-
-                tag = self.tag_data.value.integer
-                cocotb.log.info(f"DUT\tTAG {tag:032X}")
-                self._recv(tag.to_bytes(16, 'big'))
-
-            yield RisingEdge(self.clk)
+            tag = yield self.queue.get()
+            cocotb.log.info(f"DUT\tTAG {tag.hex().upper()}")
+            self._recv(tag)
@@ -0,0 +1,126 @@
+import os
+import json
+import random
+import cocotb
+import gcm_gctr as gctr
+
+from cocotb.result      import TestFailure
+from cocotb.triggers    import ClockCycles
+from gcm_sequencer      import gcm_if_monitor
+from gcm_gctr           import cycle, check_pkt
+
+# PT bytes of the packets of each measure
+SETUP_SIZES = [int(n) for n in os.environ.get('SETUP_SIZES', '64 128 256 1024 4096').split()]
+
+# Number of packets sent for each size and flow
+SETUP_N_PKT = int(os.environ.get('SETUP_N_PKT', 4))
+
+# Flows of the packets:
+#   reload : a new KEY for each packet, the next IV is loaded after the TAG
+#   cached : the KEY of the previous packet: H is not computed again
+#   ahead  : as cached, the next IV is loaded after the last PT block and its J0
+#            is computed while the TAG of the packet is pending
+SETUP_FLOWS = ['reload', 'cached', 'ahead']
+
+
+# ======================================================================================
+@cocotb.coroutine
+def send_pkt(pkt_drv, pt_drv, blocks, n_lanes):
+    '''
+    Send the PT blocks of a packet back-to-back, without AAD '''
+
+    yield pkt_drv.start_pkt()
+    for i in range(0, len(blocks), n_lanes):
+        yield pt_drv.write(blocks[i] if n_lanes == 1 else blocks[i : i + n_lanes])
+    yield pkt_drv.stop_pkt()
+
+
+# ======================================================================================
+@cocotb.test()
+def test_setup(dut):
+    #
+    # Per-packet setup of the IP:
+    #   * Sends SETUP_N_PKT packets of each size of SETUP_SIZES with each flow of SETUP_FLOWS
+    #   * Measures the setup cycles, from the end of the previous packet to the ready of
+    #     the packet, and the packet period, from a ready to the next one
+    #   * Checks the CT and the TAG of each packet against the model
+    #   * Saves the mean figures of each size and flow in tmp/<seed>_setup.json
+
+    tb        = gctr.gcm_gctr(dut)
+    tb.config = gctr.load_config()
+
+    n_lanes = tb.config.get('lanes', 1)
+
+    # The setup is measured with the 96-bit IV, unless the IV length is given
+    if tb.config.get('iv_n_bytes', 0) == 0:
+        tb.config['iv_n_bytes'] = gctr.IV_96_N_BYTES
+
+    model_pkt          = tb.model_pkt()
+    pkt_drv, _, pt_drv = tb.drivers()
+
+    yield tb.start_dut()
+
+    intf = gcm_if_monitor(dut, n_lanes)
+
+    yield tb.set_mode('enc')
+
+    rnd     = random.Random(cocotb.RANDOM_SEED)
+    results = {}
+    errors  = 0
+
+    for n_bytes in SETUP_SIZES:
+        results[n_bytes] = {}
+
+        for flow in SETUP_FLOWS:
+            setup = []
+            ready = []
+
+            # The first packet of each flow loads a new KEY
+            pkt   = tb.new_pkt(n_bytes, None, model_pkt, rnd)
+            t_end = cycle()
+            yield tb.restart_icb(True)
+
+            for n in range(SETUP_N_PKT):
+                yield tb.cipher_is_ready()
+                ready.append(cycle())
+                setup.append(ready[-1] - t_end)
+
+                yield send_pkt(pkt_drv, pt_drv, pkt['blocks'], n_lanes)
+                t_end = cycle()
+
+                last = (n == SETUP_N_PKT - 1)
+                key  = None if flow == 'reload' else pkt['key']
+
+                # The J0 of the next IV is computed while the TAG is pending
+                if flow == 'ahead' and not last:
+                    next_pkt = tb.new_pkt(n_bytes, key, model_pkt, rnd)
+                    yield tb.restart_icb(False)
+
+                pkt_errors = yield check_pkt(intf, pkt)
+                errors    += pkt_errors
+
+                if flow != 'ahead' and not last:
+                    next_pkt = tb.new_pkt(n_bytes, key, model_pkt, rnd)
+                    yield tb.restart_icb(flow == 'reload')
+
+                if not last:
+                    pkt = next_pkt
+
+            # The first packet includes the KEY load in all the flows
+            period = [b - a for a, b in zip(ready, ready[1:])]
+            results[n_bytes][flow] = {
+                'setup_cycles'  : round(sum(setup[1:]) / len(setup[1:]), 1) if len(setup) > 1 else setup[0],
+                'period_cycles' : round(sum(period) / len(period), 1) if len(period) else None,
+                'bits_per_clk'  : round(8 * n_bytes * len(period) / sum(period), 3) if len(period) else None}
+
+        dut._log.info(f"{n_bytes:6} bytes: " +
+                      ", ".join(f"{flow} {res['setup_cycles']} setup cycles {res['bits_per_clk']} bits/clk"
+                                for flow, res in results[n_bytes].items()))
+
+    yield ClockCycles(dut.clk_i, 20)
+
+    with open(gctr.tmp_dir() + str(cocotb.RANDOM_SEED) + '_setup.json', 'w') as setup_file:
+        json.dump({'n_pkt' : SETUP_N_PKT, 'sizes' : results}, setup_file, indent=4)
+
+    if errors:
+        raise TestFailure(f"{errors} CT blocks or TAGs mismatch the model")
@@ -0,0 +1,44 @@
+BLOCK_N_BYTES   = 16
+CHUNK_N_BLOCKS  = 2**16     # 1 MB
+
+
+# ======================================================================================
+def random_bytes(n_bytes, rnd):
+    '''
+    Generate n_bytes random bytes with a single call to the generator '''
+
+    return rnd.getrandbits(8 * n_bytes).to_bytes(n_bytes, 'big') if n_bytes else b''
+
+
+# ======================================================================================
+def random_blocks(n_bytes, rnd, chunk_n_blocks=CHUNK_N_BLOCKS):
+    '''
+    Generate n_bytes random bytes and yield them in 16-byte blocks.
+    The payload is generated one chunk of chunk_n_blocks blocks (1 MB) at a time,
+    with a single call to the generator per chunk. Each block is a memoryview slice
+    of its chunk: a block kept in flight keeps its whole chunk in memory.
+    The last block is shorter than 16 bytes if n_bytes is not a multiple of 16 '''
+
+    while n_bytes:
+        chunk_n_bytes = min(n_bytes, chunk_n_blocks * BLOCK_N_BYTES)
+        chunk         = memoryview(random_bytes(chunk_n_bytes, rnd))
+
+        for i in range(0, chunk_n_bytes, BLOCK_N_BYTES):
+            yield chunk[i : i + BLOCK_N_BYTES]
+
+        n_bytes -= chunk_n_bytes
+
+
+# ======================================================================================
+def user_blocks(hex_data):
+    '''
+    Yield the user data in 16-byte blocks.
+    Data are supplied in nibbles: an odd number of nibbles is padded with a trailing 0 '''
+
+    if len(hex_data) & 0x1:
+        hex_data = hex_data + '0'
+
+    data = memoryview(bytes.fromhex(hex_data))
+
+    for i in range(0, len(data), BLOCK_N_BYTES):
+        yield data[i : i + BLOCK_N_BYTES]
@@ -0,0 +1,216 @@
+#
+# ======================================================================================
+# gcm_sweep.py: run the test of every IP configuration and collect the measured
+#               throughput, latencies, simulation time and size of the generated RTL.
+#
+#   python gcm_sweep.py -j 8
+#   python gcm_sweep.py -m 128 -s XS -j 8 --target 64
+#
+# The IP parameters given on the command line are fixed, the others are swept:
+# mode, size, pipe, rmexp (with and without) and ngfmul (1 and 2).
+# The results are saved in tmp/sweep.json and tmp/sweep.csv. With '--syn' the table
+# has the synthesis estimate of aes_round and ghash_gfmul of each configuration.
+#
+# ======================================================================================
+import os
+import sys
+import csv
+import json
+import random
+import itertools
+
+sys.path.append('../config/')
+import gcm_utils as gu
+
+from gcm_runner import regression
+from gcm_syn    import syn_estimate, SYN_UNITS
+
+# Number of AAD bytes of each packet
+SWEEP_AAD_BYTES = 16
+
+# Columns of the result table
+SWEEP_COLUMNS   = ['aes_mode', 'aes_size', 'pipes_in_core', 'key_pre_exp', 'n_gfmul_ip', 'enc_dec',
+                   'result', 'data_bits_per_clk', 'expected_bits_per_clk', 'data_latency', 'tag_latency',
+                   'sim_cycles', 'sim_time', 'run_time', 'rtl_files', 'rtl_lines', 'rtl_bytes', 'seed']
+
+# Columns of the synthesis estimate, with '--syn'
+SYN_COLUMNS     = [top + '_' + k for top in SYN_UNITS for k in ['cells', 'ffs', 'depth']]
+
+
+# ======================================================================================
+class sweep_conf(gu.aes_conf):
+    '''
+    Configuration of the sweep: the arguments of the testbench, without default
+    values for rmexp and ngfmul so that they are swept when not given
+    '''
+
+    # ======================================================================================
+    def add_args(self):
+        super().add_args()
+
+        self.parser.set_defaults(rmexp=None, ngfmul=None)
+
+        self.parser.add_argument('-B', '--n-bytes',
+                            type=int, default=4096, metavar='N',
+                            help='Number of PT bytes of each packet (4096 by default). The length is the same for all the configurations.')
+
+        self.parser.add_argument('-T', '--target',
+                            type=float, default=None, metavar='BITS',
+                            help='List the configurations that reach BITS data bits per clock, the smallest RTL first.')
+
+
+# ======================================================================================
+def rtl_size(cachepath):
+    '''
+    Return the number of files, lines and bytes of the generated RTL '''
+
+    gen_rtl_path = cachepath + 'gen_rtl/'
+    files        = sorted(os.listdir(gen_rtl_path))
+    n_lines      = 0
+    n_bytes      = 0
+
+    for f in files:
+        with open(gen_rtl_path + f, 'rb') as fp:
+            content = fp.read()
+        n_lines += content.count(b'\n')
+        n_bytes += len(content)
+
+    return {'rtl_files' : len(files), 'rtl_lines' : n_lines, 'rtl_bytes' : n_bytes}
+
+
+# ======================================================================================
+def perf_row(res):
+    '''
+    Read the performance report of a test. The figures are the ones of the first
+    packet: all the packets have the same length '''
+
+    row = {k : None for k in ['data_bits_per_clk', 'expected_bits_per_clk', 'data_latency',
+                              'tag_latency', 'sim_cycles', 'sim_time']}
+
+    perf_file = res['workpath'] + 'tmp/' + str(res['seed']) + '_perf.json'
+    if os.path.exists(perf_file) == False:
+        return row
+
+    with open(perf_file, 'r') as fp:
+        report = json.load(fp)
+
+    pkt = report['pkts'][0]
+    row.update({'data_bits_per_clk'     : pkt['data_bits_per_clk'],
+                'expected_bits_per_clk' : report.get('expected', {}).get('data_bits_per_clk'),
+                'data_latency'          : pkt['data_latency'],
+                'tag_latency'           : pkt['tag_latency'],
+                'sim_cycles'            : report['sim_cycles'],
+                'sim_time'              : report['wall_time']})
+
+    return row
+
+
+# ======================================================================================
+def syn_row(conf, cachepath):
+    '''
+    Flatten the synthesis estimate of a configuration in the columns of the table '''
+
+    results = syn_estimate(conf, cachepath + 'gen_rtl/')
+    if results == None:
+        return {k : None for k in SYN_COLUMNS}
+
+    return {top + '_' + k : v for top, res in results.items() for k, v in res.items()}
+
+
+# ======================================================================================
+def save_table(rows, basepath, columns):
+    with open(basepath + 'tmp/sweep.json', 'w') as json_file:
+        json.dump(rows, json_file, indent=4)
+
+    with open(basepath + 'tmp/sweep.csv', 'w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f" >>\tOK   : {len(rows)} configurations saved in {basepath}tmp/sweep.json and {basepath}tmp/sweep.csv")
+
+
+# ======================================================================================
+def print_target(rows, target):
+    '''
+    Print the configurations that pass and reach the target throughput, the smallest RTL first '''
+
+    hits = [row for row in rows if row['result'] == 'PASS' and row['data_bits_per_clk'] != None
+                                and row['data_bits_per_clk'] >= target]
+    hits.sort(key=lambda row : (row['rtl_bytes'], -row['data_bits_per_clk']))
+
+    if len(hits) == 0:
+        print(f" >>\tError: no configuration reaches {target} bits/clk")
+        return
+
+    print(f" >>\tOK   : {len(hits)} configurations reach {target} bits/clk")
+    for row in hits:
+        print(f" >>\t\tmode {row['aes_mode']:>3}, size {row['aes_size']:>2}, pipe {row['pipes_in_core']}, " +
+              f"rmexp {str(row['key_pre_exp']):>5}, ngfmul {row['n_gfmul_ip']}: " +
+              f"{row['data_bits_per_clk']:8.3f} bits/clk, {row['rtl_lines']} RTL lines")
+
+
+# ======================================================================================
+if __name__ == "__main__":
+
+    gen_base_path = './'
+
+    conf = sweep_conf(gen_base_path, False)
+
+    if conf.args.seed != None:
+        sys.exit(" >>\tError: the sweep creates a seed per configuration: \'-e\' is not allowed")
+
+    # Swept parameters: the values given on the command line are kept
+    sweep = {'mode'   : conf.ip_mode if conf.args.mode   == None else [conf.args.mode],
+             'size'   : conf.ip_size if conf.args.size   == None else [conf.args.size],
+             'pipe'   : conf.ip_pipe if conf.args.pipe   == None else [conf.args.pipe],
+             'rmexp'  : [False, True] if conf.args.rmexp == None else [conf.args.rmexp],
+             'ngfmul' : [1, 2]       if conf.args.ngfmul == None else [conf.args.ngfmul]}
+
+    # Same packet for all the configurations, without random delays. The performance
+    # check runs with the tolerance given by '-u', 10% by default
+    rnd = random.Random(0)
+    conf.args.aad    = '{:0{width}X}'.format(rnd.getrandbits(8*SWEEP_AAD_BYTES), width=2*SWEEP_AAD_BYTES)
+    conf.args.data   = '{:0{width}X}'.format(rnd.getrandbits(8*conf.args.n_bytes), width=2*conf.args.n_bytes)
+    conf.args.perf   = conf.args.perf if conf.args.perf != None else 10.0
+    conf.args.module = None
+
+    os.makedirs(gen_base_path + 'tmp', exist_ok=True)
+
+    regr  = regression(gen_base_path, max(conf.args.jobs, 1))
+    sizes = {}
+
+    for conf.args.mode, conf.args.size, conf.args.pipe, conf.args.rmexp, conf.args.ngfmul in itertools.product(*sweep.values()):
+
+        conf.conf_param = {}
+
+        # Configure the test and the IP
+        conf.test_config()
+        conf.gcm_ip_config()
+
+        # Generate the files, unless the same configuration has been generated already
+        cachepath = conf.cache_path()
+        conf.generate_cached_file(cachepath)
+        sizes[conf.conf_param['seed']] = rtl_size(cachepath)
+        if conf.args.syn == True:
+            sizes[conf.conf_param['seed']].update(syn_row(conf, cachepath))
+
+        # Save the configuration in the work directory of the test and queue it
+        conf.save_configuration(regr.work_path(conf.conf_param['seed']))
+        regr.submit(conf, cachepath)
+
+    # Wait for the tests and build the table
+    summary = regr.summary()
+
+    rows = []
+    for res in summary['tests']:
+        row = dict(res)
+        row['run_time'] = row.pop('wall_time')
+        row.update(perf_row(res))
+        row.update(sizes[res['seed']])
+        rows.append(row)
+
+    save_table(rows, gen_base_path, SWEEP_COLUMNS + (SYN_COLUMNS if conf.args.syn else []))
+
+    if conf.args.target != None:
+        print_target(rows, conf.args.target)
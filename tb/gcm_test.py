@@ -1,18 +1,16 @@
-import json
 import random
 import cocotb
-import gcm_model
 import gcm_gctr as gctr
 
-from cocotb.clock          import Clock
-from gcm_driver            import pkt_driver, aad_driver, pt_driver, wait_for
-from gcm_sequencer         import sequencer, gcm_AAD_monitor, gcm_PT_monitor, gcm_CT_monitor, gcm_TAG_monitor
-from cocotb.triggers       import RisingEdge, FallingEdge, ClockCycles
+from gcm_driver            import wait_for
+from gcm_sequencer         import sequencer, gcm_if_monitor, gcm_AAD_monitor, gcm_PT_monitor, gcm_CT_monitor, gcm_TAG_monitor
+from cocotb.queue          import Queue
+from gcm_perf              import gcm_perf, expected_perf
+from gcm_ghash_check       import ghash_check
+from cocotb.result         import TestFailure
+from cocotb.triggers       import RisingEdge, ClockCycles
 from cocotb_bus.scoreboard import Scoreboard
 
-CLK_PERIOD = 10
-RST_WINDOW = CLK_PERIOD + (CLK_PERIOD * 3 // 4)
-
 
 # ======================================================================================
 @cocotb.test()
@@ -25,29 +23,37 @@ def test_dut(dut):
     #   * Sends the AAD data through the pipeline
     #   * Sends the PT data through the pipeline
     #   * Checks the CT and the MAC match the model
+    #   * Repeats the steps above with a new Key and IV for each packet
 
-    # Create the lists of transactions
-    aad_tran        = []
-    pt_tran         = []
+    # Create the queues of transactions for the sequencer and the lists for the scoreboard
+    aad_tran        = Queue(maxsize=gctr.MAX_PENDING_TRAN)
+    pt_tran         = Queue(maxsize=gctr.MAX_PENDING_TRAN)
     aad_model_tran  = []
     pt_model_tran   = []
 
     tb = gctr.gcm_gctr(dut)
 
-    # Open config file
-    with open('./tmp/' + str(cocotb.RANDOM_SEED) + '.json', 'r') as config_file:
-        tb.config = dict(json.load(config_file))
+    # Open config file. The regression runner moves it to the test work directory
+    tb.config = gctr.load_config()
+
+    # Number of packets sent in the simulation
+    n_pkt = tb.config.get('n_pkt', 1)
+
+    # Number of blocks per clock of the DUT interfaces
+    n_lanes = tb.config.get('lanes', 1)
 
-    # Generate configuration data
-    tb.config_data()
+    # Expected CT and TAG, shared amongst the models of all the packets
+    data_out_model_tran = []
+    tag_model_tran      = []
 
-    # Initialise GCM model
-    dut_model = gcm_model.gcm(tb.data['key'], tb.data['iv'], tb.config['enc_dec'])
+    # Each packet is checked by its own model
+    model = {'pkt' : None}
+
+    # Reference model: the pure Python model runs without pycryptodome
+    gcm_model_pkt = tb.model_pkt()
 
     # Create drivers
-    pkt_drv = pkt_driver(dut.clk_i, dut.aes_gcm_ghash_pkt_val_i)
-    aad_drv = aad_driver(dut.clk_i, dut.aes_gcm_ghash_aad_bval_i,  dut.aes_gcm_ghash_aad_i)
-    pt_drv  = pt_driver( dut.clk_i, dut.aes_gcm_data_in_bval_i, dut.aes_gcm_data_in_i, dut.aes_gcm_ready_o)
+    pkt_drv, aad_drv, pt_drv = tb.drivers()
 
     # Create delay function
     delay   = wait_for(dut.clk_i, RisingEdge)
@@ -58,31 +64,34 @@ def test_dut(dut):
     # Get AES key size
     dut._log.info('AES size: ' + tb.config['aes_size'])
 
-    # Release the Reset
-    cocotb.start_soon(tb.release_rst(RST_WINDOW))
+    if n_lanes > 1:
+        dut._log.info(f"Lanes: {n_lanes} blocks per clock")
 
-    # Start the Clock
-    cocotb.start_soon(Clock(dut.clk_i, CLK_PERIOD, 'ns').start())
+    # Start the Clock, release the Reset and wait few clocks
+    yield tb.start_dut(n_clk=random.randint(10, 20))
 
-    # Wait for the Reset falling edge event
-    yield FallingEdge(dut.rst_i)
+    if tb.config['enc_dec'] == 'enc':
+        data_in_callback = lambda data : model['pkt'].load_plain_text(data)
+    else:
+        data_in_callback = lambda data : model['pkt'].load_cipher_text(data)
 
-    # Wait few clocks
-    yield ClockCycles(dut.clk_i, random.randint(10, 20))
+    # Create the interface monitor and the monitors of each interface
+    intf         = gcm_if_monitor(dut, n_lanes)
+    mon_aad      = gcm_AAD_monitor("Get AAD", intf, lambda data : model['pkt'].load_aad(data))
+    mon_data_in  = gcm_PT_monitor("Get PT", intf, data_in_callback)
+    mon_data_out = gcm_CT_monitor("Get CT", intf)
+    mon_tag      = gcm_TAG_monitor("Get TAG", intf, lambda tag : model['pkt'].get_tag(tag))
 
-    # Create the sequencer
-    seq = sequencer(pkt_drv, aad_drv, pt_drv, delay.n_clk, tb.data, aad_tran, pt_tran)
+    # Record the simulation speed and the DUT throughput
+    perf = gcm_perf(gctr.CLK_PERIOD)
+    perf.bind(mon_aad, mon_data_in, mon_data_out, mon_tag)
 
+    # Check the GHASH accumulator of the DUT after each block
+    ghash = ghash_check(dut, n_lanes)
     if tb.config['enc_dec'] == 'enc':
-        data_in_callback = dut_model.load_plain_text
+        ghash.bind(mon_aad, mon_data_out, mon_tag)
     else:
-        data_in_callback = dut_model.load_cipher_text
-
-    # Create monitors
-    mon_aad      = gcm_AAD_monitor("Get AAD", dut, dut_model.load_aad)
-    mon_data_in  = gcm_PT_monitor("Get PT", dut, data_in_callback)
-    mon_data_out = gcm_CT_monitor("Get CT", dut)
-    mon_tag      = gcm_TAG_monitor("Get TAG", dut, dut_model.get_tag)
+        ghash.bind(mon_aad, mon_data_in, mon_tag)
 
     # Create scoreboard
     scoreboard = Scoreboard(dut)
@@ -90,52 +99,116 @@ def test_dut(dut):
     # Add scoreboard interfaces
     scoreboard.add_interface(mon_aad, aad_model_tran)
     scoreboard.add_interface(mon_data_in, pt_model_tran)
-    scoreboard.add_interface(mon_data_out, dut_model.data_out)
-    scoreboard.add_interface(mon_tag, dut_model.tag)
-
-    # Set the AES in encryption or decryption mode
-    yield tb.set_enc_dec(tb.config['enc_dec'])
-
-    # Set AES key mode
-    yield tb.aes_set_mode()
-
-    # Load the KEY
-    if (tb.config['key_pre_exp'] == True):
-        yield tb.load_pre_exp_key(tb.data['key'])
-    else:
-        yield tb.load_key(tb.data['key'])
-
-    # Load the ICB
-    yield tb.load_iv(tb.data['iv'])
-
-    # Start The ICB
-    yield tb.start_icb()
-
-    # Wait the AES to produce cipher data
-    yield tb.cipher_is_ready()
-
-     # Set the number of AAD transactions
-    n_transaction = tb.data['aad_n_bytes'] >> 4
-    if tb.data['aad_n_bytes'] & 0xF:
-        n_transaction += 1
-    dut._log.info(f"\nAAD:\t{n_transaction}\ttransactions to read")
-
-    # Set the number of PT transactions
-    n_transaction = tb.data['pt_n_bytes'] >> 4
-    if tb.data['pt_n_bytes'] & 0xF:
-        n_transaction += 1
-    dut._log.info(f"DATA:\t{n_transaction}\ttransactions to read\n")
-
-    # Start the sequencer
-    seq.start_sequencer()
-
-    # Encrypt data
-    yield tb.encrypt_data(tb.data['aad_n_bytes'], tb.data['pt_n_bytes'], aad_tran, pt_tran, aad_model_tran, pt_model_tran)
-
-    # Wait for the test to finish
-    while dut.aes_gcm_ghash_tag_val_o.value == 0:
-        yield RisingEdge(dut.clk_i)
+    scoreboard.add_interface(mon_data_out, data_out_model_tran)
+    scoreboard.add_interface(mon_tag, tag_model_tran)
+
+    # Set the AES in encryption or decryption mode and the AES key mode
+    yield tb.set_mode(tb.config['enc_dec'])
+
+    # Data of the next packet, and whether its IV and start are queued in the ICB
+    next_data = None
+    queued    = False
+
+    for pkt in range(n_pkt):
+
+        if n_pkt > 1:
+            dut._log.info(f"\nPacket {pkt + 1}/{n_pkt}")
+
+        # Generate configuration data: Key, IV, AAD and PT of the packet
+        if next_data == None:
+            tb.config_data()
+        else:
+            tb.data = next_data
+
+        # Select the key slot: the key of a slot already used is not loaded again
+        key_load = tb.select_key_slot()
+
+        # Initialise GCM model
+        model['pkt'] = gcm_model_pkt(tb.data['key'], tb.data['iv'], tb.config['enc_dec'],
+                                     data_out_model_tran, tag_model_tran)
+
+        perf.start_pkt(key_load)
+        ghash.start_pkt(tb.data['key'])
+        ghash.iv(tb.data['iv'])
+
+        # A queued packet is started by the ICB after the last block of the previous one
+        if queued == False:
+            # Re-key: stop the ICB and flush the keystream of the previous packet
+            if pkt > 0:
+                yield tb.stop_icb()
+                yield tb.pipe_reset()
+
+            # Load the KEY, unless its slot holds it already
+            tb.set_key_slot()
+            yield tb.load_key_if_needed(tb.data['key'], key_load)
+
+            # Load the ICB and start it. An IV that is not 96 bit long is hashed by the IP
+            yield tb.start_iv(tb.data['iv'], tb.icb_n_blocks())
+
+        # Wait the AES to produce cipher data
+        yield tb.cipher_is_ready()
+        perf.ready()
+
+         # Set the number of AAD transactions
+        n_transaction = tb.data['aad_n_bytes'] >> 4
+        if tb.data['aad_n_bytes'] & 0xF:
+            n_transaction += 1
+        dut._log.info(f"\nAAD:\t{n_transaction}\ttransactions to read")
+
+        # Set the number of PT transactions
+        n_transaction = tb.data['pt_n_bytes'] >> 4
+        if tb.data['pt_n_bytes'] & 0xF:
+            n_transaction += 1
+        dut._log.info(f"DATA:\t{n_transaction}\ttransactions to read\n")
+
+        # Create the sequencer and start it
+        seq = sequencer(pkt_drv, aad_drv, pt_drv, delay.n_clk, tb.data, aad_tran, pt_tran, n_lanes)
+        seq.start_sequencer()
+
+        # Queue the IV and the start of the next packet: both packets must have PT blocks
+        next_data = None
+        queued    = False
+        if tb.config.get('queue_pkt', False) and pkt + 1 < n_pkt:
+            next_data = tb.config_next_data()
+            if tb.icb_n_blocks() and tb.icb_n_blocks(next_data):
+                yield tb.load_iv(next_data['iv'], tb.icb_n_blocks(next_data))
+                yield tb.start_icb()
+                queued = True
+
+        # Encrypt data
+        yield tb.encrypt_data(tb.data['aad_n_bytes'], tb.data['pt_n_bytes'], aad_tran, pt_tran, aad_model_tran, pt_model_tran)
+
+        # Wait for the packet to finish: the TAG is sampled on the next rising edge
+        if dut.aes_gcm_ghash_tag_val_o.value == 0:
+            yield RisingEdge(dut.aes_gcm_ghash_tag_val_o)
+
+        yield ClockCycles(dut.clk_i, 2)
 
     last_cycles = ClockCycles(dut.clk_i, 20)
     yield last_cycles
 
+    # Save the performance report next to the test configuration
+    param  = {k : tb.config[k] for k in ['seed', 'aes_mode', 'aes_size', 'n_rounds', 'pipes_in_core',
+                                         'key_pre_exp', 'n_gfmul_ip', 'enc_dec', 'n_pkt']}
+    param['lanes'] = n_lanes
+    if tb.config.get('perf_tol') != None:
+        param['expected'] = expected_perf(tb.config)
+
+    report = perf.save(gctr.tmp_dir() + str(cocotb.RANDOM_SEED) + '_perf.json', param)
+    dut._log.info(f"Simulation: {report['sim_cycles']} cycles in {report['wall_time']} s, " +
+                  f"{report['cycles/s']} cycles/s, {report['blocks/s']} blocks/s")
+    dut._log.info(f"Setup: {report['setup']['key_load']} cycles per packet with a KEY load, " +
+                  f"{report['setup']['key_cached']} cycles with a cached KEY, " +
+                  f"{report['setup']['data_gap']} idle cycles between the data of two packets")
+
+    if len(ghash.errors):
+        raise TestFailure(f"The GHASH of the DUT diverges from the model in {len(ghash.errors)} packets")
+
+    # Check the DUT throughput and latencies
+    if tb.config.get('perf_tol') != None:
+        errors = perf.check(param['expected'], tb.config['perf_tol'])
+        for error in errors:
+            dut._log.error(error)
+        if len(errors):
+            raise TestFailure(f"The DUT misses the expected performance in {len(errors)} cases")
+        dut._log.info(f"Performance: OK within {tb.config['perf_tol']}%")
@@ -5,6 +5,8 @@ import random
 sys.path.append('../config/')
 import gcm_utils as gu
 
+from gcm_runner import regression, restore_build, store_build, get_result
+
 
 if __name__ == "__main__":
 
@@ -22,6 +24,10 @@ if __name__ == "__main__":
         tsize = conf.args.tsize
         ip_ed = conf.args.ed
 
+        # Run the tests in parallel
+        if conf.args.jobs > 1:
+            regr = regression(gen_base_path, conf.args.jobs)
+
         for i in range(conf.args.n_test):
 
             # Randomise the IP paramters
@@ -44,11 +50,35 @@ if __name__ == "__main__":
             # Configure the IP
             conf.gcm_ip_config()
 
-            # Generate the files from the python templates
-            conf.generate_templated_file()
+            # Generate the files from the python templates, unless the same configuration
+            # has been generated already
+            cachepath = conf.cache_path()
+            conf.generate_cached_file(cachepath)
+
+            if conf.args.jobs > 1:
+                workpath = regr.work_path(conf.conf_param['seed'])
+
+                # Save the configuration parameters in the file _seed_.json. The copy in the
+                # base path allows the test to be re-run with the '--seed' parameter
+                conf.save_configuration()
+                conf.save_configuration(workpath)
+
+                # Queue the test
+                regr.submit(conf, cachepath)
+            else:
+                # Save the configuration parameters in the file _seed_.json
+                conf.save_configuration()
+
+                # The test is built in sim_build from the libraries of the cache, which
+                # stores the libraries of the first build of the configuration
+                cache_hit = restore_build(cachepath + 'sim_build/', gen_base_path + 'sim_build/')
+
+                # Generate the parameters for the cocotb makefile and run the test
+                a = os.system('make ' + conf.cocotb_params(buildpath=cachepath))
 
-            # Save the configuration parameters in the file _seed_.json
-            conf.save_configuration()
+                if cache_hit == False and get_result(gen_base_path + 'results.xml', a) != 'ERROR':
+                    store_build(gen_base_path + 'sim_build/', cachepath + 'sim_build/')
 
-            # Generate the parameters for the cocotb makefile and run the test
-            a = os.system('make ' + conf.cocotb_params())
+        # Wait for the tests and merge the results
+        if conf.args.jobs > 1:
+            regr.summary()
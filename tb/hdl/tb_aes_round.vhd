@@ -0,0 +1,100 @@
+--------------------------------------------------------------------------------
+--! @File name:     tb_aes_round
+--! @Date:          18/10/2026
+--! @Description:   testbench wrapper of a single aes_round instance. The state
+--!                 and the key are converted to 128-bit vectors. The round is
+--!                 not the last instance: data never loop back and are never
+--!                 stalled, a new block can be sent every clock
+--! @Reference:     FIPS PUB 197, November 26, 2001
+--! @Source:        http://csrc.nist.gov/publications/fips/fips197/fips-197.pdf
+--------------------------------------------------------------------------------
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.std_logic_unsigned.all;
+use work.aes_pkg.all;
+use work.aes_func.all;
+
+--------------------------------------------------------------------------------
+entity tb_aes_round is
+    port(
+        rst_i                       : in  std_logic;
+        clk_i                       : in  std_logic;
+        aes_mode_i                  : in  std_logic_vector(1 downto 0);
+        rnd_key_i                   : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+        rnd_val_i                   : in  std_logic;
+        rnd_cnt_i                   : in  std_logic_vector(3 downto 0);
+        rnd_data_i                  : in  std_logic_vector(AES_DATA_WIDTH_C-1 downto 0);
+        rnd_val_o                   : out std_logic;
+        rnd_data_o                  : out std_logic_vector(AES_DATA_WIDTH_C-1 downto 0));
+end entity;
+
+--------------------------------------------------------------------------------
+architecture arch_tb_aes_round of tb_aes_round is
+
+    --! Constants
+
+    --! Types
+
+    --! Signals
+    signal rnd_key              : state_t;
+    signal rnd_cnt              : round_cnt_t;
+    signal rnd_data             : state_t;
+    signal rnd_data_out         : state_t;
+
+    --! Component declaration
+    component aes_round is
+        port(
+            rst_i                       : in  std_logic;
+            clk_i                       : in  std_logic;
+            aes_mode_i                  : in  std_logic_vector(1 downto 0);
+            rnd_i_am_last_inst_i        : in  std_logic;
+            kexp_part_key_i             : in  state_t;
+            rnd_stage_reset_i           : in  std_logic;
+            rnd_next_stage_busy_i       : in  std_logic;
+            rnd_stage_val_i             : in  std_logic;
+            rnd_stage_cnt_i             : in  round_cnt_t;
+            rnd_stage_data_i            : in  state_t;
+            rnd_stage_val_o             : out std_logic;
+            rnd_key_index_o             : out round_cnt_t;
+            rnd_stage_cnt_o             : out round_cnt_t;
+            rnd_stage_data_o            : out state_t;
+            rnd_stage_trg_key_o         : out std_logic;
+            rnd_next_stage_val_o        : out std_logic;
+            rnd_loop_back_o             : out std_logic;
+            rnd_i_am_busy_o             : out std_logic);
+    end component;
+
+begin
+
+    rnd_key     <= vec_to_state(rnd_key_i);
+    rnd_data    <= vec_to_state(rnd_data_i);
+    rnd_cnt     <= conv_integer(rnd_cnt_i);
+
+    --------------------------------------------------------------------------------
+    --! Component instantiation
+    --------------------------------------------------------------------------------
+    u_aes_round: aes_round
+        port map(
+            rst_i                   => rst_i,
+            clk_i                   => clk_i,
+            aes_mode_i              => aes_mode_i,
+            rnd_i_am_last_inst_i    => '0',
+            kexp_part_key_i         => rnd_key,
+            rnd_stage_reset_i       => '0',
+            rnd_next_stage_busy_i   => '0',
+            rnd_stage_val_i         => rnd_val_i,
+            rnd_stage_cnt_i         => rnd_cnt,
+            rnd_stage_data_i        => rnd_data,
+            rnd_stage_val_o         => rnd_val_o,
+            rnd_key_index_o         => open,
+            rnd_stage_cnt_o         => open,
+            rnd_stage_data_o        => rnd_data_out,
+            rnd_stage_trg_key_o     => open,
+            rnd_next_stage_val_o    => open,
+            rnd_loop_back_o         => open,
+            rnd_i_am_busy_o         => open);
+
+    ---------------------------------------------------------------
+    rnd_data_o  <= state_to_vec(rnd_data_out);
+
+end architecture;
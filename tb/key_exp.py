@@ -9,10 +9,19 @@
 #            Alex Martelli ( http://www.aleax.it )
 #
 # ======================================================================================
+import sys
+
+from array     import array
+from struct    import pack
+from functools import lru_cache
 
 
 # ======================================================================================
 class exp_key(object):
+    '''
+    Byte-oriented key expansion of SlowAES.
+    Kept as reference for the benchmark of gcm_bench.py
+    '''
 
     # valid key sizes
     key_size =   {  '128':16,
@@ -114,8 +123,66 @@ class exp_key(object):
         return exp_key
 
 
+# ======================================================================================
+# Word-based key expansion
+#
+#   The key schedule is computed on 32-bit words: SubWord and RotWord of a word are
+#   4 S-box lookups. The schedules of the last KEY_CACHE_SIZE keys are kept: tests
+#   that send many packets or re-key with the same keys reuse them.
+# ======================================================================================
+KEY_CACHE_SIZE = 256
+
+MASK_32 = (1 << 32) - 1
+
+# Rcon words of the key schedule
+RCON_WORDS = [rcon << 24 for rcon in exp_key.Rcon]
+
+
+# ======================================================================================
+def sub_word(w, sbox=exp_key.sbox):
+    return (sbox[w >> 24] << 24) | (sbox[(w >> 16) & 0xFF] << 16) | (sbox[(w >> 8) & 0xFF] << 8) | sbox[w & 0xFF]
+
+
+# ======================================================================================
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def expand_key(key, size):
+    '''
+    Expand the key (bytes) of size bytes. Return the schedule as bytes: a
+    16-byte round key every 16 bytes. The schedule is cached by (key, size) '''
+
+    nk       = size // 4
+    n_words  = 4 * (nk + 7)     # 4 words per round key, nk + 6 rounds + 1
+
+    w = [int.from_bytes(key[4 * i : 4 * i + 4], 'big') for i in range(nk)]
+
+    for i in range(nk, n_words):
+        t = w[i - 1]
+        if i % nk == 0:
+            # RotWord, SubWord and Rcon
+            t = sub_word(((t << 8) | (t >> 24)) & MASK_32) ^ RCON_WORDS[i // nk]
+        elif nk == 8 and i % nk == 4:
+            # 256-bit key has an extra SubWord
+            t = sub_word(t)
+        w.append(w[i - nk] ^ t)
+
+    return pack('>%dI' % n_words, *w)
+
+
+# ======================================================================================
+def expand_key_words(key, size):
+    '''
+    Expand the key (bytes) of size bytes. Return the schedule as 32-bit words '''
+
+    words = array('I', expand_key(key, size))
+    if sys.byteorder == 'little':
+        words.byteswap()
+    return words
+
+
 # ======================================================================================
 def aes_expand_key(key, size):
-    aes = exp_key()
+    '''
+    Expand the key (hex string) of size '128', '192' or '256' bits.
+    Return the schedule as a list of bytes '''
 
-    return aes.aes_expand_key(key, aes.key_size[size])
+    return list(expand_key(bytes.fromhex(key), exp_key.key_size[size]))